@@ -1,40 +1,286 @@
-import os
-import aiohttp
-import time
-import subprocess
-import threading
-import sys
-
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+import json
+import numpy as np
+import pandas as pd
+from datetime import date, datetime
+
+from pydantic import ValidationError
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query, Request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from src.services.sync_service import get_download_links
 from src.services.download_service import download_all_files
-from src.core.config import DOWNLOAD_DIR
-from src.model.model import calcular_media_diaria_por_regiao
-from geopy.geocoders import Nominatim
+from src.services.download_store import download_store
+from src.core.config import STREAMLIT_PORT, MAX_DIAS_INTERVALO, PROFILING_ENABLED, TILE_ZOOM_MAX, GEOCODE_LOTE_MAX
+from src.core.http_client import run_sync
+from src.core.profiling import listar_perfis, carregar_perfil
+from src.core.rate_limit import nominatim_bucket, elevation_bucket
+from src.services.geocoding_service import geocodificar
+from src.services.batch_geocoding_service import criar_job, jobs, ler_enderecos_csv
+from src.services.ingestion_service import ingest_downloads
+from src.services.station_index import estacoes_mais_proximas
+from src.services.pv_service import simular_ano_tipico
+from src.services.sizing_service import dimensionar_cenarios
+from src.services.process_supervisor import streamlit_supervisor
+from src.services.observation_service import consultar_observacoes
+from src.services.rollup_service import consultar_rollup
+from src.services.backtest_service import estado_backtest, executar_backtest_api, ultimo_relatorio
+from src.services.materialization_service import pre_materializador
+from src.services.tile_service import obter_tile, tile_cache, versao_tiles
+from src.model.model import versao_modelo, recarregar_modelo, anos_treino_modelo, converter_unidade, UNIDADES_IRRADIACAO
+from src.utils.arrow_utils import formato_tabular, ler_tabela
+from src.api.responses import responder
+from src.api.schemas import NearestStationsRequest, GeocodeBatchRequest, CenarioDimensionamento
+from src.model.model import (
+    calcular_media_diaria_por_regiao,
+    calcular_media_diaria_intervalo,
+    calcular_intervalo_por_regiao,
+)
 
 router = APIRouter()
-geolocator = Nominatim(user_agent="mle_tech_challenge_three")
-
-streamlit_process = None
 
 @router.get("/streamlit")
-def start_streamlit():
-    global streamlit_process
-    if streamlit_process is None:
-        def run_streamlit():
-            subprocess.run([
-                "poetry", "run", "streamlit", "run", "/app/src/streamlit_app/streamlit_app.py",
-                "--server.port=8501", "--server.headless=true"
-            ])
-        thread = threading.Thread(target=run_streamlit)
-        thread.start()
-        time.sleep(5)
-        return {"message": "Streamlit started", "url": "http://localhost:8501"}
-    return {"message": "Streamlit already running", "url": "http://localhost:8501"}
+async def start_streamlit():
+    """
+    Inicia o front-end Streamlit (se necessário) e aguarda o health check responder.
+    """
+    ja_ativo = streamlit_supervisor.estado == "running"
+    await streamlit_supervisor.start()
+    if not await streamlit_supervisor.wait_ready():
+        raise HTTPException(status_code=503, detail={
+            "message": "Streamlit não ficou pronto",
+            **streamlit_supervisor.status()
+        })
+    message = "Streamlit already running" if ja_ativo else "Streamlit started"
+    return {"message": message, "url": f"http://localhost:{STREAMLIT_PORT}", **streamlit_supervisor.status()}
+
+@router.get("/streamlit/status")
+async def streamlit_status():
+    """
+    Estado do processo do Streamlit, número de reinícios e latência de inicialização.
+    """
+    return streamlit_supervisor.status()
+
+# Nome do campo/coluna de irradiação em cada unidade, para que as escalas não se confundam
+COLUNA_IRRADIACAO = {"indice": "irradiacao_indice", "kwh": "irradiacao_kwh_m2"}
+
+def _validar_unidade(unidade: str) -> str:
+    """
+    Valida a unidade e devolve o nome do campo de irradiação correspondente.
+    """
+    if unidade not in UNIDADES_IRRADIACAO:
+        raise HTTPException(status_code=422, detail=f"Unidade inválida. Opções: {', '.join(UNIDADES_IRRADIACAO)}")
+    return COLUNA_IRRADIACAO[unidade]
 
 @router.get("/model/")
-async def get_model():
-    return calcular_media_diaria_por_regiao()
+async def get_model(request: Request, unidade: str = "indice"):
+    """
+    Irradiação média diária de hoje por região. 'unidade': 'indice' (escala histórica do
+    front, padrão) ou 'kwh' (kWh/m²/dia físico, comparável a /pv/simulate).
+    A unidade usada vai no header X-Irradiacao-Unidade e no nome da coluna nos formatos
+    tabulares (irradiacao_indice / irradiacao_kwh_m2).
+    """
+    coluna = _validar_unidade(unidade)
+    resultado = pre_materializador.obter(datetime.now().date())
+    if resultado is None:
+        resultado = await run_sync(calcular_media_diaria_por_regiao)
+    valores = converter_unidade(np.array(list(resultado.values()), dtype=np.float64), unidade)
+    resultado = {r: float(v) for r, v in zip(resultado, valores)}
+    colunas = {
+        "regiao": np.array(list(resultado.keys())),
+        coluna: valores,
+    }
+    resposta = await responder(request, colunas, json=resultado)
+    resposta.headers["X-Irradiacao-Unidade"] = unidade
+    return resposta
+
+
+@router.get("/model/range")
+async def get_model_range(
+    request: Request,
+    inicio: date,
+    fim: date,
+    lat: float = Query(None, ge=-90, le=90),
+    lon: float = Query(None, ge=-180, le=180),
+    altitude: float = None,
+    unidade: str = "indice",
+):
+    """
+    Irradiação média diária para cada data do intervalo, em uma única previsão
+    ('unidade' como em /model/). Com 'lat' e 'lon', avalia a localização; sem eles,
+    retorna as regiões (servidas da memória quando as datas já foram pré-materializadas).
+    O campo de irradiação é nomeado pela unidade (irradiacao_indice / irradiacao_kwh_m2).
+    """
+    coluna = _validar_unidade(unidade)
+    if fim < inicio:
+        raise HTTPException(status_code=422, detail="'fim' deve ser maior ou igual a 'inicio'")
+    if (fim - inicio).days + 1 > MAX_DIAS_INTERVALO:
+        raise HTTPException(status_code=422, detail=f"Intervalo máximo de {MAX_DIAS_INTERVALO} dias")
+    if (lat is None) != (lon is None):
+        raise HTTPException(status_code=422, detail="Informe 'lat' e 'lon' juntos")
+
+    if lat is not None:
+        datas, medias = await run_sync(calcular_media_diaria_intervalo, [lat], [lon], inicio, fim, altitude)
+        irradiacao = np.round(converter_unidade(medias[0], unidade), 2)
+        colunas = {"data": datas, coluna: irradiacao}
+        resultado = {
+            "latitude": lat,
+            "longitude": lon,
+            "unidade": unidade,
+            coluna: {str(d): float(v) for d, v in zip(datas, irradiacao)},
+        }
+    else:
+        resultado = pre_materializador.obter_intervalo(inicio, fim)
+        if resultado is None:
+            _, resultado = await run_sync(calcular_intervalo_por_regiao, inicio, fim)
+        if unidade != "indice":
+            resultado = {
+                d: {r: round(float(converter_unidade(v, unidade)), 2) for r, v in medias.items()}
+                for d, medias in resultado.items()
+            }
+        colunas = {
+            "data": np.array([d for d, medias in resultado.items() for _ in medias], dtype="datetime64[D]"),
+            "regiao": np.array([r for medias in resultado.values() for r in medias]),
+            coluna: np.array([v for medias in resultado.values() for v in medias.values()]),
+        }
+    resposta = await responder(request, colunas, json=resultado)
+    resposta.headers["X-Irradiacao-Unidade"] = unidade
+    return resposta
+
+
+@router.post("/model/reload")
+async def model_reload():
+    """
+    Recarrega o modelo após a publicação de uma nova versão (python -m src.model.treino)
+    e refaz a pré-materialização com ela.
+    """
+    await run_sync(recarregar_modelo)
+    try:
+        await pre_materializador.atualizar()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"status": "ok", "versao_modelo": versao_modelo()}
+
+
+@router.get("/model/status")
+async def model_status():
+    """
+    Estado da pré-materialização (datas em memória e última atualização).
+    """
+    return pre_materializador.status()
+
+@router.get("/tiles/{data}/{z}/{x}/{y}.png", tags=["Tiles"])
+async def irradiance_tile(request: Request, data: date, z: int, x: int, y: int):
+    """
+    Tile XYZ (Web Mercator, 256 px) com o mapa de calor da irradiação média diária da data.
+    Responde 304 sem renderizar nada quando o 'If-None-Match' do cliente ainda é válido.
+    """
+    if not 0 <= z <= TILE_ZOOM_MAX or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile inexistente")
+    etag = f'"{versao_tiles()}-{data.isoformat()}-{z}-{x}-{y}"'
+    headers = {"Cache-Control": "public, max-age=86400", "ETag": etag}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in (t.strip().removeprefix("W/") for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    imagem = await obter_tile(data, z, x, y)
+    return Response(content=imagem, media_type="image/png", headers=headers)
+
+
+@router.get("/tiles/status", tags=["Tiles"])
+async def tiles_status():
+    """
+    Ocupação e taxa de acerto do cache de tiles.
+    """
+    return {"versao_modelo": versao_modelo(), **tile_cache.status()}
+
+@router.get("/pv/simulate", tags=["PV"])
+async def pv_simulate(
+    request: Request,
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    potencia_kwp: float = Query(1.0, gt=0),
+    fator_performance: float = Query(0.75, gt=0, le=1),
+    altitude: float = None,
+    horario: bool = False,
+):
+    """
+    Simula a geração de um sistema fotovoltaico hora a hora em um ano típico
+    e retorna a geração mensal e anual em kWh.
+    Em Arrow/Parquet, retorna a série horária (se 'horario') ou a tabela mensal.
+    """
+    resultado = await run_sync(
+        simular_ano_tipico, lat, lon, potencia_kwp, fator_performance, altitude, horario
+    )
+    if horario:
+        colunas = resultado["horario"]
+    else:
+        colunas = {
+            "mes": np.arange(1, 13, dtype=np.int8),
+            "geracao_kwh": np.array(resultado["geracao_mensal_kwh"]),
+            "irradiacao_kwh_m2": np.array(resultado["irradiacao_mensal_kwh_m2"]),
+        }
+    return await responder(request, colunas, json=resultado)
+
+
+@router.post("/sizing/batch", tags=["PV"])
+async def sizing_batch(request: Request, data: str = None):
+    """
+    Dimensiona um lote de cenários (um consumidor por linha) de uma vez.
+    Aceita Arrow IPC (stream), Parquet ou JSON (lista de registros) e responde
+    no formato pedido em 'Accept' (por padrão, o mesmo formato da entrada).
+    A coluna 'irradiacao', na entrada (opcional) e na saída, está em kWh/m²/dia físicos.
+    """
+    formato_entrada = formato_tabular(request.headers.get("content-type"))
+    corpo = await request.body()
+    try:
+        if formato_entrada:
+            tabela = await run_sync(ler_tabela, corpo, formato_entrada)
+        else:
+            registros = json.loads(corpo)
+            if not isinstance(registros, list):
+                raise ValueError("O corpo JSON deve ser uma lista de registros")
+            cenarios = [CenarioDimensionamento(**r) for r in registros]
+            tabela = pd.DataFrame([c.model_dump() for c in cenarios])
+        resultado = await run_sync(dimensionar_cenarios, tabela, data)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return await responder(request, resultado, formato_padrao=formato_entrada)
+
+
+@router.get("/observations/{codigo}", tags=["Observations"])
+async def observations(request: Request, codigo: str, inicio: date, fim: date):
+    """
+    Observações horárias de uma estação do INMET entre duas datas (inclusive).
+    """
+    if fim < inicio:
+        raise HTTPException(status_code=422, detail="'fim' deve ser maior ou igual a 'inicio'")
+    tabela = await run_sync(consultar_observacoes, codigo, inicio, fim)
+    return await responder(request, tabela)
+
+
+@router.get("/rollups/{nivel}", tags=["Observations"])
+async def rollups(
+    request: Request,
+    nivel: str,
+    agrupamento: str = "estacao",
+    chaves: list[str] = Query(None),
+    ano_inicio: int = None,
+    ano_fim: int = None,
+    agregar_anos: bool = False,
+    variaveis: list[str] = Query(None),
+):
+    """
+    Agregados pré-calculados das observações ('diario', 'mensal' ou 'mes_hora')
+    por estação ou por região, sem ler os dados horários.
+    """
+    try:
+        tabela = await run_sync(
+            consultar_rollup, nivel, agrupamento, chaves, ano_inicio, ano_fim, agregar_anos, variaveis
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return await responder(request, tabela)
 
 
 @router.get("/geocode/{address}")
@@ -42,28 +288,108 @@ async def geocode_address(address: str = None):
     """
     Recebe um endereço e retorna latitude, longitude e altitude.
     """
-    location = geolocator.geocode(address)
-    if not location:
+    try:
+        resultado = await geocodificar(address)
+    except Exception:
+        raise HTTPException(status_code=503, detail="Erro ao consultar o serviço de geocodificação")
+    if resultado["status"] != "ok":
         raise HTTPException(status_code=404, detail="Endereço não encontrado")
+    if resultado["altitude"] is None:
+        raise HTTPException(status_code=500, detail="Erro ao obter altitude")
 
-    lat = location.latitude
-    lon = location.longitude
+    return {
+        "latitude": resultado["latitude"],
+        "longitude": resultado["longitude"],
+        "altitude": resultado["altitude"]
+    }
 
-    url = f"https://api.open-elevation.com/api/v1/lookup?locations={lat},{lon}"
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status == 200:
-                data = await response.json()
-                elevation = data["results"][0]["elevation"]
-            else:
-                raise HTTPException(status_code=500, detail="Erro ao obter altitude")
+@router.post("/geocode/batch", tags=["Geocoding"])
+async def geocode_batch(request: Request, background_tasks: BackgroundTasks, coluna: str = None):
+    """
+    Inicia a geocodificação em lote de uma lista de endereços: JSON {"enderecos": [...]}
+    ou [...], ou um CSV (Content-Type: text/csv), usando a coluna 'coluna', 'endereco'/'address'
+    ou a primeira. Endereços repetidos são consultados uma vez e os que estão em cache
+    são respondidos imediatamente; acompanhe em /geocode/batch/{id}/stream.
+    """
+    corpo = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith("text/csv"):
+            enderecos = ler_enderecos_csv(corpo, coluna)
+        else:
+            enderecos = GeocodeBatchRequest.model_validate(json.loads(corpo)).enderecos
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Lote inválido: {e}")
+    if not enderecos:
+        raise HTTPException(status_code=422, detail="Nenhum endereço informado")
+    if len(enderecos) > GEOCODE_LOTE_MAX:
+        raise HTTPException(status_code=413, detail=f"Lote acima de {GEOCODE_LOTE_MAX} endereços")
 
+    job = criar_job(enderecos)
+    background_tasks.add_task(job.executar)
+    return {"status": "ok", **job.progresso()}
+
+def _job_geocodificacao(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job de geocodificação não encontrado")
+    return job
+
+@router.get("/geocode/batch/{job_id}", tags=["Geocoding"])
+async def geocode_batch_status(job_id: str, desde: int = Query(0, ge=0)):
+    """
+    Progresso de um job de geocodificação em lote e os resultados a partir do índice 'desde'.
+    """
+    job = _job_geocodificacao(job_id)
     return {
-        "latitude": lat,
-        "longitude": lon,
-        "altitude": elevation
+        "status": "ok",
+        **job.progresso(),
+        "limitadores": {"nominatim": nominatim_bucket.status(), "elevation": elevation_bucket.status()},
+        "resultados": job.resultados[desde:],
     }
 
+@router.get("/geocode/batch/{job_id}/stream", tags=["Geocoding"])
+async def geocode_batch_stream(job_id: str):
+    """
+    Resultados do job em NDJSON, à medida que ficam prontos (desde o início do job),
+    intercalados com linhas de progresso; a última linha é o progresso final.
+    """
+    job = _job_geocodificacao(job_id)
+
+    async def linhas():
+        async for tipo, dados in job.acompanhar():
+            yield json.dumps({"tipo": tipo, **dados}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(linhas(), media_type="application/x-ndjson")
+
+@router.get("/stations/nearest", tags=["Stations"])
+async def nearest_stations(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    k: int = Query(1, ge=1, le=50),
+):
+    """
+    Retorna as k estações do INMET mais próximas de um ponto (distância haversine).
+    """
+    try:
+        # A primeira consulta lê o catálogo e constrói o índice: fora do event loop
+        estacoes = await run_sync(estacoes_mais_proximas, lat, lon, k)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"status": "ok", "stations": estacoes[0]}
+
+@router.post("/stations/nearest", tags=["Stations"])
+async def nearest_stations_bulk(request: NearestStationsRequest):
+    """
+    Consulta em lote: as k estações mais próximas de cada ponto informado.
+    """
+    if len(request.latitudes) != len(request.longitudes):
+        raise HTTPException(status_code=422, detail="latitudes e longitudes devem ter o mesmo tamanho")
+    try:
+        resultados = await run_sync(estacoes_mais_proximas, request.latitudes, request.longitudes, request.k)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"status": "ok", "results": resultados}
+
 @router.get("/health", tags=["Status"])
 async def health_check():
     """
@@ -71,13 +397,68 @@ async def health_check():
     """
     return {"status": "ok"}
 
+@router.post("/backtest", tags=["Model"])
+async def backtest(
+    background_tasks: BackgroundTasks,
+    anos: list[str] = Query(...),
+    processos: int = Query(None, ge=1),
+    observado: bool = False,
+    incluir_treino: bool = False,
+):
+    """
+    Inicia em segundo plano o backtest do modelo contra as observações dos anos informados.
+    Anos usados no treinamento do modelo são recusados, a menos que 'incluir_treino' seja informado.
+    """
+    anos_treino = sorted(set(anos) & await run_sync(anos_treino_modelo))
+    if anos_treino and not incluir_treino:
+        raise HTTPException(status_code=422, detail=f"Anos usados no treinamento do modelo: {', '.join(anos_treino)}")
+    if estado_backtest["estado"] == "executando":
+        raise HTTPException(status_code=409, detail="Já existe um backtest em execução")
+    estado_backtest["estado"] = "executando"
+    background_tasks.add_task(executar_backtest_api, anos, processos, observado, incluir_treino)
+    return {"status": "ok", "message": "Backtest iniciado em segundo plano", "anos": anos}
+
+@router.get("/backtest", tags=["Model"])
+async def backtest_status():
+    """
+    Progresso do backtest em execução e o relatório mais recente.
+    """
+    return {"status": "ok", **estado_backtest, "relatorio": await run_sync(ultimo_relatorio)}
+
+@router.get("/profiles", tags=["Status"])
+async def profiles(limite: int = Query(50, ge=1, le=500)):
+    """
+    Lista os perfis de requisições salvos (mais recentes primeiro).
+    Para perfilar uma requisição, envie o header 'X-Profile: cpu' (ou 'mem', 'cpu,mem').
+    """
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling desativado (PROFILING_ENABLED)")
+    return {"status": "ok", "profiles": await run_sync(listar_perfis, limite)}
+
+@router.get("/profiles/{perfil_id}", tags=["Status"])
+async def profile(perfil_id: str, formato: str = Query("json", pattern="^(json|folded)$")):
+    """
+    Retorna um perfil salvo. Com formato=folded, retorna as pilhas no formato
+    aceito por flamegraph.pl / speedscope.
+    """
+    if not PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling desativado (PROFILING_ENABLED)")
+    perfil = await run_sync(carregar_perfil, perfil_id)
+    if perfil is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    if formato == "folded":
+        if perfil["cpu"] is None:
+            raise HTTPException(status_code=404, detail="Perfil sem amostras de CPU")
+        return PlainTextResponse("\n".join(perfil["cpu"]["folded"]))
+    return perfil
+
 @router.get("/sync_data", tags=["Sync Data"])
 async def sync_data():
     """
     Endpoint para obter a lista de anos e links de download disponíveis.
     """
     try:
-        data = get_download_links()
+        data = await run_sync(get_download_links)
         return {"status": "ok", **data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -95,26 +476,22 @@ async def download_data(background_tasks: BackgroundTasks, years: list[str] = No
         "years": years if years else "todos os anos disponíveis"
     }
 
-@router.get("/download_status", tags=["Download Data"])
-async def download_status():
+@router.post("/ingest_data", tags=["Download Data"])
+async def ingest_data(background_tasks: BackgroundTasks, years: list[str] = None):
+    """
+    Endpoint para ingerir os arquivos já baixados (observações e catálogo de estações).
+    Se 'years' não for especificado, ingere todos os anos baixados.
     """
-    Endpoint para verificar o status dos arquivos baixados.
-    """
-    if not DOWNLOAD_DIR.exists():
-        return {"status": "ok", "files": []}
-    
-    files = []
-    for file in os.listdir(DOWNLOAD_DIR):
-        if file.endswith('.zip'):
-            file_path = DOWNLOAD_DIR / file
-            file_size = os.path.getsize(file_path)
-            files.append({
-                "name": file,
-                "size_bytes": file_size,
-                "size_mb": round(file_size / (1024 * 1024), 2)
-            })
+    background_tasks.add_task(ingest_downloads, years)
     return {
         "status": "ok",
-        "download_directory": str(DOWNLOAD_DIR),
-        "files": files
-    }
\ No newline at end of file
+        "message": "Ingestão iniciada em segundo plano",
+        "years": years if years else "todos os anos baixados"
+    }
+
+@router.get("/download_status", tags=["Download Data"])
+async def download_status():
+    """
+    Endpoint para verificar o status dos arquivos baixados (a partir do índice do armazenamento).
+    """
+    return {"status": "ok", **(await run_sync(download_store.status))}
@@ -0,0 +1,47 @@
+import numpy as np
+import pyarrow as pa
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+
+from src.core.http_client import run_sync
+from src.utils.arrow_utils import (
+    formato_tabular,
+    tabela_de_colunas,
+    escrever_tabela,
+    media_type,
+)
+
+
+def _para_json(valor):
+    """
+    Prepara o payload para o orjson, que serializa arrays NumPy numéricos nativamente
+    (NaN e infinito viram null). Tabelas Arrow viram uma lista de registros.
+    """
+    if isinstance(valor, pa.Table):
+        return valor.to_pylist()
+    if isinstance(valor, dict):
+        return {chave: _para_json(v) for chave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_para_json(v) for v in valor]
+    if isinstance(valor, np.ndarray):
+        if valor.dtype.kind in "biufM":
+            return np.ascontiguousarray(valor)
+        return valor.tolist()
+    return valor
+
+
+async def responder(request: Request, colunas, json=None, formato_padrao: str = None) -> Response:
+    """
+    Negocia o formato da resposta pelo cabeçalho Accept.
+    - application/vnd.apache.arrow.stream: Arrow IPC montado sobre os buffers NumPy
+    - application/vnd.apache.parquet: Parquet
+    - caso contrário: JSON (orjson), com o payload 'json' se informado ou as colunas
+    'colunas' pode ser um dict de arrays NumPy ou uma tabela Arrow.
+    'formato_padrao' ('arrow' ou 'parquet') é usado quando o Accept não pede um formato colunar.
+    """
+    formato = formato_tabular(request.headers.get("accept")) or formato_padrao
+    if formato:
+        tabela = colunas if isinstance(colunas, pa.Table) else tabela_de_colunas(colunas)
+        conteudo = await run_sync(escrever_tabela, tabela, formato)
+        return Response(content=conteudo, media_type=media_type(formato))
+    return ORJSONResponse(_para_json(json if json is not None else colunas))
@@ -0,0 +1,32 @@
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class NearestStationsRequest(BaseModel):
+    latitudes: list[float]
+    longitudes: list[float]
+    k: int = Field(default=1, ge=1, le=50)
+
+
+class CenarioDimensionamento(BaseModel):
+    """
+    Linha de entrada do /sizing/batch em JSON; colunas extras são mantidas na saída.
+    """
+    model_config = ConfigDict(extra="allow")
+
+    consumo_mensal: float
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+
+
+class GeocodeBatchRequest(BaseModel):
+    """
+    Lote do /geocode/batch em JSON: {"enderecos": [...]} ou a lista de endereços diretamente.
+    """
+    enderecos: list[str]
+
+    @model_validator(mode="before")
+    @classmethod
+    def _aceitar_lista(cls, dados):
+        if isinstance(dados, list):
+            return {"enderecos": dados}
+        return dados
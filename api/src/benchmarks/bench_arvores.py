@@ -0,0 +1,81 @@
+"""
+Benchmark do ensemble compilado em NumPy contra o XGBoost:
+tempo de inicialização (import + carga), memória (RSS máximo) e vazão (linhas/s).
+
+Uso: python -m src.benchmarks.bench_arvores
+"""
+import sys
+import json
+import time
+import subprocess
+
+import numpy as np
+
+from src.core.config import MODEL_DIR
+
+# Executados em processos separados para medir import e carga a frio
+_CARGA_XGBOOST = f"""
+import time, resource, json
+inicio = time.perf_counter()
+import pickle, xgboost
+with open({str(MODEL_DIR / 'modelo_radiacao_solar.pkl')!r}, 'rb') as f:
+    modelo = pickle.load(f)
+print(json.dumps({{"tempo": time.perf_counter() - inicio,
+                  "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+_CARGA_NUMPY = """
+import time, resource, json
+inicio = time.perf_counter()
+from src.model.arvores import carregar_ensemble
+ensemble = carregar_ensemble()
+print(json.dumps({"tempo": time.perf_counter() - inicio,
+                  "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def _medir_carga(codigo: str) -> dict:
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def _vazao(preditor, X, repeticoes: int = 3) -> float:
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        preditor.predict(X)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return len(X) / melhor
+
+
+def main():
+    from src.model.arvores import carregar_ensemble, verificar_equivalencia
+    from src.model.model import carregar_modelo, montar_features
+
+    print(f"{'preditor':<10}{'carga (s)':>12}{'RSS (MB)':>12}")
+    for nome, codigo in [("xgboost", _CARGA_XGBOOST), ("numpy", _CARGA_NUMPY)]:
+        carga = _medir_carga(codigo)
+        print(f"{nome:<10}{carga['tempo']:>12.3f}{carga['rss_mb']:>12.1f}")
+
+    modelo, _ = carregar_modelo()
+    ensemble = carregar_ensemble()
+    if ensemble is None:
+        raise Exception("Ensemble compilado não encontrado. Execute: python -m src.model.arvores")
+
+    rng = np.random.default_rng(0)
+    print(f"\n{'linhas':>8}{'xgboost (linhas/s)':>22}{'numpy (linhas/s)':>20}{'dif. máx':>12}")
+    for n in [13, 8760, 100_000]:
+        dia_ano = rng.integers(1, 366, n)
+        clima = np.column_stack([
+            rng.uniform(10, 35, n), rng.gamma(0.5, 2, n), rng.uniform(30, 100, n), rng.uniform(0, 6, n)
+        ])
+        X = montar_features(
+            rng.uniform(-33.5, 5.5, n), rng.uniform(-74, -34, n), rng.uniform(0, 1500, n),
+            np.minimum((dia_ano - 1) // 31 + 1, 12), dia_ano, rng.integers(0, 24, n), clima
+        )
+        diferenca = verificar_equivalencia(modelo, ensemble, X)
+        print(f"{n:>8}{_vazao(modelo, X):>22,.0f}{_vazao(ensemble, X):>20,.0f}{diferenca:>12.2g}")
+
+
+if __name__ == "__main__":
+    main()
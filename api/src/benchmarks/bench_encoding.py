@@ -0,0 +1,64 @@
+"""
+Benchmark de codificação de respostas: tempo e tamanho por formato para 100k linhas.
+
+Uso: python -m src.benchmarks.bench_encoding [n_linhas]
+"""
+import sys
+import json
+import gzip
+import time
+
+import numpy as np
+import orjson
+
+from src.utils.arrow_utils import tabela_de_colunas, escrever_tabela
+
+
+def _gerar_colunas(n: int) -> dict:
+    rng = np.random.default_rng(42)
+    return {
+        "latitude": rng.uniform(-33.5, 5.5, n),
+        "longitude": rng.uniform(-74.0, -34.0, n),
+        "hora": rng.integers(0, 24, n).astype(np.int8),
+        "radiacao": rng.gamma(2.0, 500.0, n),
+        "temperatura": rng.normal(25, 5, n).astype(np.float32),
+        "geracao_kwh": rng.gamma(2.0, 200.0, n),
+    }
+
+
+def _medir(funcao, repeticoes: int = 5) -> tuple[float, int]:
+    melhor = float("inf")
+    tamanho = 0
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+        tamanho = len(resultado)
+    return melhor, tamanho
+
+
+def main(n: int = 100_000):
+    colunas = _gerar_colunas(n)
+    registros = [dict(zip(colunas, valores)) for valores in zip(*(c.tolist() for c in colunas.values()))]
+
+    formatos = {
+        "json (stdlib, registros)": lambda: json.dumps(registros).encode(),
+        "orjson (registros)": lambda: orjson.dumps(registros),
+        "orjson (colunas numpy)": lambda: orjson.dumps(colunas, option=orjson.OPT_SERIALIZE_NUMPY),
+        "orjson + gzip (colunas)": lambda: gzip.compress(
+            orjson.dumps(colunas, option=orjson.OPT_SERIALIZE_NUMPY), compresslevel=6
+        ),
+        "arrow ipc stream": lambda: escrever_tabela(tabela_de_colunas(colunas), "arrow"),
+        "parquet (snappy)": lambda: escrever_tabela(tabela_de_colunas(colunas), "parquet"),
+        "parquet (zstd)": lambda: escrever_tabela(tabela_de_colunas(colunas), "parquet", "zstd"),
+    }
+
+    print(f"{n} linhas")
+    print(f"{'formato':<28}{'tempo (ms)':>12}{'tamanho (MB)':>14}")
+    for nome, funcao in formatos.items():
+        tempo, tamanho = _medir(funcao)
+        print(f"{nome:<28}{tempo * 1000:>12.1f}{tamanho / 1024 / 1024:>14.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,76 @@
+import gzip
+import zlib
+
+# Respostas em streaming: o compressor só devolve bytes quando o seu buffer enche, então
+# linhas curtas (progresso, eventos) ficariam presas até o fim da resposta
+TIPOS_STREAMING = ("application/x-ndjson", "text/event-stream")
+
+
+class GZipMiddleware:
+    """
+    Middleware ASGI de compressão gzip, equivalente ao GZipMiddleware do Starlette, mas que
+    não comprime os tipos de streaming (TIPOS_STREAMING): cada pedaço é repassado assim que
+    a rota o produz, mesmo para clientes que aceitam gzip (navegadores, requests, aiohttp).
+    """
+
+    def __init__(self, app, minimum_size: int = 500, compresslevel: int = 9, sem_compressao=TIPOS_STREAMING):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.sem_compressao = tuple(sem_compressao)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        aceita = dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1")
+        if "gzip" not in aceita.lower():
+            return await self.app(scope, receive, send)
+
+        estado = {"inicio": None, "repassar": False, "compressor": None}
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                headers = {k.lower(): v.decode("latin-1") for k, v in mensagem.get("headers", [])}
+                tipo = headers.get(b"content-type", "").split(";")[0].strip().lower()
+                estado["repassar"] = b"content-encoding" in headers or tipo in self.sem_compressao
+                if estado["repassar"]:
+                    await send(mensagem)
+                else:
+                    estado["inicio"] = mensagem
+                return
+            if mensagem["type"] != "http.response.body" or estado["repassar"]:
+                return await send(mensagem)
+
+            corpo = mensagem.get("body", b"")
+            mais = mensagem.get("more_body", False)
+            inicio, estado["inicio"] = estado["inicio"], None
+            if inicio is not None:
+                if not mais and len(corpo) < self.minimum_size:
+                    estado["repassar"] = True
+                    await send(inicio)
+                    return await send(mensagem)
+                if not mais:
+                    corpo = gzip.compress(corpo, self.compresslevel)
+                    estado["repassar"] = True
+                    await send(self._comprimido(inicio, len(corpo)))
+                    return await send({"type": "http.response.body", "body": corpo})
+                estado["compressor"] = zlib.compressobj(self.compresslevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+                await send(self._comprimido(inicio, None))
+
+            compressor = estado["compressor"]
+            dados = compressor.compress(corpo) + (compressor.flush() if not mais else b"")
+            await send({"type": "http.response.body", "body": dados, "more_body": mais})
+
+        await self.app(scope, receive, enviar)
+
+    @staticmethod
+    def _comprimido(inicio: dict, tamanho: int | None) -> dict:
+        headers = [
+            (k, v) for k, v in inicio.get("headers", [])
+            if k.lower() not in (b"content-length", b"content-encoding")
+        ]
+        headers.append((b"content-encoding", b"gzip"))
+        headers.append((b"vary", b"Accept-Encoding"))
+        if tamanho is not None:
+            headers.append((b"content-length", str(tamanho).encode()))
+        return {**inicio, "headers": headers}
@@ -1,7 +1,9 @@
+import os
 from pathlib import Path
 
-DOWNLOAD_DIR = Path("./downloads")
-DOWNLOAD_DIR.mkdir(exist_ok=True)
+# Armazenamento dos downloads (endereçado por conteúdo, criado sob demanda)
+DOWNLOAD_DIR = Path(os.getenv("DOWNLOAD_DIR", "./downloads"))
+DOWNLOAD_STORE_MAX_GB = float(os.getenv("DOWNLOAD_STORE_MAX_GB", "20"))
 
 USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -9,4 +11,83 @@ USER_AGENT = (
     "Chrome/91.0.4472.124 Safari/537.36"
 )
 
-INMET_URL = "https://portal.inmet.gov.br/dadoshistoricos"
\ No newline at end of file
+INMET_URL = os.getenv("INMET_URL", "https://portal.inmet.gov.br/dadoshistoricos")
+
+# Serviços externos de geocodificação e altitude (sobrescritos nos testes de carga)
+NOMINATIM_USER_AGENT = "mle_tech_challenge_three"
+NOMINATIM_DOMAIN = os.getenv("NOMINATIM_DOMAIN", "nominatim.openstreetmap.org")
+NOMINATIM_SCHEME = os.getenv("NOMINATIM_SCHEME", "https")
+ELEVATION_URL = os.getenv("ELEVATION_URL", "https://api.open-elevation.com/api/v1/lookup")
+
+# Camada HTTP de saída (sessões compartilhadas criadas no lifespan da aplicação)
+HTTP_TOTAL_TIMEOUT = float(os.getenv("HTTP_TOTAL_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "25"))
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "10"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+
+# Dados derivados (grade de elevação, catálogo de estações, etc.)
+DATA_DIR = Path(os.getenv("DATA_DIR", "./data"))
+
+# Limites aproximados do território brasileiro (lat_min, lat_max, lon_min, lon_max)
+BRASIL_BBOX = (-34.0, 6.0, -74.0, -34.0)
+
+# Grade de elevação (DEM) memory-mapped
+ELEVATION_GRID_DIR = DATA_DIR / "elevacao"
+ALTITUDE_PADRAO = 500.0
+
+# Catálogo de estações do INMET (gerado na ingestão)
+STATIONS_FILE = DATA_DIR / "estacoes.csv"
+
+# Arquivo de observações horárias normalizadas, particionado por ano
+OBSERVATIONS_DIR = DATA_DIR / "observacoes"
+
+# Rollups (diário, mensal, mês × hora) por estação e por região, particionados por ano
+ROLLUP_DIR = DATA_DIR / "rollups"
+
+# Relatórios de backtest do modelo contra as observações
+BACKTEST_DIR = DATA_DIR / "backtests"
+BACKTEST_TAMANHO_BLOCO = int(os.getenv("BACKTEST_TAMANHO_BLOCO", "200000"))
+
+# Climatologia por estação × mês × hora (UTC), gerada na ingestão
+CLIMATOLOGY_FILE = DATA_DIR / "climatologia.npy"
+
+# Front-end Streamlit supervisionado pela API
+STREAMLIT_APP_PATH = os.getenv("STREAMLIT_APP_PATH", "/app/src/streamlit_app/streamlit_app.py")
+STREAMLIT_PORT = int(os.getenv("STREAMLIT_PORT", "8501"))
+STREAMLIT_HEALTH_URL = f"http://localhost:{STREAMLIT_PORT}/_stcore/health"
+STREAMLIT_STARTUP_TIMEOUT = float(os.getenv("STREAMLIT_STARTUP_TIMEOUT", "60"))
+
+# Artefatos do modelo
+MODEL_DIR = Path(os.getenv("MODEL_DIR", "/app/src/model"))
+COMPILED_MODEL_DIR = MODEL_DIR / "compilado"
+# Anos de observações do treinamento original (notebook estudo/main.ipynb)
+MODEL_ANOS_TREINO = os.getenv("MODEL_ANOS_TREINO", "2020,2021,2022,2023,2024").split(",")
+
+# Irradiação por região pré-calculada para os próximos N dias (0 desativa)
+PREMATERIALIZACAO_DIAS = int(os.getenv("PREMATERIALIZACAO_DIAS", "30"))
+
+# Tamanho máximo do intervalo aceito em /model/range
+MAX_DIAS_INTERVALO = 366
+
+# Profiling sob demanda (header X-Profile); desativado não instala o middleware
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_DIR = DATA_DIR / "perfis"
+PROFILE_MAX_ARQUIVOS = int(os.getenv("PROFILE_MAX_ARQUIVOS", "50"))
+PROFILE_INTERVALO_AMOSTRAGEM = float(os.getenv("PROFILE_INTERVALO_AMOSTRAGEM", "0.005"))
+
+# Tiles de irradiação (cache em disco limitado por tamanho, chaveado por versão do modelo e data)
+TILE_CACHE_DIR = DATA_DIR / "tiles"
+TILE_CACHE_MAX_MB = float(os.getenv("TILE_CACHE_MAX_MB", "256"))
+TILE_ZOOM_MAX = 10
+# Espaçamento (graus) da grade diária avaliada pelo modelo; os tiles são interpolados dela
+TILE_GRADE_PASSO = float(os.getenv("TILE_GRADE_PASSO", "0.5"))
+TILE_ZOOMS_PREAQUECIMENTO = [int(z) for z in os.getenv("TILE_ZOOMS_PREAQUECIMENTO", "4,5,6").split(",") if z]
+
+# Geocodificação em lote: taxa máxima por serviço externo (req/s), cache e lotes de altitude
+NOMINATIM_TAXA = float(os.getenv("NOMINATIM_TAXA", "1.0"))
+ELEVATION_TAXA = float(os.getenv("ELEVATION_TAXA", "2.0"))
+ELEVATION_LOTE = int(os.getenv("ELEVATION_LOTE", "100"))
+GEOCODE_CACHE_FILE = DATA_DIR / "geocodificacao.sqlite"
+GEOCODE_LOTE_MAX = int(os.getenv("GEOCODE_LOTE_MAX", "20000"))
@@ -0,0 +1,105 @@
+import asyncio
+import functools
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.core.config import (
+    USER_AGENT,
+    HTTP_TOTAL_TIMEOUT,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+    HTTP_KEEPALIVE_TIMEOUT,
+)
+
+# Timeout padrão (conexão, leitura) para o cliente síncrono
+SYNC_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+_async_session: aiohttp.ClientSession | None = None
+_sync_session: requests.Session | None = None
+
+
+def _criar_sessao_async() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=300,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=HTTP_TOTAL_TIMEOUT,
+        connect=HTTP_CONNECT_TIMEOUT,
+        sock_read=HTTP_READ_TIMEOUT,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={"User-Agent": USER_AGENT},
+    )
+
+
+def _criar_sessao_sync() -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_LIMIT_PER_HOST,
+        pool_maxsize=HTTP_POOL_LIMIT_PER_HOST,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+async def startup():
+    """
+    Cria as sessões HTTP compartilhadas. Chamado no início do lifespan da aplicação.
+    """
+    global _async_session, _sync_session
+    if _async_session is None or _async_session.closed:
+        _async_session = _criar_sessao_async()
+    if _sync_session is None:
+        _sync_session = _criar_sessao_sync()
+
+
+async def shutdown():
+    """
+    Fecha as sessões HTTP compartilhadas. Chamado no encerramento do lifespan.
+    """
+    global _async_session, _sync_session
+    if _async_session is not None:
+        await _async_session.close()
+        _async_session = None
+    if _sync_session is not None:
+        _sync_session.close()
+        _sync_session = None
+
+
+def get_async_session() -> aiohttp.ClientSession:
+    """
+    Retorna a sessão aiohttp compartilhada (pool com keep-alive e limite por host).
+    """
+    global _async_session
+    if _async_session is None or _async_session.closed:
+        # Fora do lifespan (ex.: scripts), cria a sessão sob demanda
+        _async_session = _criar_sessao_async()
+    return _async_session
+
+
+def get_sync_session() -> requests.Session:
+    """
+    Retorna a sessão requests compartilhada, usada pelos serviços síncronos.
+    """
+    global _sync_session
+    if _sync_session is None:
+        _sync_session = _criar_sessao_sync()
+    return _sync_session
+
+
+async def run_sync(func, *args, **kwargs):
+    """
+    Executa uma chamada síncrona (bloqueante) em uma thread, sem bloquear o event loop.
+    """
+    return await asyncio.to_thread(functools.partial(func, *args, **kwargs))
@@ -0,0 +1,208 @@
+import sys
+import json
+import time
+import uuid
+import asyncio
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from src.core.config import (
+    PROFILE_DIR,
+    PROFILE_MAX_ARQUIVOS,
+    PROFILE_INTERVALO_AMOSTRAGEM,
+)
+
+HEADER_PROFILE = b"x-profile"
+HEADER_REQUEST_ID = b"x-request-id"
+
+# Funções onde threads ociosas ficam paradas (loop de eventos, pool de threads, waits)
+_FOLHAS_OCIOSAS = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get"),
+}
+
+# Um perfil por vez: o tracemalloc e a amostragem são globais ao processo
+_lock = asyncio.Lock()
+
+
+def _descrever(frame) -> str:
+    codigo = frame.f_code
+    return f"{codigo.co_name} ({Path(codigo.co_filename).name}:{frame.f_lineno})"
+
+
+class AmostradorPilhas(threading.Thread):
+    """
+    Profiler por amostragem: a cada intervalo, captura a pilha de todas as threads do processo
+    (inclusive as do pool usado por run_sync) e conta as pilhas no formato "folded".
+    """
+
+    def __init__(self, intervalo: float = PROFILE_INTERVALO_AMOSTRAGEM):
+        super().__init__(name="profiler", daemon=True)
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+        self.amostras = 0
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            self.amostras += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                codigo = frame.f_code
+                if (Path(codigo.co_filename).name, codigo.co_name) in _FOLHAS_OCIOSAS:
+                    continue
+                pilha = []
+                while frame is not None:
+                    pilha.append(_descrever(frame))
+                    frame = frame.f_back
+                self.pilhas[";".join(reversed(pilha))] += 1
+
+    def parar(self):
+        self._parar.set()
+        self.join()
+
+    def resumo(self, limite: int = 30) -> dict:
+        proprio = Counter()
+        acumulado = Counter()
+        for pilha, n in self.pilhas.items():
+            funcoes = pilha.split(";")
+            proprio[funcoes[-1]] += n
+            for funcao in set(funcoes):
+                acumulado[funcao] += n
+        segundos = lambda n: round(n * self.intervalo, 4)
+        return {
+            "amostras": self.amostras,
+            "intervalo_s": self.intervalo,
+            "tempo_proprio": [{"funcao": f, "segundos": segundos(n)} for f, n in proprio.most_common(limite)],
+            "tempo_acumulado": [{"funcao": f, "segundos": segundos(n)} for f, n in acumulado.most_common(limite)],
+            "folded": [f"{pilha} {n}" for pilha, n in self.pilhas.most_common()],
+        }
+
+
+def _resumo_memoria(snapshot: tracemalloc.Snapshot, pico: int, limite: int = 25) -> dict:
+    estatisticas = snapshot.statistics("lineno")
+    return {
+        "pico_mb": round(pico / 2 ** 20, 3),
+        "alocacoes": [
+            {"local": str(e.traceback), "kb": round(e.size / 1024, 1), "blocos": e.count}
+            for e in estatisticas[:limite]
+        ],
+    }
+
+
+def _salvar(perfil: dict):
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    with open(PROFILE_DIR / f"{perfil['id']}.json", "w") as f:
+        json.dump(perfil, f)
+
+    # Mantém apenas os perfis mais recentes
+    arquivos = sorted(PROFILE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for arquivo in arquivos[PROFILE_MAX_ARQUIVOS:]:
+        arquivo.unlink(missing_ok=True)
+
+
+def listar_perfis(limite: int = 50) -> list[dict]:
+    """
+    Perfis salvos, do mais recente para o mais antigo.
+    """
+    if not PROFILE_DIR.exists():
+        return []
+    arquivos = sorted(PROFILE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    perfis = []
+    for arquivo in arquivos[:limite]:
+        with open(arquivo) as f:
+            perfil = json.load(f)
+        perfis.append({k: perfil[k] for k in ["id", "metodo", "caminho", "status", "inicio", "duracao_s", "modos"]})
+    return perfis
+
+
+def carregar_perfil(perfil_id: str) -> dict | None:
+    arquivo = PROFILE_DIR / f"{Path(perfil_id).name}.json"
+    if not arquivo.exists():
+        return None
+    with open(arquivo) as f:
+        return json.load(f)
+
+
+def _modos(valor: str) -> set[str]:
+    modos = {m.strip().lower() for m in valor.split(",") if m.strip()}
+    # "X-Profile: 1" equivale a "cpu"
+    if modos & {"1", "true", "on"}:
+        modos = (modos - {"1", "true", "on"}) | {"cpu"}
+    return modos & {"cpu", "mem"}
+
+
+class ProfilingMiddleware:
+    """
+    Middleware ASGI que perfila uma requisição quando ela traz o header 'X-Profile'
+    ('cpu', 'mem' ou 'cpu,mem'). O perfil é salvo em PROFILE_DIR com o id da requisição
+    ('X-Request-ID' ou um id gerado), devolvido no header 'X-Profile-Id'.
+    Só é instalado quando PROFILING_ENABLED está ativo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        modos = _modos(headers.get(HEADER_PROFILE, b"").decode()) if HEADER_PROFILE in headers else set()
+        if not modos or _lock.locked():
+            return await self.app(scope, receive, send)
+
+        async with _lock:
+            await self._perfilar(scope, receive, send, headers, modos)
+
+    async def _perfilar(self, scope, receive, send, headers, modos):
+        perfil_id = headers.get(HEADER_REQUEST_ID, b"").decode() or uuid.uuid4().hex
+        perfil_id = "".join(c for c in perfil_id if c.isalnum() or c in "-_")[:64]
+        status = {"codigo": None}
+
+        async def enviar(mensagem):
+            if mensagem["type"] == "http.response.start":
+                status["codigo"] = mensagem["status"]
+                mensagem["headers"] = [*mensagem.get("headers", []), (b"x-profile-id", perfil_id.encode())]
+            await send(mensagem)
+
+        amostrador = AmostradorPilhas() if "cpu" in modos else None
+        if "mem" in modos:
+            tracemalloc.start()
+        if amostrador is not None:
+            amostrador.start()
+        inicio = datetime.now()
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            duracao = time.perf_counter() - t0
+            if amostrador is not None:
+                amostrador.parar()
+            memoria = None
+            if "mem" in modos:
+                _, pico = tracemalloc.get_traced_memory()
+                memoria = _resumo_memoria(tracemalloc.take_snapshot(), pico)
+                tracemalloc.stop()
+
+            perfil = {
+                "id": perfil_id,
+                "metodo": scope["method"],
+                "caminho": scope["path"],
+                "query": scope.get("query_string", b"").decode(),
+                "status": status["codigo"],
+                "inicio": inicio.isoformat(),
+                "duracao_s": round(duracao, 6),
+                "modos": sorted(modos),
+                "cpu": amostrador.resumo() if amostrador is not None else None,
+                "memoria": memoria,
+            }
+            try:
+                await asyncio.to_thread(_salvar, perfil)
+            except Exception as e:
+                print(f"Erro ao salvar perfil {perfil_id}: {e}")
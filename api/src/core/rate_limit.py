@@ -0,0 +1,74 @@
+import time
+import asyncio
+from email.utils import parsedate_to_datetime
+
+from src.core.config import NOMINATIM_TAXA, ELEVATION_TAXA
+
+
+class TokenBucket:
+    """
+    Limitador de taxa (token bucket) para chamadas a um serviço externo.
+    As requisições esperam em ordem de chegada; 'penalizar' suspende novas chamadas
+    (ex.: resposta 429 com Retry-After).
+    """
+
+    def __init__(self, nome: str, taxa: float, capacidade: float = 1.0):
+        self.nome = nome
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.tokens = capacidade
+        self.ultimo = time.monotonic()
+        self.bloqueado_ate = 0.0
+        self.chamadas = 0
+        self.espera_total = 0.0
+        self._lock = asyncio.Lock()
+
+    async def adquirir(self):
+        inicio = time.monotonic()
+        async with self._lock:
+            while True:
+                agora = time.monotonic()
+                if agora < self.bloqueado_ate:
+                    await asyncio.sleep(self.bloqueado_ate - agora)
+                    continue
+                self.tokens = min(self.capacidade, self.tokens + (agora - self.ultimo) * self.taxa)
+                self.ultimo = agora
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                await asyncio.sleep((1 - self.tokens) / self.taxa)
+        self.chamadas += 1
+        self.espera_total += time.monotonic() - inicio
+
+    def penalizar(self, segundos: float):
+        self.bloqueado_ate = max(self.bloqueado_ate, time.monotonic() + segundos)
+        self.tokens = 0
+
+    def status(self) -> dict:
+        return {
+            "taxa_por_s": self.taxa,
+            "chamadas": self.chamadas,
+            "espera_media_s": round(self.espera_total / self.chamadas, 3) if self.chamadas else 0.0,
+        }
+
+
+def segundos_retry_after(valor: str | None, padrao: float) -> float:
+    """
+    Espera indicada pelo cabeçalho Retry-After, em segundos ou como data HTTP
+    (ex.: "Wed, 21 Oct 2026 07:28:00 GMT"). Ausente ou inválido, usa 'padrao'.
+    """
+    if not valor:
+        return padrao
+    try:
+        return max(float(valor), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(valor).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, OverflowError):
+        return padrao
+
+
+# Um limitador por serviço externo (política do Nominatim: no máximo 1 requisição por segundo)
+nominatim_bucket = TokenBucket("nominatim", NOMINATIM_TAXA)
+elevation_bucket = TokenBucket("elevation", ELEVATION_TAXA)
@@ -0,0 +1,136 @@
+"""
+Teste de carga de ponta a ponta com serviços externos simulados localmente.
+
+Sobe stubs do portal do INMET, do Nominatim e do open-elevation (com latência e falhas
+configuráveis), inicia a API apontando para eles e executa uma rampa de carga em malha aberta.
+
+Uso: python -m src.loadtest --taxas 5,10,20,40 --duracao 30 --latencia-ms 50 --taxa-falha 0.01
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+
+import aiohttp
+
+from src.loadtest.stubs import (
+    criar_stub_inmet,
+    criar_stub_nominatim,
+    criar_stub_elevacao,
+    iniciar_stub,
+    zip_ano,
+)
+from src.loadtest.gerador import Alvo, executar_rampa
+
+CIDADES = ["Manaus", "Recife", "Brasilia", "Sao Paulo", "Porto Alegre", "Curitiba", "Salvador", "Belem"]
+
+
+def _alvos() -> list[Alvo]:
+    return [
+        Alvo("/health", "/health", peso=1),
+        Alvo("/model/", "/model/", peso=2),
+        Alvo("/geocode", lambda: f"/geocode/{random.choice(CIDADES)} {random.randint(1, 10000)}", peso=3),
+        Alvo(
+            "/stations/nearest",
+            lambda: f"/stations/nearest?lat={random.uniform(-33, 4):.4f}&lon={random.uniform(-73, -35):.4f}&k=3",
+            peso=2,
+        ),
+        Alvo("/sync_data", "/sync_data", peso=1),
+    ]
+
+
+async def _aguardar_api(base_url: str, timeout: float = 60.0):
+    inicio = time.monotonic()
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() - inicio < timeout:
+            try:
+                async with session.get(f"{base_url}/health") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.5)
+    raise Exception("API não respondeu ao health check")
+
+
+def _imprimir(resumos: list[dict]):
+    for resumo in resumos:
+        print(
+            f"\n== {resumo['taxa_alvo_rps']} req/s alvo | vazão {resumo['vazao_rps']} req/s | "
+            f"erros {resumo['taxa_erro']:.2%} | descartadas {resumo['descartadas']}"
+        )
+        print(f"{'endpoint':<22}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'erros':>9}")
+        for nome, m in resumo["endpoints"].items():
+            print(
+                f"{nome:<22}{m['requisicoes']:>8}{m['p50_ms']:>10}{m['p95_ms']:>10}"
+                f"{m['p99_ms']:>10}{m['taxa_erro']:>9.2%}"
+            )
+
+
+async def main(args):
+    falhas = {"latencia_ms": args.latencia_ms, "jitter_ms": args.jitter_ms, "taxa_falha": args.taxa_falha}
+    anos = [int(a) for a in args.anos.split(",")]
+    for ano in anos:
+        zip_ano(ano)
+
+    runners = [
+        await iniciar_stub(criar_stub_inmet(anos, **falhas), args.porta_inmet),
+        await iniciar_stub(criar_stub_nominatim(**falhas), args.porta_nominatim),
+        await iniciar_stub(criar_stub_elevacao(**falhas), args.porta_elevacao),
+    ]
+
+    processo = None
+    base_url = args.base_url
+    try:
+        if base_url is None:
+            env = {
+                **os.environ,
+                "INMET_URL": f"http://127.0.0.1:{args.porta_inmet}/dadoshistoricos",
+                "NOMINATIM_DOMAIN": f"127.0.0.1:{args.porta_nominatim}",
+                "NOMINATIM_SCHEME": "http",
+                "ELEVATION_URL": f"http://127.0.0.1:{args.porta_elevacao}/api/v1/lookup",
+                # Os stubs locais não têm limite de uso; o teste mede a API, não o limitador
+                "NOMINATIM_TAXA": "1000",
+                "ELEVATION_TAXA": "1000",
+            }
+            processo = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(args.porta_api)],
+                env=env,
+            )
+            base_url = f"http://127.0.0.1:{args.porta_api}"
+        await _aguardar_api(base_url)
+
+        taxas = [float(t) for t in args.taxas.split(",")]
+        resumos = await executar_rampa(base_url, _alvos(), taxas, args.duracao, timeout=args.timeout)
+        _imprimir(resumos)
+        if args.saida:
+            with open(args.saida, "w") as f:
+                json.dump(resumos, f, indent=2)
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+        for runner in runners:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga da API com serviços externos simulados")
+    parser.add_argument("--base-url", default=None, help="API já em execução (não inicia uma nova)")
+    parser.add_argument("--taxas", default="5,10,20,40", help="Taxas de chegada (req/s) de cada estágio")
+    parser.add_argument("--duracao", type=float, default=30.0, help="Duração de cada estágio (s)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--latencia-ms", type=float, default=50.0, help="Latência fixa dos stubs")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="Latência aleatória adicional dos stubs")
+    parser.add_argument("--taxa-falha", type=float, default=0.0, help="Fração de respostas 503 dos stubs")
+    parser.add_argument("--anos", default="2023,2024", help="Anos servidos pelo stub do INMET")
+    parser.add_argument("--porta-api", type=int, default=8090)
+    parser.add_argument("--porta-inmet", type=int, default=9101)
+    parser.add_argument("--porta-nominatim", type=int, default=9102)
+    parser.add_argument("--porta-elevacao", type=int, default=9103)
+    parser.add_argument("--saida", default=None, help="Arquivo JSON para salvar o relatório")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,120 @@
+import time
+import random
+import asyncio
+from dataclasses import dataclass, field
+
+import aiohttp
+import numpy as np
+
+
+@dataclass
+class Alvo:
+    """
+    Endpoint exercitado no teste de carga. 'caminho' pode ser uma função que gera o caminho
+    a cada requisição (ex.: endereços diferentes no /geocode).
+    """
+    nome: str
+    caminho: object
+    peso: float = 1.0
+    metodo: str = "GET"
+    corpo: object = None
+
+
+@dataclass
+class ResultadoEstagio:
+    taxa_alvo: float
+    duracao: float
+    latencias: dict = field(default_factory=dict)
+    erros: dict = field(default_factory=dict)
+    descartadas: int = 0
+
+    def resumo(self) -> dict:
+        total = sum(len(v) for v in self.latencias.values())
+        por_endpoint = {}
+        for nome, valores in self.latencias.items():
+            lat = np.array(valores) * 1000
+            n_erros = self.erros.get(nome, 0)
+            por_endpoint[nome] = {
+                "requisicoes": len(valores),
+                "p50_ms": round(float(np.percentile(lat, 50)), 1),
+                "p95_ms": round(float(np.percentile(lat, 95)), 1),
+                "p99_ms": round(float(np.percentile(lat, 99)), 1),
+                "taxa_erro": round(n_erros / len(valores), 4),
+            }
+        return {
+            "taxa_alvo_rps": self.taxa_alvo,
+            "vazao_rps": round(total / self.duracao, 1),
+            "taxa_erro": round(sum(self.erros.values()) / total, 4) if total else 0.0,
+            "descartadas": self.descartadas,
+            "endpoints": por_endpoint,
+        }
+
+
+async def _disparar(session, base_url: str, alvo: Alvo, resultado: ResultadoEstagio, timeout: float):
+    caminho = alvo.caminho() if callable(alvo.caminho) else alvo.caminho
+    inicio = time.perf_counter()
+    erro = False
+    try:
+        async with session.request(
+            alvo.metodo, f"{base_url}{caminho}", json=alvo.corpo,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            await response.read()
+            erro = response.status >= 500
+    except Exception:
+        erro = True
+    resultado.latencias.setdefault(alvo.nome, []).append(time.perf_counter() - inicio)
+    if erro:
+        resultado.erros[alvo.nome] = resultado.erros.get(alvo.nome, 0) + 1
+
+
+async def executar_estagio(
+    base_url: str,
+    alvos: list[Alvo],
+    taxa: float,
+    duracao: float,
+    max_em_voo: int = 1000,
+    timeout: float = 30.0,
+) -> ResultadoEstagio:
+    """
+    Gerador de carga em malha aberta: as chegadas seguem um processo de Poisson com a taxa
+    pedida (req/s), independentemente do tempo de resposta. Requisições que excederiam
+    'max_em_voo' simultâneas são descartadas e contabilizadas.
+    """
+    resultado = ResultadoEstagio(taxa_alvo=taxa, duracao=duracao)
+    pesos = [a.peso for a in alvos]
+    conector = aiohttp.TCPConnector(limit=max_em_voo)
+    tarefas = set()
+
+    async with aiohttp.ClientSession(connector=conector) as session:
+        inicio = time.perf_counter()
+        proxima = inicio
+        while True:
+            proxima += random.expovariate(taxa)
+            if proxima - inicio >= duracao:
+                break
+            espera = proxima - time.perf_counter()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            if len(tarefas) >= max_em_voo:
+                resultado.descartadas += 1
+                continue
+            alvo = random.choices(alvos, weights=pesos)[0]
+            tarefa = asyncio.create_task(_disparar(session, base_url, alvo, resultado, timeout))
+            tarefas.add(tarefa)
+            tarefa.add_done_callback(tarefas.discard)
+        if tarefas:
+            await asyncio.gather(*tarefas)
+        resultado.duracao = time.perf_counter() - inicio
+    return resultado
+
+
+async def executar_rampa(base_url: str, alvos: list[Alvo], taxas: list[float], duracao: float, **kwargs) -> list[dict]:
+    """
+    Executa um estágio por taxa (em ordem crescente) e retorna o resumo de cada um.
+    """
+    resumos = []
+    for taxa in taxas:
+        estagio = await executar_estagio(base_url, alvos, taxa, duracao, **kwargs)
+        resumos.append(estagio.resumo())
+    return resumos
@@ -0,0 +1,187 @@
+import io
+import asyncio
+import random
+import zipfile
+import hashlib
+from functools import lru_cache
+
+import numpy as np
+from aiohttp import web
+
+# Estações fictícias usadas nos arquivos gerados: (região, UF, nome, código, lat, lon, altitude)
+ESTACOES_FAKE = [
+    ("N", "AM", "MANAUS", "A101", -3.10, -60.02, 61.25),
+    ("NE", "PE", "RECIFE", "A301", -8.06, -34.96, 10.00),
+    ("CO", "DF", "BRASILIA", "A001", -15.79, -47.93, 1160.96),
+    ("SE", "SP", "SAO PAULO - MIRANTE", "A701", -23.50, -46.62, 785.16),
+    ("S", "RS", "PORTO ALEGRE", "A801", -30.05, -51.17, 46.97),
+]
+
+CABECALHO_DADOS = (
+    "Data;Hora UTC;PRECIPITAÇÃO TOTAL, HORÁRIO (mm);RADIACAO GLOBAL (Kj/m²);"
+    "TEMPERATURA DO AR - BULBO SECO, HORARIA (°C);UMIDADE RELATIVA DO AR, HORARIA (%);"
+    "VENTO, VELOCIDADE HORARIA (m/s);"
+)
+
+
+def _formatar(valores: np.ndarray) -> list[str]:
+    return [f"{v:.1f}".replace(".", ",") for v in valores]
+
+
+def _csv_estacao(estacao: tuple, ano: int) -> bytes:
+    """
+    Gera um CSV no layout do INMET (8 linhas de metadados + dados horários) com valores sintéticos.
+    """
+    regiao, uf, nome, codigo, lat, lon, alt = estacao
+    rng = np.random.default_rng(int.from_bytes(hashlib.sha256(f"{codigo}{ano}".encode()).digest()[:4], "big"))
+    dias = np.arange(f"{ano}-01-01", f"{ano + 1}-01-01", dtype="datetime64[D]")
+    horas = np.arange(24)
+    n = len(dias) * 24
+
+    # Radiação em forma de sino em torno de 15h UTC (meio-dia local), nula à noite
+    hora = np.tile(horas, len(dias))
+    radiacao = np.clip(3200 * np.sin(np.pi * (hora - 9) / 12), 0, None) * rng.uniform(0.3, 1.0, n)
+    temperatura = 25 + 5 * np.sin(np.pi * (hora - 9) / 12) + rng.normal(0, 1.5, n)
+    umidade = np.clip(75 - 15 * np.sin(np.pi * (hora - 9) / 12) + rng.normal(0, 5, n), 10, 100)
+    precipitacao = np.where(rng.random(n) < 0.05, rng.gamma(1.5, 2.0, n), 0)
+    vento = np.abs(rng.normal(2.0, 1.0, n))
+
+    linhas = [
+        f"REGIAO:;{regiao}",
+        f"UF:;{uf}",
+        f"ESTACAO:;{nome}",
+        f"CODIGO (WMO):;{codigo}",
+        f"LATITUDE:;{str(lat).replace('.', ',')}",
+        f"LONGITUDE:;{str(lon).replace('.', ',')}",
+        f"ALTITUDE:;{str(alt).replace('.', ',')}",
+        "DATA DE FUNDACAO:;01/01/00",
+        CABECALHO_DADOS,
+    ]
+    datas = np.repeat(dias, 24)
+    colunas = zip(
+        (str(d).replace("-", "/") for d in datas),
+        (f"{h:02d}00 UTC" for h in hora),
+        _formatar(precipitacao),
+        _formatar(radiacao),
+        _formatar(temperatura),
+        _formatar(umidade),
+        _formatar(vento),
+    )
+    linhas.extend(";".join(valores) + ";" for valores in colunas)
+    return "\n".join(linhas).encode("latin1")
+
+
+@lru_cache(maxsize=8)
+def zip_ano(ano: int) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        for estacao in ESTACOES_FAKE:
+            nome = f"{ano}/INMET_{estacao[0]}_{estacao[1]}_{estacao[3]}_{estacao[2]}.CSV"
+            zf.writestr(nome, _csv_estacao(estacao, ano))
+    return buffer.getvalue()
+
+
+def _middleware_falhas(latencia_ms: float = 0, jitter_ms: float = 0, taxa_falha: float = 0):
+    """
+    Injeta latência (fixa + aleatória) e falhas (HTTP 503) em todas as rotas do stub.
+    """
+
+    @web.middleware
+    async def middleware(request, handler):
+        atraso = latencia_ms + random.uniform(0, jitter_ms)
+        if atraso > 0:
+            await asyncio.sleep(atraso / 1000)
+        if random.random() < taxa_falha:
+            return web.Response(status=503, text="falha injetada")
+        return await handler(request)
+
+    return middleware
+
+
+def criar_stub_inmet(anos: list[int], **falhas) -> web.Application:
+    """
+    Portal de dados históricos do INMET: página com links anuais e os arquivos zip.
+    """
+
+    async def pagina(request):
+        links = "".join(
+            f'<a href="/uploads/dadoshistoricos/{ano}.zip">ANO {ano} (AUTOMÁTICA)</a>' for ano in anos
+        )
+        return web.Response(text=f"<html><body>{links}</body></html>", content_type="text/html")
+
+    async def arquivo(request):
+        ano = int(request.match_info["ano"])
+        if ano not in anos:
+            raise web.HTTPNotFound()
+        return web.Response(body=zip_ano(ano), content_type="application/zip")
+
+    app = web.Application(middlewares=[_middleware_falhas(**falhas)])
+    app.router.add_get("/dadoshistoricos", pagina)
+    app.router.add_get("/uploads/dadoshistoricos/{ano}.zip", arquivo)
+    return app
+
+
+def _coordenadas_endereco(endereco: str) -> tuple[float, float]:
+    """
+    Coordenadas determinísticas dentro do Brasil para qualquer endereço.
+    """
+    digest = hashlib.sha256(endereco.encode()).digest()
+    lat = -33.0 + 37.0 * int.from_bytes(digest[:4], "big") / 2 ** 32
+    lon = -73.0 + 38.0 * int.from_bytes(digest[4:8], "big") / 2 ** 32
+    return lat, lon
+
+
+def criar_stub_nominatim(**falhas) -> web.Application:
+    """
+    API de busca do Nominatim (/search), com resultados determinísticos por endereço.
+    """
+
+    async def busca(request):
+        endereco = request.query.get("q", "")
+        if not endereco or endereco.lower().startswith("inexistente"):
+            return web.json_response([])
+        lat, lon = _coordenadas_endereco(endereco)
+        return web.json_response([{
+            "place_id": int(hashlib.sha256(endereco.encode()).hexdigest()[:8], 16),
+            "lat": f"{lat:.7f}",
+            "lon": f"{lon:.7f}",
+            "display_name": f"{endereco}, Brasil",
+            "class": "place",
+            "type": "city",
+            "importance": 0.5,
+        }])
+
+    app = web.Application(middlewares=[_middleware_falhas(**falhas)])
+    app.router.add_get("/search", busca)
+    return app
+
+
+def criar_stub_elevacao(**falhas) -> web.Application:
+    """
+    API do open-elevation (/api/v1/lookup), por GET (locations=lat,lon|...) ou POST em lote.
+    """
+
+    def _resultado(lat: float, lon: float) -> dict:
+        return {"latitude": lat, "longitude": lon, "elevation": round(abs(lat * 31 + lon * 7) % 1200, 1)}
+
+    async def lookup_get(request):
+        pontos = [p.split(",") for p in request.query.get("locations", "").split("|") if p]
+        return web.json_response({"results": [_resultado(float(a), float(b)) for a, b in pontos]})
+
+    async def lookup_post(request):
+        corpo = await request.json()
+        return web.json_response({
+            "results": [_resultado(p["latitude"], p["longitude"]) for p in corpo.get("locations", [])]
+        })
+
+    app = web.Application(middlewares=[_middleware_falhas(**falhas)])
+    app.router.add_get("/api/v1/lookup", lookup_get)
+    app.router.add_post("/api/v1/lookup", lookup_post)
+    return app
+
+
+async def iniciar_stub(app: web.Application, porta: int, host: str = "127.0.0.1") -> web.AppRunner:
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, porta).start()
+    return runner
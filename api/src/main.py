@@ -1,13 +1,43 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from src.api.endpoints import router as api_router
+from src.core import http_client
+from src.core.compressao import GZipMiddleware
+from src.core.config import PROFILING_ENABLED
+from src.core.profiling import ProfilingMiddleware
+from src.services.process_supervisor import streamlit_supervisor
+from src.services.materialization_service import pre_materializador
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await http_client.startup()
+    pre_materializador.start()
+    try:
+        yield
+    finally:
+        await pre_materializador.stop()
+        await streamlit_supervisor.stop()
+        await http_client.shutdown()
+
 
 app = FastAPI(
     title="API Simples",
     description="API com endpoints para health check, sincronização e download de dados",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Compressão das respostas maiores (principalmente JSON); streams NDJSON/SSE não são comprimidos
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Profiling por requisição (opt-in); quando desativado, nenhum custo por requisição
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 app.include_router(api_router)
 
 # if __name__ == "__main__":  
@@ -0,0 +1,187 @@
+import sys
+import json
+from pathlib import Path
+
+import numpy as np
+
+from src.core.config import COMPILED_MODEL_DIR
+
+# Objetivos cuja saída é a soma das folhas mais o base_score (função de ligação identidade)
+OBJETIVOS_SUPORTADOS = {"reg:squarederror", "reg:absoluteerror", "reg:pseudohubererror", "reg:squaredlogerror"}
+
+ARRAYS = ["feature", "limiar", "esquerda", "direita", "ausente", "valor"]
+
+
+class EnsembleNumpy:
+    """
+    Ensemble de árvores (XGBoost) achatado em arrays de nós com shape (n_arvores, n_nos_max).
+    A avaliação desce todas as árvores de um lote de linhas ao mesmo tempo, um nível por iteração.
+    Nas folhas, os três filhos apontam para o próprio nó, então descer além da folha não muda nada.
+    """
+
+    def __init__(self, feature, limiar, esquerda, direita, ausente, valor, base_score, profundidade, feature_names):
+        self.feature = feature
+        self.limiar = limiar
+        self.esquerda = esquerda
+        self.direita = direita
+        self.ausente = ausente
+        self.valor = valor
+        self.base_score = base_score
+        self.profundidade = profundidade
+        self.feature_names = feature_names
+
+    @property
+    def n_arvores(self) -> int:
+        return self.feature.shape[0]
+
+    def _prever_bloco(self, X: np.ndarray) -> np.ndarray:
+        n = X.shape[0]
+        arvores = np.arange(self.n_arvores)[None, :]
+        linhas = np.arange(n)[:, None]
+        no = np.zeros((n, self.n_arvores), dtype=np.int32)
+
+        for _ in range(self.profundidade):
+            feature = self.feature[arvores, no]
+            x = X[linhas, np.maximum(feature, 0)]
+            proximo = np.where(x < self.limiar[arvores, no], self.esquerda[arvores, no], self.direita[arvores, no])
+            no = np.where(np.isnan(x), self.ausente[arvores, no], proximo)
+
+        return self.base_score + self.valor[arvores, no].sum(axis=1, dtype=np.float64)
+
+    def predict(self, X, tamanho_bloco: int = 2048) -> np.ndarray:
+        """
+        Previsão em lote. X pode ser um DataFrame (colunas reordenadas pelos nomes das features)
+        ou um array já na ordem das features do modelo.
+        """
+        if hasattr(X, "columns"):
+            X = X[self.feature_names].to_numpy(dtype=np.float32)
+        X = np.asarray(X, dtype=np.float32)
+        saida = np.empty(X.shape[0], dtype=np.float64)
+        for inicio in range(0, X.shape[0], tamanho_bloco):
+            fim = inicio + tamanho_bloco
+            saida[inicio:fim] = self._prever_bloco(X[inicio:fim])
+        return saida.astype(np.float32)
+
+
+def _ler_base_score(valor) -> float:
+    # Versões recentes do XGBoost gravam o base_score como vetor ("[4.2E2]")
+    return float(str(valor).strip("[]").split(",")[0])
+
+
+def exportar_ensemble(modelo, destino: Path = COMPILED_MODEL_DIR) -> Path:
+    """
+    Achata as árvores de um XGBRegressor (ou Booster) em arrays .npy que podem ser abertos com mmap.
+    Usa o modelo em JSON do próprio XGBoost, que preserva os limiares em float32 exatos.
+    """
+    booster = modelo.get_booster() if hasattr(modelo, "get_booster") else modelo
+    config = json.loads(booster.save_raw("json"))
+    learner = config["learner"]
+
+    objetivo = learner["objective"]["name"]
+    if objetivo not in OBJETIVOS_SUPORTADOS:
+        raise Exception(f"Objetivo não suportado: {objetivo}")
+
+    arvores = learner["gradient_booster"]["model"]["trees"]
+    # Com early stopping, a previsão do XGBoost usa apenas as árvores até a melhor iteração
+    melhor_iteracao = getattr(modelo, "best_iteration", None)
+    if melhor_iteracao is not None:
+        arvores = arvores[:melhor_iteracao + 1]
+
+    n_nos = max(len(a["left_children"]) for a in arvores)
+    n_arvores = len(arvores)
+    feature = np.full((n_arvores, n_nos), -1, dtype=np.int16)
+    limiar = np.zeros((n_arvores, n_nos), dtype=np.float32)
+    esquerda = np.tile(np.arange(n_nos, dtype=np.int32), (n_arvores, 1))
+    direita = esquerda.copy()
+    ausente = esquerda.copy()
+    valor = np.zeros((n_arvores, n_nos), dtype=np.float32)
+    profundidade = 0
+
+    for t, arvore in enumerate(arvores):
+        filhos_esq = np.array(arvore["left_children"], dtype=np.int32)
+        filhos_dir = np.array(arvore["right_children"], dtype=np.int32)
+        condicoes = np.array(arvore["split_conditions"], dtype=np.float32)
+        indices = np.array(arvore["split_indices"], dtype=np.int16)
+        padrao_esq = np.array(arvore["default_left"], dtype=bool)
+        n = len(filhos_esq)
+        internos = filhos_esq != -1
+
+        feature[t, :n] = np.where(internos, indices, -1)
+        limiar[t, :n] = np.where(internos, condicoes, 0)
+        valor[t, :n] = np.where(internos, 0, condicoes)
+        esquerda[t, :n] = np.where(internos, filhos_esq, np.arange(n))
+        direita[t, :n] = np.where(internos, filhos_dir, np.arange(n))
+        ausente[t, :n] = np.where(padrao_esq, esquerda[t, :n], direita[t, :n])
+
+        # Profundidade da árvore (os filhos sempre têm índice maior que o pai)
+        nivel = np.zeros(n, dtype=np.int32)
+        for no in np.flatnonzero(internos):
+            nivel[filhos_esq[no]] = nivel[filhos_dir[no]] = nivel[no] + 1
+        profundidade = max(profundidade, int(nivel.max()))
+
+    destino.mkdir(parents=True, exist_ok=True)
+    for nome, array in zip(ARRAYS, [feature, limiar, esquerda, direita, ausente, valor]):
+        np.save(destino / f"{nome}.npy", array)
+    with open(destino / "meta.json", "w") as f:
+        json.dump({
+            "base_score": _ler_base_score(learner["learner_model_param"]["base_score"]),
+            "profundidade": profundidade,
+            "feature_names": learner.get("feature_names") or [],
+            "objetivo": objetivo,
+            "n_arvores": n_arvores,
+        }, f)
+    return destino
+
+
+def carregar_ensemble(origem: Path = COMPILED_MODEL_DIR) -> EnsembleNumpy | None:
+    """
+    Abre o ensemble compilado em modo memory-mapped. Retorna None se ele não existir.
+    """
+    if not (origem / "meta.json").exists():
+        return None
+    with open(origem / "meta.json") as f:
+        meta = json.load(f)
+    arrays = {nome: np.load(origem / f"{nome}.npy", mmap_mode="r") for nome in ARRAYS}
+    return EnsembleNumpy(
+        **arrays,
+        base_score=meta["base_score"],
+        profundidade=meta["profundidade"],
+        feature_names=meta["feature_names"],
+    )
+
+
+def verificar_equivalencia(modelo, ensemble: EnsembleNumpy, X, tolerancia: float = 1e-3) -> float:
+    """
+    Compara as previsões do XGBoost e do ensemble compilado. Retorna a maior diferença absoluta
+    e levanta exceção se ela passar da tolerância (relativa à escala das previsões).
+    """
+    esperado = np.asarray(modelo.predict(X), dtype=np.float64)
+    obtido = ensemble.predict(X).astype(np.float64)
+    diferenca = float(np.max(np.abs(esperado - obtido))) if len(esperado) else 0.0
+    escala = max(1.0, float(np.max(np.abs(esperado)))) if len(esperado) else 1.0
+    if diferenca > tolerancia * escala:
+        raise Exception(f"Ensemble compilado diverge do XGBoost (diferença máxima {diferenca})")
+    return diferenca
+
+
+if __name__ == "__main__":
+    # Uso: python -m src.model.arvores  (exporta o modelo atual e valida contra o XGBoost)
+    from src.model.model import carregar_modelo, montar_features
+
+    modelo, _ = carregar_modelo()
+    destino = exportar_ensemble(modelo)
+    ensemble = carregar_ensemble(destino)
+
+    rng = np.random.default_rng(0)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    dia_ano = rng.integers(1, 366, n)
+    mes = np.minimum((dia_ano - 1) // 31 + 1, 12)
+    clima = np.column_stack([
+        rng.uniform(10, 35, n), rng.gamma(0.5, 2, n), rng.uniform(30, 100, n), rng.uniform(0, 6, n)
+    ])
+    X = montar_features(
+        rng.uniform(-33.5, 5.5, n), rng.uniform(-74, -34, n), rng.uniform(0, 1500, n),
+        mes, dia_ano, rng.integers(0, 24, n), clima
+    )
+    diferenca = verificar_equivalencia(modelo, ensemble, X)
+    print(f"Ensemble exportado em {destino} ({ensemble.n_arvores} árvores); diferença máxima: {diferenca:.6g}")
@@ -1,152 +1,356 @@
+import json
 import pickle
+import hashlib
 import pandas as pd
 import numpy as np
 from datetime import datetime   
+from functools import lru_cache
+from src.core.config import MODEL_DIR, COMPILED_MODEL_DIR, MODEL_ANOS_TREINO
+from src.model.arvores import carregar_ensemble
+from src.model.solar import horas_diurnas
+from src.services.elevation_service import altitude as altitude_local
+from src.services.climatology_service import clima_para_pontos
 
+# Colunas meteorológicas, normalizadas no treinamento pelo StandardScaler salvo em features_info.pkl
+COLUNAS_CLIMA = [
+    'temperatura_do_ar___bulbo_seco_horaria_degc',
+    'precipitacao_total_horario_mm',
+    'umidade_relativa_do_ar_horaria_percent',
+    'vento_velocidade_horaria_m_s',
+]
+
+# Muda quando a representação das features muda, para invalidar resultados já derivados delas
+VERSAO_FEATURES = 2
+
+# Lista de features que o modelo espera, na ordem usada no treinamento
+FEATURES = [
+    'latitude', 'longitude', 'altitude',
+    'mes', 'dia_ano', 'hora',
+    'mes_sen', 'mes_cos', 
+    'hora_sen', 'hora_cos',
+    'dia_ano_sen', 'dia_ano_cos',
+    'temperatura_do_ar___bulbo_seco_horaria_degc',
+    'precipitacao_total_horario_mm',
+    'umidade_relativa_do_ar_horaria_percent',
+    'vento_velocidade_horaria_m_s',
+    'dist_equador', 'lat_mes_interact', 'declinacao_solar', 
+    'elevacao_solar_approx', 'lat_hora_interact'
+]
+
+# A média diária era calculada sobre a janela fixa das 6h às 18h (13 horas); a soma das
+# horas diurnas é dividida pelo mesmo número de horas para manter a calibração
+HORAS_REFERENCIA = 13
+
+# Unidades da irradiação diária:
+# - 'indice': escala histórica do /model (calibração do notebook): soma horária em kJ/m²
+#   / 13 horas / 3,6 / 365 × 2,8. Não é uma grandeza física; é mantida para compatibilidade
+#   com o front e os valores já publicados.
+# - 'kwh': irradiação física em kWh/m²/dia (soma horária em kJ/m² / 3600), a mesma unidade
+#   usada pela simulação fotovoltaica (/pv/simulate).
+UNIDADES_IRRADIACAO = ("indice", "kwh")
+ESCALA_INDICE = 1 / HORAS_REFERENCIA / 3.6 / 365 * 2.8
+ESCALA_KWH = 1 / 3600
+
+@lru_cache(maxsize=1)
 def carregar_modelo():
     """
-    Carrega o modelo de radiação solar e as informações das features
+    Carrega o modelo de radiação solar e as informações das features.
+    O resultado fica em cache, então o pickle é lido uma única vez por processo.
     
     Returns:
         tuple: (modelo, feature_info)
     """
     # Carregar o modelo
-    with open('/app/src/model/modelo_radiacao_solar.pkl', 'rb') as f:
+    with open(MODEL_DIR / 'modelo_radiacao_solar.pkl', 'rb') as f:
         modelo = pickle.load(f)
     
-    # Carregar informações das features
-    with open('/app/src/model/features_info.pkl', 'rb') as f:
-        feature_info = pickle.load(f)
+    return modelo, carregar_info_features()
+
+@lru_cache(maxsize=1)
+def carregar_info_features():
+    """
+    Informações das features do treinamento (nomes e o StandardScaler das colunas
+    meteorológicas). Separado do modelo para que o ensemble compilado não precise do xgboost.
     
-    return modelo, feature_info
+    Returns:
+        dict: {'feature_names': [...], 'scaler': StandardScaler}
+    """
+    with open(MODEL_DIR / 'features_info.pkl', 'rb') as f:
+        return pickle.load(f)
 
-def calcular_media_diaria(latitude, longitude, data=None, altitude=500):
+def versao_publicada():
     """
-    Calcula a média diária de radiação solar para uma localização específica
+    Nome da versão publicada pela atualização incremental (src.model.treino), se houver.
+    
+    Returns:
+        str ou None
+    """
+    arquivo = MODEL_DIR / 'versao_atual.txt'
+    if not arquivo.exists():
+        return None
+    return arquivo.read_text().strip() or None
+
+def diretorio_compilado():
+    """
+    Diretório do ensemble compilado em uso: o da versão publicada ou o padrão.
+    """
+    versao = versao_publicada()
+    if versao is None:
+        return COMPILED_MODEL_DIR
+    return MODEL_DIR / 'versoes' / versao / 'compilado'
+
+@lru_cache(maxsize=1)
+def carregar_preditor():
+    """
+    Retorna o preditor usado nas previsões: o ensemble compilado em NumPy, se tiver sido
+    exportado (não importa o xgboost nem depende do pickle), ou o modelo original.
+    
+    Returns:
+        objeto com método predict(DataFrame)
+    """
+    ensemble = carregar_ensemble(diretorio_compilado())
+    if ensemble is not None:
+        if not ensemble.feature_names:
+            ensemble.feature_names = FEATURES
+        return ensemble
+    modelo, _ = carregar_modelo()
+    return modelo
+
+@lru_cache(maxsize=1)
+def versao_modelo():
+    """
+    Identificador curto do modelo em uso: o nome da versão publicada ou, no modelo original,
+    o hash do conteúdo dos artefatos.
+    Usado para invalidar resultados derivados do modelo, como os tiles de irradiação.
+    
+    Returns:
+        str
+    """
+    versao = versao_publicada()
+    if versao is not None:
+        return versao
+    hash_ = hashlib.sha256()
+    for arquivo in [MODEL_DIR / 'modelo_radiacao_solar.pkl', COMPILED_MODEL_DIR / 'meta.json', COMPILED_MODEL_DIR / 'valor.npy']:
+        if arquivo.exists():
+            with open(arquivo, 'rb') as f:
+                for bloco in iter(lambda: f.read(1 << 20), b''):
+                    hash_.update(bloco)
+    return hash_.hexdigest()[:12]
+
+def anos_treino_modelo(versao=None):
+    """
+    Anos de observações usados no treinamento do modelo: os do treino original
+    (MODEL_ANOS_TREINO) mais os anos de cada atualização incremental na cadeia de versões.
+    
+    Returns:
+        set[str]
+    """
+    anos = set(MODEL_ANOS_TREINO)
+    versao = versao or versao_publicada()
+    vistos = set()
+    while versao is not None and versao not in vistos:
+        vistos.add(versao)
+        relatorio = MODEL_DIR / 'versoes' / versao / 'relatorio.json'
+        if not relatorio.exists():
+            break
+        with open(relatorio) as f:
+            dados = json.load(f)
+        anos.update(str(a) for a in dados.get('anos', []))
+        versao = dados.get('versao_base')
+    return anos
+
+def recarregar_modelo():
+    """
+    Descarta o preditor e a versão em cache (após publicar uma nova versão).
+    """
+    carregar_preditor.cache_clear()
+    versao_modelo.cache_clear()
+
+def montar_features(latitude, longitude, altitude, mes, dia_ano, hora, clima):
+    """
+    Monta o DataFrame de features do modelo de forma vetorizada, na representação do
+    treinamento (estudo/main.ipynb): meteorologia normalizada pelo StandardScaler salvo
+    em features_info.pkl e as mesmas fórmulas das features derivadas.
     
     Args:
-        latitude: Latitude em graus decimais (string ou float)
-        longitude: Longitude em graus decimais (string ou float)
-        data: Data específica (string 'YYYY-MM-DD' ou objeto datetime)
-        altitude: Altitude em metros
+        latitude, longitude, altitude, mes, dia_ano, hora: Arrays (ou escalares) com shapes compatíveis
+        clima: Array (..., 4) com temperatura (°C), precipitação (mm), umidade (%) e vento (m/s)
         
     Returns:
-        float: Média diária de radiação solar em kWh/m²
+        pd.DataFrame: Uma linha por combinação, com as colunas em FEATURES
     """
-    # Carregar o modelo
-    modelo, _ = carregar_modelo()
+    latitude, longitude, altitude, mes, dia_ano, hora = [
+        np.ravel(v) for v in np.broadcast_arrays(latitude, longitude, altitude, mes, dia_ano, hora)
+    ]
+    clima = np.asarray(clima, dtype=np.float64).reshape(-1, 4)
     
-    # Se não foi fornecida uma data, usar a data atual
-    if data is None:
-        data = datetime.now().date()
-    elif isinstance(data, str):
-        data = datetime.strptime(data, '%Y-%m-%d').date()
-    
-    # Extrair componentes temporais
-    ano = data.year
-    mes = data.month
-    dia = data.day
-    dia_ano = data.timetuple().tm_yday
-    
-    # Criar features cíclicas
-    mes_sen = np.sin(2 * np.pi * mes / 12)
-    mes_cos = np.cos(2 * np.pi * mes / 12)
-    dia_ano_sen = np.sin(2 * np.pi * dia_ano / 365)
-    dia_ano_cos = np.cos(2 * np.pi * dia_ano / 365)
+    df = pd.DataFrame({
+        'latitude': latitude.astype(np.float64),
+        'longitude': longitude.astype(np.float64),
+        'altitude': altitude.astype(np.float64),
+        'mes': mes,
+        'dia_ano': dia_ano,
+        'hora': hora,
+        # Features cíclicas
+        'mes_sen': np.sin(2 * np.pi * mes / 12),
+        'mes_cos': np.cos(2 * np.pi * mes / 12),
+        'hora_sen': np.sin(2 * np.pi * hora / 24),
+        'hora_cos': np.cos(2 * np.pi * hora / 24),
+        'dia_ano_sen': np.sin(2 * np.pi * dia_ano / 365),
+        'dia_ano_cos': np.cos(2 * np.pi * dia_ano / 365),
+        # Valores meteorológicos (climatologia da estação mais próxima ou observados)
+        **dict(zip(COLUNAS_CLIMA, clima.T)),
+    })
+    df[COLUNAS_CLIMA] = carregar_info_features()['scaler'].transform(df[COLUNAS_CLIMA])
     
-    # Converter latitude e longitude para float se forem strings
-    if isinstance(latitude, str):
-        latitude = float(latitude.replace(',', '.'))
-    if isinstance(longitude, str):
-        longitude = float(longitude.replace(',', '.'))
+    # Distância do equador (valor absoluto da latitude)
+    df['dist_equador'] = np.abs(latitude)
     
-    # Resultados para diferentes horas do dia
-    resultados = []
+    # Interação latitude-mês (captura variação sazonal por latitude)
+    df['lat_mes_interact'] = latitude * np.cos(2 * np.pi * mes / 12)
     
-    # Prever para cada hora do dia (das 6h às 18h)
-    for hora in range(6, 19):
-        # Criar features cíclicas para hora
-        hora_sen = np.sin(2 * np.pi * hora / 24)
-        hora_cos = np.cos(2 * np.pi * hora / 24)
-        
-        # Definir valores meteorológicos médios para o mês
-        if mes >= 4 and mes <= 9:  # Meses mais frios no hemisfério sul
-            temperatura = 20
-            precipitacao = 0
-            umidade = 60
-        else:  # Meses mais quentes no hemisfério sul
-            temperatura = 28
-            precipitacao = 5
-            umidade = 75
-        
-        # Criar dados para previsão
-        dados = {
-            'latitude': [latitude],
-            'longitude': [longitude],
-            'altitude': [altitude],
-            'mes': [mes],
-            'dia_ano': [dia_ano],
-            'hora': [hora],
-            'mes_sen': [mes_sen],
-            'mes_cos': [mes_cos],
-            'hora_sen': [hora_sen],
-            'hora_cos': [hora_cos],
-            'dia_ano_sen': [dia_ano_sen],
-            'dia_ano_cos': [dia_ano_cos],
-            'temperatura_do_ar___bulbo_seco_horaria_degc': [temperatura],
-            'precipitacao_total_horario_mm': [precipitacao],
-            'umidade_relativa_do_ar_horaria_percent': [umidade],
-            'vento_velocidade_horaria_m_s': [2.0],  # Valor médio
-        }
-        
-        # Criar DataFrame
-        df_previsao = pd.DataFrame(dados)
-        
-        # Adicionar features derivadas que o modelo espera
-        # Distância do equador (valor absoluto da latitude)
-        df_previsao['dist_equador'] = np.abs(latitude)
-        
-        # Interação latitude-mês (captura variação sazonal por latitude)
-        df_previsao['lat_mes_interact'] = latitude * np.cos(2 * np.pi * mes / 12)
-        
-        # Declinação solar (aproximada)
-        declinacao = 23.45 * np.sin(np.radians(360/365 * (dia_ano - 81)))
-        df_previsao['declinacao_solar'] = declinacao
-        
-        # Elevação solar aproximada ao meio-dia
-        elevacao_solar = 90 - np.abs(latitude - declinacao)
-        df_previsao['elevacao_solar_approx'] = elevacao_solar
+    # Declinação solar (aproximada)
+    declinacao = 23.45 * np.sin(np.radians(360/365 * (dia_ano - 81)))
+    df['declinacao_solar'] = declinacao
+    
+    # Elevação solar aproximada ao meio-dia
+    df['elevacao_solar_approx'] = 90 - np.abs(latitude - declinacao)
+    
+    # Interação latitude-hora (mesma fórmula do treinamento: negativa antes do meio-dia)
+    df['lat_hora_interact'] = latitude * np.sin(2 * np.pi * (hora - 12) / 24)
+    
+    return df[FEATURES]
+
+def prever_radiacao(df_previsao):
+    """
+    Faz a previsão de radiação solar (kJ/m²) para todas as linhas de uma vez
+    
+    Args:
+        df_previsao: DataFrame gerado por montar_features
         
-        # Interação latitude-hora
-        df_previsao['lat_hora_interact'] = latitude * np.sin(np.pi * hora / 12)
+    Returns:
+        np.ndarray: Radiação prevista para cada linha
+    """
+    preditor = carregar_preditor()
+    return np.asarray(preditor.predict(df_previsao), dtype=np.float64)
+
+def _converter_data(data):
+    """
+    Converte a data para datetime.date (None = data atual, string 'YYYY-MM-DD' ou datetime)
+    """
+    if data is None:
+        return datetime.now().date()
+    if isinstance(data, str):
+        return datetime.strptime(data, '%Y-%m-%d').date()
+    if isinstance(data, datetime):
+        return data.date()
+    return data
+
+def _datas_intervalo(inicio, fim):
+    """
+    Array de datas (datetime64[D]) de 'inicio' a 'fim', inclusive
+    """
+    inicio = np.datetime64(_converter_data(inicio), 'D')
+    fim = np.datetime64(_converter_data(fim), 'D')
+    return np.arange(inicio, fim + 1, dtype='datetime64[D]')
+
+def calcular_media_diaria_intervalo(latitudes, longitudes, inicio=None, fim=None, altitudes=None):
+    """
+    Calcula a média diária de radiação solar para várias localizações em um intervalo de datas,
+    com uma única previsão para toda a grade localização × dia × hora
+    
+    Args:
+        latitudes: Array de latitudes em graus decimais
+        longitudes: Array de longitudes em graus decimais
+        inicio: Primeira data (string 'YYYY-MM-DD', datetime ou date; None = data atual)
+        fim: Última data, inclusive (None = mesma data de início)
+        altitudes: Array de altitudes em metros (se None, consulta a grade de elevação local)
         
-        # Lista de features que o modelo espera
-        features = [
-            'latitude', 'longitude', 'altitude',
-            'mes', 'dia_ano', 'hora',
-            'mes_sen', 'mes_cos', 
-            'hora_sen', 'hora_cos',
-            'dia_ano_sen', 'dia_ano_cos',
-            'temperatura_do_ar___bulbo_seco_horaria_degc',
-            'precipitacao_total_horario_mm',
-            'umidade_relativa_do_ar_horaria_percent',
-            'vento_velocidade_horaria_m_s',
-            'dist_equador', 'lat_mes_interact', 'declinacao_solar', 
-            'elevacao_solar_approx', 'lat_hora_interact'
-        ]
+    Returns:
+        tuple: (datas datetime64[D], np.ndarray (n_localizacoes, n_datas) na escala 'indice')
+    """
+    inicio = _converter_data(inicio)
+    datas = _datas_intervalo(inicio, inicio if fim is None else fim)
+    
+    # Extrair componentes temporais de todas as datas
+    anos = datas.astype('datetime64[Y]')
+    meses_dt = datas.astype('datetime64[M]')
+    mes = (meses_dt - anos).astype(np.int64) + 1
+    dia_ano = (datas - anos).astype(np.int64) + 1
+    
+    latitudes = np.atleast_1d(np.asarray(latitudes, dtype=np.float64))
+    longitudes = np.atleast_1d(np.asarray(longitudes, dtype=np.float64))
+    
+    # Altitude a partir da grade de elevação local (ou estação mais próxima)
+    if altitudes is None:
+        altitudes = altitude_local(latitudes, longitudes)
+    altitudes = np.broadcast_to(np.asarray(altitudes, dtype=np.float64), latitudes.shape)
+    
+    # Grade localização × dia × hora UTC; só as horas com sol acima do horizonte vão ao modelo
+    diurnas = horas_diurnas(latitudes[:, None], longitudes[:, None], datas[None, :])
+    i_local, i_data, hora = np.nonzero(diurnas)
+    resultados = np.zeros(diurnas.shape)
+    
+    if len(hora):
+        # Valores meteorológicos médios da estação mais próxima para o mês e a hora
+        clima = clima_para_pontos(latitudes[i_local], longitudes[i_local], mes[i_data], hora)
         
-        # Filtrar apenas as features que existem
-        features_existentes = [f for f in features if f in df_previsao.columns]
+        df_previsao = montar_features(
+            latitudes[i_local], longitudes[i_local], altitudes[i_local],
+            mes[i_data], dia_ano[i_data], hora, clima
+        )
+        resultados[i_local, i_data, hora] = prever_radiacao(df_previsao)
+    
+    # Soma das horas diurnas na escala histórica ('indice'); ver converter_unidade
+    return datas, resultados.sum(axis=2) * ESCALA_INDICE
+
+def converter_unidade(valores, unidade: str = "indice"):
+    """
+    Converte irradiações diárias da escala 'indice' (retornada pelas funções deste módulo)
+    para a unidade pedida ('indice' ou 'kwh').
+    """
+    if unidade == "indice":
+        return valores
+    if unidade == "kwh":
+        return np.asarray(valores, dtype=np.float64) * (ESCALA_KWH / ESCALA_INDICE)
+    raise ValueError(f"Unidade inválida: {unidade}. Opções: {', '.join(UNIDADES_IRRADIACAO)}")
+
+def calcular_media_diaria_locais(latitudes, longitudes, data=None, altitudes=None):
+    """
+    Calcula a média diária de radiação solar para várias localizações de uma vez
+    
+    Args:
+        latitudes: Array de latitudes em graus decimais
+        longitudes: Array de longitudes em graus decimais
+        data: Data específica (string 'YYYY-MM-DD' ou objeto datetime)
+        altitudes: Array de altitudes em metros (se None, consulta a grade de elevação local)
         
-        # Fazer previsão
-        radiacao = modelo.predict(df_previsao[features_existentes])[0]
-        resultados.append(radiacao)
+    Returns:
+        np.ndarray: Média diária de radiação solar (escala 'indice') para cada localização
+    """
+    _, medias = calcular_media_diaria_intervalo(latitudes, longitudes, data, data, altitudes)
+    return medias[:, 0]
+
+def calcular_media_diaria(latitude, longitude, data=None, altitude=None):
+    """
+    Calcula a média diária de radiação solar para uma localização específica
     
-    # Calcular média das horas diurnas e converter de kJ/m² para kWh/m²
-    # 1 kWh/m² = 3600 kJ/m²
-    media_diaria_kwh = sum(resultados) / len(resultados) / 3.6 / 365 * 2.8
+    Args:
+        latitude: Latitude em graus decimais (string ou float)
+        longitude: Longitude em graus decimais (string ou float)
+        data: Data específica (string 'YYYY-MM-DD' ou objeto datetime)
+        altitude: Altitude em metros (se None, consulta a grade de elevação local)
+        
+    Returns:
+        float: Média diária de radiação solar (escala 'indice')
+    """
+    # Converter latitude e longitude para float se forem strings
+    if isinstance(latitude, str):
+        latitude = float(latitude.replace(',', '.'))
+    if isinstance(longitude, str):
+        longitude = float(longitude.replace(',', '.'))
     
-    return media_diaria_kwh 
+    return calcular_media_diaria_locais([latitude], [longitude], data, altitude)[0]
 
 
 irradiacao_por_regiao = {
@@ -157,27 +361,39 @@ irradiacao_por_regiao = {
     "Sul": {"latitude": -30.0346, "longitude": -51.2177}         # Porto Alegre (RS)
 }
 
-def calcular_media_diaria_por_regiao():
+def calcular_media_diaria_por_regiao(data=None):
     """
     Calcula a média diária de radiação solar para cada região do Brasil
     
+    Args:
+        data: Data específica (string 'YYYY-MM-DD' ou objeto datetime; None = data atual)
+    
     Returns:
-        dict: Dicionário com médias diárias de radiação solar por região em kWh/m²/dia
+        dict: Dicionário com médias diárias de radiação solar por região (escala 'indice')
+    """
+    datas, medias = calcular_intervalo_por_regiao(data, data)
+    return medias[datas[0]]
+
+def calcular_intervalo_por_regiao(inicio=None, fim=None):
     """
-    resultado = {}
-    hoje = datetime.now().strftime('%Y-%m-%d')
+    Calcula a média diária de radiação solar de cada região do Brasil em um intervalo de datas
     
-    for regiao, coords in irradiacao_por_regiao.items():
-        latitude = coords["latitude"]
-        longitude = coords["longitude"]
-        
-        # Calcular média diária para hoje
-        media_diaria = calcular_media_diaria(latitude, longitude, data=hoje)
-        
-        # Converter para float Python nativo e arredondar
-        media_diaria = round(float(media_diaria), 2)
-        
-        # Armazenar apenas o valor da média diária
-        resultado[regiao] = media_diaria
+    Args:
+        inicio: Primeira data (None = data atual)
+        fim: Última data, inclusive (None = mesma data de início)
+    
+    Returns:
+        tuple: (lista de datas ISO, dict {data ISO: {região: média na escala 'indice'}})
+    """
+    # Todas as regiões e datas em uma única previsão
+    regioes = list(irradiacao_por_regiao.keys())
+    latitudes = [irradiacao_por_regiao[r]["latitude"] for r in regioes]
+    longitudes = [irradiacao_por_regiao[r]["longitude"] for r in regioes]
+    datas, medias = calcular_media_diaria_intervalo(latitudes, longitudes, inicio, fim)
     
-    return resultado
+    # Converter para float Python nativo e arredondar
+    datas = [str(d) for d in datas]
+    return datas, {
+        data: {regiao: round(float(media), 2) for regiao, media in zip(regioes, medias[:, j])}
+        for j, data in enumerate(datas)
+    }
@@ -0,0 +1,111 @@
+"""
+Geometria solar vetorizada (algoritmo do NOAA, precisão de ~1 minuto no nascer/pôr do sol).
+Todas as funções aceitam arrays com shapes compatíveis (broadcast) de latitude, longitude,
+data (datetime64[D]) e hora UTC, e os horários retornados são em horas UTC (fracionárias).
+"""
+import numpy as np
+
+# Ângulo zenital do nascer/pôr do sol: refração atmosférica + raio aparente do disco solar
+ZENITE_HORIZONTE = 90.833
+
+
+def _dia_ano(datas) -> np.ndarray:
+    datas = np.asarray(datas, dtype="datetime64[D]")
+    return (datas - datas.astype("datetime64[Y]")).astype(np.int64) + 1
+
+
+def _angulo_anual(dia_ano, hora_utc=12.0) -> np.ndarray:
+    return 2 * np.pi / 365 * (dia_ano - 1 + (np.asarray(hora_utc) - 12) / 24)
+
+
+def declinacao(dia_ano, hora_utc=12.0) -> np.ndarray:
+    """
+    Declinação solar em graus.
+    """
+    g = _angulo_anual(dia_ano, hora_utc)
+    return np.degrees(
+        0.006918 - 0.399912 * np.cos(g) + 0.070257 * np.sin(g)
+        - 0.006758 * np.cos(2 * g) + 0.000907 * np.sin(2 * g)
+        - 0.002697 * np.cos(3 * g) + 0.00148 * np.sin(3 * g)
+    )
+
+
+def equacao_do_tempo(dia_ano, hora_utc=12.0) -> np.ndarray:
+    """
+    Equação do tempo em minutos (diferença entre o tempo solar verdadeiro e o médio).
+    """
+    g = _angulo_anual(dia_ano, hora_utc)
+    return 229.18 * (
+        0.000075 + 0.001868 * np.cos(g) - 0.032077 * np.sin(g)
+        - 0.014615 * np.cos(2 * g) - 0.040849 * np.sin(2 * g)
+    )
+
+
+def elevacao_solar(lats, lons, datas, horas_utc) -> np.ndarray:
+    """
+    Elevação do sol (graus acima do horizonte, sem refração) em cada instante.
+    """
+    lats, lons, horas_utc = (np.asarray(v, dtype=np.float64) for v in (lats, lons, horas_utc))
+    dia_ano = _dia_ano(datas)
+    decl = np.radians(declinacao(dia_ano, horas_utc))
+
+    # Ângulo horário a partir do tempo solar verdadeiro
+    tempo_solar = horas_utc * 60 + equacao_do_tempo(dia_ano, horas_utc) + 4 * lons
+    angulo_horario = np.radians(tempo_solar / 4 - 180)
+
+    lat = np.radians(lats)
+    seno = np.sin(lat) * np.sin(decl) + np.cos(lat) * np.cos(decl) * np.cos(angulo_horario)
+    return np.degrees(np.arcsin(np.clip(seno, -1, 1)))
+
+
+def nascer_por_do_sol(lats, lons, datas) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Horários (UTC, em horas) do nascer e do pôr do sol de cada data.
+    Podem ficar fora de [0, 24) no extremo oeste/leste. Sem noite (ou sem dia),
+    retorna um intervalo de 24 h (ou vazio) centrado no meio-dia solar.
+    """
+    lats, lons = (np.asarray(v, dtype=np.float64) for v in (lats, lons))
+    dia_ano = _dia_ano(datas)
+    decl = np.radians(declinacao(dia_ano))
+    lat = np.radians(lats)
+
+    cos_angulo = (
+        np.cos(np.radians(ZENITE_HORIZONTE)) / (np.cos(lat) * np.cos(decl)) - np.tan(lat) * np.tan(decl)
+    )
+    semi_arco = np.degrees(np.arccos(np.clip(cos_angulo, -1, 1)))
+
+    meio_dia = (720 - 4 * lons - equacao_do_tempo(dia_ano)) / 60
+    return meio_dia - semi_arco / 15, meio_dia + semi_arco / 15
+
+
+def horas_diurnas(lats, lons, datas) -> np.ndarray:
+    """
+    Máscara (..., 24) das horas UTC com sol acima do horizonte em alguma parte da hora.
+    Segue a convenção do INMET: o valor da hora h é o acumulado do intervalo (h-1, h].
+    O dia solar pode atravessar a meia-noite UTC, então o intervalo também é
+    comparado deslocado de ±24 h.
+    """
+    nascer, por = nascer_por_do_sol(lats, lons, datas)
+    nascer, por = nascer[..., None], por[..., None]
+    fim_hora = np.arange(24, dtype=np.float64)
+    inicio_hora = fim_hora - 1
+    mascara = np.zeros(np.broadcast_shapes(nascer.shape, fim_hora.shape), dtype=bool)
+    for deslocamento in (-24, 0, 24):
+        mascara |= (inicio_hora < por + deslocamento) & (fim_hora > nascer + deslocamento)
+    return mascara
+
+
+def geometria_solar(lats, lons, datas, horas_utc) -> dict:
+    """
+    Features geométricas por instante, para reuso nos caminhos em lote:
+    declinação, elevação solar, cosseno do zênite e duração do dia (horas).
+    """
+    dia_ano = _dia_ano(datas)
+    elevacao = elevacao_solar(lats, lons, datas, horas_utc)
+    nascer, por = nascer_por_do_sol(lats, lons, datas)
+    return {
+        "declinacao": declinacao(dia_ano, horas_utc),
+        "elevacao_solar": elevacao,
+        "cos_zenite": np.clip(np.sin(np.radians(elevacao)), 0, None),
+        "duracao_dia_h": np.broadcast_to(por - nascer, np.shape(elevacao)),
+    }
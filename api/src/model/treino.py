@@ -0,0 +1,234 @@
+"""
+Atualização incremental do modelo com novas partições de observações.
+
+Modos:
+- continuar: carrega o booster atual e adiciona árvores treinadas só com os dados novos;
+- refresh: mantém a estrutura das árvores e reajusta os valores das folhas com os dados novos;
+- completo: treina do zero (mesmos hiperparâmetros do notebook), para comparação.
+
+Os dados novos são divididos por (estação, dia) em treino, validação (usada só para a parada
+antecipada) e holdout. O candidato e o modelo atual são comparados no holdout, nunca visto
+durante o treinamento, e o candidato só é publicado como nova versão (MODEL_DIR/versoes/<versao>)
+se não piorar o RMSE.
+
+Uso: python -m src.model.treino --anos 2025 [--modo continuar|refresh] [--comparar-completo 2020,...,2025]
+"""
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from src.core.config import MODEL_DIR, OBSERVATIONS_DIR, STATIONS_FILE, BRASIL_BBOX
+from src.model.arvores import exportar_ensemble
+from src.model.model import FEATURES, carregar_modelo, montar_features, versao_modelo, versao_publicada
+
+# Hiperparâmetros do treinamento original (notebook estudo/main.ipynb)
+PARAMETROS = {
+    "objective": "reg:squarederror",
+    "eta": 0.05,
+    "max_depth": 10,
+    "subsample": 0.8,
+    "colsample_bytree": 0.8,
+    "min_child_weight": 3,
+    "gamma": 0.1,
+    "alpha": 0.1,
+    "lambda": 1,
+    "seed": 42,
+    "tree_method": "hist",
+}
+N_ARVORES = 700
+N_ARVORES_NOVAS = 100
+PARADA_ANTECIPADA = 10
+FRACAO_VALIDACAO = 0.1
+FRACAO_HOLDOUT = 0.1
+
+# Conjuntos da divisão por (estação, dia)
+TREINO, VALIDACAO, HOLDOUT = 0, 1, 2
+
+
+def carregar_dados(anos: list[str]) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    Features (montar_features: a representação do treinamento original, com a meteorologia
+    normalizada pelo StandardScaler do modelo), alvo e conjunto (TREINO, VALIDACAO ou HOLDOUT)
+    de cada linha das partições dos anos informados. A meteorologia de entrada é a observada
+    em cada hora, como no treinamento original. Assim o modelo base, o candidato e o retreino
+    completo são treinados e avaliados sobre as mesmas features.
+
+    O conjunto é definido pelo hash de (estação, data): todas as horas de um dia ficam no
+    mesmo conjunto, então horas vizinhas (fortemente correlacionadas) não vazam do treino
+    para a avaliação, e a mesma linha cai sempre no mesmo conjunto, qualquer que seja a
+    combinação de anos.
+    """
+    particoes = [OBSERVATIONS_DIR / f"ano={ano}.parquet" for ano in anos]
+    particoes = [p for p in particoes if p.exists()]
+    if not particoes:
+        raise Exception(f"Nenhuma partição de observações para os anos {anos}")
+
+    df = pd.concat([pd.read_parquet(p) for p in particoes], ignore_index=True)
+    df = df[df["radiacao"].notna() & (df["radiacao"] >= 0)]
+
+    catalogo = pd.read_csv(STATIONS_FILE, dtype={"codigo": str}).set_index("codigo")
+    estacoes = catalogo.reindex(df["codigo"].astype(str))
+    lat = estacoes["latitude"].to_numpy(np.float64)
+    lon = estacoes["longitude"].to_numpy(np.float64)
+    alt = estacoes["altitude"].to_numpy(np.float64)
+
+    # Mesmo filtro geográfico do notebook
+    lon_min, lon_max = BRASIL_BBOX[2:]
+    dentro = (lat >= -33.5) & (lat <= 5.5) & (lon >= lon_min) & (lon <= lon_max)
+    df, lat, lon, alt = df[dentro], lat[dentro], lon[dentro], alt[dentro]
+
+    datas = df["data"].to_numpy().astype("datetime64[D]")
+    dia_ano = (datas - datas.astype("datetime64[Y]")).astype(np.int64) + 1
+    clima = df[["temperatura", "precipitacao", "umidade", "vento"]].to_numpy(np.float64)
+    X = montar_features(
+        lat, lon, alt, df["mes"].to_numpy(np.int64), dia_ano, df["hora"].to_numpy(np.int64), clima
+    )
+    return X, df["radiacao"].to_numpy(np.float64), dividir_conjuntos(df)
+
+
+def dividir_conjuntos(df: pd.DataFrame) -> np.ndarray:
+    """
+    Conjunto (TREINO, VALIDACAO ou HOLDOUT) de cada linha, pelo hash de (estação, data).
+    """
+    chave = pd.util.hash_pandas_object(df[["codigo", "data"]], index=False).to_numpy() % 1000
+    conjunto = np.full(len(df), TREINO, dtype=np.int8)
+    conjunto[chave < (FRACAO_VALIDACAO + FRACAO_HOLDOUT) * 1000] = VALIDACAO
+    conjunto[chave < FRACAO_HOLDOUT * 1000] = HOLDOUT
+    return conjunto
+
+
+def booster_atual() -> xgb.Booster:
+    versao = versao_publicada()
+    if versao is not None:
+        return xgb.Booster(model_file=str(MODEL_DIR / "versoes" / versao / "modelo.json"))
+    modelo, _ = carregar_modelo()
+    return modelo.get_booster()
+
+
+def avaliar(booster: xgb.Booster, dados: xgb.DMatrix, y: np.ndarray) -> dict:
+    limite = (0, booster.best_iteration + 1) if "best_iteration" in booster.attributes() else (0, 0)
+    previsto = booster.predict(dados, iteration_range=limite)
+    erro = previsto - y
+    return {
+        "rmse": round(float(np.sqrt(np.mean(erro ** 2))), 3),
+        "mae": round(float(np.mean(np.abs(erro))), 3),
+        "r2": round(float(1 - np.sum(erro ** 2) / np.sum((y - y.mean()) ** 2)), 4),
+    }
+
+
+def treinar(modo: str, dtreino: xgb.DMatrix, dvalidacao: xgb.DMatrix, base: xgb.Booster = None) -> tuple[xgb.Booster, float]:
+    inicio = time.perf_counter()
+    avaliacoes = [(dvalidacao, "validacao")]
+    if modo == "continuar":
+        booster = xgb.train(
+            PARAMETROS, dtreino, num_boost_round=N_ARVORES_NOVAS, xgb_model=base,
+            evals=avaliacoes, early_stopping_rounds=PARADA_ANTECIPADA, verbose_eval=False,
+        )
+    elif modo == "refresh":
+        parametros = {**PARAMETROS, "process_type": "update", "updater": "refresh", "refresh_leaf": True}
+        booster = xgb.train(
+            parametros, dtreino, num_boost_round=base.num_boosted_rounds(), xgb_model=base,
+            evals=avaliacoes, verbose_eval=False,
+        )
+    elif modo == "completo":
+        booster = xgb.train(
+            PARAMETROS, dtreino, num_boost_round=N_ARVORES,
+            evals=avaliacoes, early_stopping_rounds=PARADA_ANTECIPADA, verbose_eval=False,
+        )
+    else:
+        raise ValueError(f"Modo inválido: {modo}")
+    return booster, time.perf_counter() - inicio
+
+
+def publicar(booster: xgb.Booster, relatorio: dict) -> str:
+    """
+    Grava a nova versão (booster em JSON, ensemble compilado e relatório) e a torna a atual.
+    """
+    versao = f"{datetime.now():%Y%m%d%H%M%S}-{relatorio['modo']}"
+    destino = MODEL_DIR / "versoes" / versao
+    destino.mkdir(parents=True)
+    booster.feature_names = FEATURES
+    booster.save_model(destino / "modelo.json")
+    exportar_ensemble(booster, destino / "compilado")
+    with open(destino / "relatorio.json", "w") as f:
+        json.dump({**relatorio, "versao": versao}, f, indent=2)
+
+    temporario = MODEL_DIR / "versao_atual.txt.tmp"
+    temporario.write_text(versao)
+    temporario.replace(MODEL_DIR / "versao_atual.txt")
+    return versao
+
+
+def atualizar_modelo(anos: list[str], modo: str = "continuar", anos_completo: list[str] = None, publicar_se_melhor: bool = True) -> dict:
+    """
+    Atualiza o modelo com as partições dos anos informados e publica a nova versão se
+    ela não piorar o RMSE no holdout. Com 'anos_completo', também treina do zero nesses
+    anos para comparar acurácia e tempo de treinamento.
+    """
+    X, y, conjunto = carregar_dados(anos)
+    dtreino = xgb.DMatrix(X[conjunto == TREINO], label=y[conjunto == TREINO], feature_names=FEATURES)
+    dvalidacao = xgb.DMatrix(X[conjunto == VALIDACAO], label=y[conjunto == VALIDACAO], feature_names=FEATURES)
+    dholdout = xgb.DMatrix(X[conjunto == HOLDOUT], label=y[conjunto == HOLDOUT], feature_names=FEATURES)
+    y_holdout = y[conjunto == HOLDOUT]
+
+    base = booster_atual()
+    base.feature_names = FEATURES
+    versao_base = versao_modelo()
+    metricas_atual = avaliar(base, dholdout, y_holdout)
+    candidato, tempo = treinar(modo, dtreino, dvalidacao, base=base)
+
+    relatorio = {
+        "modo": modo,
+        "anos": anos,
+        "versao_base": versao_base,
+        "linhas_treino": int((conjunto == TREINO).sum()),
+        "linhas_validacao": int((conjunto == VALIDACAO).sum()),
+        "linhas_holdout": int(len(y_holdout)),
+        "atual": metricas_atual,
+        "candidato": {**avaliar(candidato, dholdout, y_holdout), "tempo_treino_s": round(tempo, 1)},
+    }
+
+    if anos_completo:
+        # Mesma divisão por hash: validação e holdout ficam fora do treino completo, para comparação justa
+        X_c, y_c, conjunto_c = carregar_dados(anos_completo)
+        dcompleto = xgb.DMatrix(X_c[conjunto_c == TREINO], label=y_c[conjunto_c == TREINO], feature_names=FEATURES)
+        dvalidacao_c = xgb.DMatrix(X_c[conjunto_c == VALIDACAO], label=y_c[conjunto_c == VALIDACAO], feature_names=FEATURES)
+        completo, tempo_completo = treinar("completo", dcompleto, dvalidacao_c)
+        relatorio["completo"] = {**avaliar(completo, dholdout, y_holdout), "tempo_treino_s": round(tempo_completo, 1)}
+
+    relatorio["publicado"] = None
+    if publicar_se_melhor and relatorio["candidato"]["rmse"] <= relatorio["atual"]["rmse"]:
+        relatorio["publicado"] = publicar(candidato, relatorio)
+        _fixar_downloads(versao_base, relatorio["publicado"], anos)
+    return relatorio
+
+
+def _fixar_downloads(versao_base: str, versao: str, anos: list[str]):
+    # A nova versão depende dos arquivos da versão base e dos anos novos
+    from src.services.download_store import download_store
+    download_store.copiar_fixacao(versao_base, versao)
+    download_store.fixar(versao, [f"{ano}.zip" for ano in anos])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Atualização incremental do modelo de radiação solar")
+    parser.add_argument("--anos", required=True, help="Anos novos separados por vírgula")
+    parser.add_argument("--modo", default="continuar", choices=["continuar", "refresh"])
+    parser.add_argument("--comparar-completo", default=None, help="Anos para um retreino completo de comparação")
+    parser.add_argument("--nao-publicar", action="store_true")
+    args = parser.parse_args()
+
+    relatorio = atualizar_modelo(
+        args.anos.split(","),
+        args.modo,
+        args.comparar_completo.split(",") if args.comparar_completo else None,
+        publicar_se_melhor=not args.nao_publicar,
+    )
+    json.dump(relatorio, sys.stdout, indent=2)
+    print()
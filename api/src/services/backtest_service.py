@@ -0,0 +1,291 @@
+"""
+Backtest do modelo contra as observações horárias do INMET.
+
+Lê as partições anuais em blocos (iter_batches), avalia os blocos em paralelo em vários
+processos e acumula apenas somas por estação, região e mês (e os cruzamentos estação × mês
+e região × mês), então a memória não cresce com o volume de dados. As previsões seguem o
+caminho de produção: climatologia da estação mais próxima como entrada e irradiação nula
+fora das horas diurnas.
+
+Fora da amostra: a climatologia de entrada é recalculada sem os anos testados, e anos usados
+no treinamento do modelo são recusados (a menos que 'incluir_treino' seja informado, caso em
+que o relatório é marcado como dentro da amostra).
+
+Uso: python -m src.services.backtest_service --anos 2024 [--processos 8] [--observado] [--incluir-treino]
+"""
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from src.core.config import OBSERVATIONS_DIR, STATIONS_FILE, BACKTEST_DIR, BACKTEST_TAMANHO_BLOCO
+from src.services.ingestion_service import COLUNAS_OBSERVACAO
+
+# Acumuladores por grupo: n, Σerro, Σerro², Σ|erro|, Σy, Σy²
+N_SOMAS = 6
+MESES = ["jan", "fev", "mar", "abr", "mai", "jun", "jul", "ago", "set", "out", "nov", "dez"]
+
+# Estado do worker (definido no inicializador de cada processo)
+_catalogo: dict = {}
+
+
+def _inicializar_worker(catalogo: dict):
+    global _catalogo
+    _catalogo = catalogo
+
+
+def _somas(grupos: np.ndarray, n_grupos: int, erro: np.ndarray, y: np.ndarray) -> np.ndarray:
+    pesos = [None, erro, erro ** 2, np.abs(erro), y, y ** 2]
+    return np.stack(
+        [np.bincount(grupos, weights=w, minlength=n_grupos) for w in pesos], axis=1
+    )
+
+
+def _avaliar_bloco(lote, usar_observado: bool) -> tuple[dict, int]:
+    """
+    Prevê um bloco de observações e devolve os acumuladores parciais.
+    """
+    from src.model.model import montar_features, prever_radiacao
+    from src.model.solar import horas_diurnas
+    from src.services.climatology_service import clima_para_pontos
+
+    df = lote.to_pandas()
+    df = df[df["radiacao"].notna()]
+    indice = pd.Index(_catalogo["codigos"]).get_indexer(df["codigo"].astype(str))
+    df = df[indice >= 0]
+    estacao = indice[indice >= 0]
+    if len(df) == 0:
+        return {}, 0
+
+    lat = _catalogo["latitudes"][estacao]
+    lon = _catalogo["longitudes"][estacao]
+    alt = _catalogo["altitudes"][estacao]
+    datas = df["data"].to_numpy().astype("datetime64[D]")
+    mes = df["mes"].to_numpy().astype(np.int64)
+    hora = df["hora"].to_numpy().astype(np.int64)
+    dia_ano = (datas - datas.astype("datetime64[Y]")).astype(np.int64) + 1
+
+    if usar_observado:
+        clima = df[["temperatura", "precipitacao", "umidade", "vento"]].to_numpy(dtype=np.float64)
+    else:
+        clima = clima_para_pontos(lat, lon, mes, hora, clima=_catalogo["climatologia"])
+
+    # Mesma regra da produção: à noite a previsão é nula
+    diurna = horas_diurnas(lat, lon, datas)[np.arange(len(df)), hora]
+    previsto = np.zeros(len(df))
+    if diurna.any():
+        features = montar_features(
+            lat[diurna], lon[diurna], alt[diurna], mes[diurna], dia_ano[diurna], hora[diurna], clima[diurna]
+        )
+        previsto[diurna] = prever_radiacao(features)
+
+    y = np.clip(df["radiacao"].to_numpy(dtype=np.float64), 0, None)
+    erro = previsto - y
+    regiao = _catalogo["regiao_estacao"][estacao]
+    n_estacoes, n_regioes = len(_catalogo["codigos"]), len(_catalogo["regioes"])
+    return {
+        "estacao": _somas(estacao, n_estacoes, erro, y),
+        "regiao": _somas(regiao, n_regioes, erro, y),
+        "mes": _somas(mes - 1, 12, erro, y),
+        "estacao_mes": _somas(estacao * 12 + mes - 1, n_estacoes * 12, erro, y),
+        "regiao_mes": _somas(regiao * 12 + mes - 1, n_regioes * 12, erro, y),
+    }, len(df)
+
+
+def _metricas(somas: np.ndarray) -> dict:
+    n, s_erro, s_erro2, s_abs, s_y, s_y2 = somas
+    if n == 0:
+        return {"n": 0}
+    variancia = s_y2 - s_y ** 2 / n
+    return {
+        "n": int(n),
+        "rmse": round(float(np.sqrt(s_erro2 / n)), 3),
+        "mae": round(float(s_abs / n), 3),
+        "vies": round(float(s_erro / n), 3),
+        "r2": round(float(1 - s_erro2 / variancia), 4) if variancia > 0 else None,
+        "media_observada": round(float(s_y / n), 3),
+    }
+
+
+def _cruzamento(chaves, somas: np.ndarray) -> dict:
+    """
+    Métricas de um acumulador (n_chaves × 12, N_SOMAS) como {chave: {mês: métricas}},
+    omitindo as células sem observações.
+    """
+    somas = somas.reshape(len(chaves), 12, N_SOMAS)
+    resultado = {}
+    for chave, meses in zip(chaves, somas):
+        por_mes = {m: _metricas(s) for m, s in zip(MESES, meses) if s[0] > 0}
+        if por_mes:
+            resultado[str(chave)] = por_mes
+    return resultado
+
+
+def _carregar_catalogo() -> dict:
+    if not STATIONS_FILE.exists():
+        raise Exception("Catálogo de estações não encontrado. Execute a ingestão primeiro.")
+    catalogo = pd.read_csv(STATIONS_FILE, dtype={"codigo": str})
+    regioes, regiao_estacao = np.unique(catalogo["regiao"].fillna("?").astype(str), return_inverse=True)
+    return {
+        "codigos": catalogo["codigo"].to_numpy(),
+        "latitudes": catalogo["latitude"].to_numpy(np.float64),
+        "longitudes": catalogo["longitude"].to_numpy(np.float64),
+        "altitudes": catalogo["altitude"].fillna(catalogo["altitude"].median()).to_numpy(np.float64),
+        "regioes": regioes,
+        "regiao_estacao": regiao_estacao,
+    }
+
+
+def executar_backtest(
+    anos: list[str],
+    processos: int = None,
+    usar_observado: bool = False,
+    tamanho_bloco: int = BACKTEST_TAMANHO_BLOCO,
+    progresso=None,
+    incluir_treino: bool = False,
+) -> dict:
+    """
+    Executa o backtest sobre as partições dos anos informados e salva o relatório em BACKTEST_DIR.
+    'progresso', se informado, é chamado com o número de linhas avaliadas até o momento.
+    """
+    from src.model.model import versao_modelo, anos_treino_modelo
+    from src.services.climatology_service import calcular_climatologia
+
+    anos = [str(a) for a in anos]
+    sobrepostos = sorted(set(anos) & anos_treino_modelo())
+    if sobrepostos and not incluir_treino:
+        raise Exception(
+            f"Anos usados no treinamento do modelo: {', '.join(sobrepostos)}. "
+            "Use anos fora do treino ou informe incluir_treino para uma avaliação dentro da amostra."
+        )
+
+    catalogo = _carregar_catalogo()
+    particoes = [OBSERVATIONS_DIR / f"ano={ano}.parquet" for ano in anos]
+    particoes = [p for p in particoes if p.exists()]
+    if not particoes:
+        raise Exception(f"Nenhuma partição de observações para os anos {anos}")
+
+    # Climatologia de entrada sem os anos avaliados, para não vazar o alvo
+    catalogo["climatologia"] = None
+    if not usar_observado:
+        catalogo["climatologia"] = calcular_climatologia(list(catalogo["codigos"]), excluir_anos=anos)
+        if catalogo["climatologia"] is None:
+            raise Exception("Nenhuma partição fora dos anos avaliados para calcular a climatologia")
+
+    processos = processos or multiprocessing.cpu_count()
+    colunas = ["codigo", "data", "mes", "hora", *COLUNAS_OBSERVACAO]
+    acumulado = {
+        "estacao": np.zeros((len(catalogo["codigos"]), N_SOMAS)),
+        "regiao": np.zeros((len(catalogo["regioes"]), N_SOMAS)),
+        "mes": np.zeros((12, N_SOMAS)),
+        "estacao_mes": np.zeros((len(catalogo["codigos"]) * 12, N_SOMAS)),
+        "regiao_mes": np.zeros((len(catalogo["regioes"]) * 12, N_SOMAS)),
+    }
+    linhas = 0
+    inicio = time.perf_counter()
+
+    def acumular(futuros):
+        nonlocal linhas
+        for futuro in futuros:
+            parciais, n = futuro.result()
+            for chave, somas in parciais.items():
+                acumulado[chave] += somas
+            linhas += n
+        if progresso is not None:
+            progresso(linhas)
+
+    # 'spawn' evita herdar threads e o event loop da API; no máximo 2 blocos em voo por processo
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(processos, mp_context=contexto, initializer=_inicializar_worker, initargs=(catalogo,)) as executor:
+        pendentes = set()
+        for particao in particoes:
+            for lote in pq.ParquetFile(particao).iter_batches(batch_size=tamanho_bloco, columns=colunas):
+                if len(pendentes) >= 2 * processos:
+                    concluidos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+                    acumular(concluidos)
+                pendentes.add(executor.submit(_avaliar_bloco, lote, usar_observado))
+        acumular(wait(pendentes).done)
+
+    relatorio = {
+        "versao_modelo": versao_modelo(),
+        "anos": list(anos),
+        "entrada": "observado" if usar_observado else "climatologia",
+        "fora_da_amostra": not sobrepostos,
+        "anos_treino_sobrepostos": sobrepostos,
+        "climatologia_sem_anos": None if usar_observado else anos,
+        "linhas": linhas,
+        "duracao_s": round(time.perf_counter() - inicio, 2),
+        "executado_em": datetime.now().isoformat(),
+        "global": _metricas(acumulado["mes"].sum(axis=0)),
+        "por_regiao": {r: _metricas(s) for r, s in zip(catalogo["regioes"], acumulado["regiao"])},
+        "por_mes": {m: _metricas(s) for m, s in zip(MESES, acumulado["mes"])},
+        "por_estacao": {
+            c: _metricas(s) for c, s in zip(catalogo["codigos"], acumulado["estacao"]) if s[0] > 0
+        },
+        "por_regiao_mes": _cruzamento(catalogo["regioes"], acumulado["regiao_mes"]),
+        "por_estacao_mes": _cruzamento(catalogo["codigos"], acumulado["estacao_mes"]),
+    }
+
+    BACKTEST_DIR.mkdir(parents=True, exist_ok=True)
+    amostra = "fora" if relatorio["fora_da_amostra"] else "dentro"
+    nome = f"{relatorio['versao_modelo']}_{'-'.join(anos)}_{relatorio['entrada']}_{amostra}.json"
+    with open(BACKTEST_DIR / nome, "w") as f:
+        json.dump(relatorio, f)
+    return relatorio
+
+
+def ultimo_relatorio() -> dict | None:
+    """
+    Relatório de backtest mais recente salvo em BACKTEST_DIR.
+    """
+    if not BACKTEST_DIR.exists():
+        return None
+    arquivos = sorted(BACKTEST_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime)
+    if not arquivos:
+        return None
+    with open(arquivos[-1]) as f:
+        return json.load(f)
+
+
+# Estado do backtest disparado pela API (um por vez)
+estado_backtest = {"estado": "parado", "linhas": 0, "erro": None}
+
+
+def executar_backtest_api(anos: list[str], processos: int = None, usar_observado: bool = False, incluir_treino: bool = False):
+    estado_backtest.update({"estado": "executando", "linhas": 0, "erro": None, "anos": anos})
+    try:
+        executar_backtest(
+            anos, processos, usar_observado,
+            progresso=lambda n: estado_backtest.update(linhas=n), incluir_treino=incluir_treino,
+        )
+        estado_backtest["estado"] = "concluido"
+    except Exception as e:
+        estado_backtest.update({"estado": "erro", "erro": str(e)})
+        print(f"Erro no backtest: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest do modelo contra as observações do INMET")
+    parser.add_argument("--anos", required=True, help="Anos separados por vírgula (ex.: 2024)")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--tamanho-bloco", type=int, default=BACKTEST_TAMANHO_BLOCO)
+    parser.add_argument("--observado", action="store_true", help="Usa a meteorologia observada em vez da climatologia")
+    parser.add_argument("--incluir-treino", action="store_true", help="Permite anos usados no treinamento (dentro da amostra)")
+    args = parser.parse_args()
+
+    relatorio = executar_backtest(
+        args.anos.split(","), args.processos, args.observado, args.tamanho_bloco,
+        progresso=lambda n: print(f"\r{n:,} linhas", end="", file=sys.stderr),
+        incluir_treino=args.incluir_treino,
+    )
+    print(file=sys.stderr)
+    print(f"{relatorio['linhas']:,} linhas em {relatorio['duracao_s']}s | global: {relatorio['global']}")
+    for regiao, m in relatorio["por_regiao"].items():
+        print(f"{regiao:<4} {m}")
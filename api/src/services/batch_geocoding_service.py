@@ -0,0 +1,217 @@
+"""
+Geocodificação em lote (importação de planilhas de endereços).
+
+O lote é deduplicado pelo endereço normalizado; o que já está no cache é respondido na hora.
+O restante passa pelo limitador de taxa do Nominatim (1 req/s pela política de uso), e as
+coordenadas encontradas são agrupadas para resolver as altitudes de uma vez: grade local
+primeiro e, para o que faltar, chamadas em lote à API de elevação, com o seu próprio limitador.
+Os resultados são publicados à medida que ficam prontos e podem ser acompanhados em streaming.
+"""
+import csv
+import io
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+
+from src.core.config import ELEVATION_LOTE
+from src.core.http_client import run_sync
+from src.services.geocoding_service import geocode, geocode_cache, normalizar_endereco, resolver_altitudes
+
+# Consultas ao Nominatim em voo (o ritmo é dado pelo limitador; isto só sobrepõe a latência)
+CONCORRENCIA_GEOCODE = 2
+# Tempo máximo que uma coordenada espera para completar um lote de altitudes
+ESPERA_LOTE_ALTITUDE_S = 2.0
+MAX_JOBS = 50
+
+COLUNAS_ENDERECO = ("endereco", "endereço", "address")
+
+
+def ler_enderecos_csv(conteudo: bytes, coluna: str = None) -> list[str]:
+    """
+    Endereços de um CSV: a coluna informada, a coluna 'endereco'/'address' do cabeçalho
+    ou, sem cabeçalho reconhecido, a primeira coluna de todas as linhas.
+    """
+    try:
+        texto = conteudo.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        texto = conteudo.decode("latin1")
+    try:
+        dialeto = csv.Sniffer().sniff(texto[:4096], delimiters=",;\t")
+    except csv.Error:
+        dialeto = csv.excel
+    linhas = [l for l in csv.reader(io.StringIO(texto), dialeto) if l]
+    if not linhas:
+        return []
+
+    cabecalho = [c.strip().lower() for c in linhas[0]]
+    if coluna is not None:
+        if coluna.lower() not in cabecalho:
+            raise ValueError(f"Coluna não encontrada no CSV: {coluna}")
+        indice, linhas = cabecalho.index(coluna.lower()), linhas[1:]
+    else:
+        indice = next((cabecalho.index(c) for c in COLUNAS_ENDERECO if c in cabecalho), None)
+        if indice is None:
+            indice = 0
+        else:
+            linhas = linhas[1:]
+    return [l[indice] for l in linhas if len(l) > indice]
+
+
+class JobGeocodificacao:
+    """
+    Um lote de endereços. Cada endereço único gera um resultado, com os índices das
+    entradas originais que ele representa.
+    """
+
+    def __init__(self, enderecos: list[str]):
+        self.id = uuid.uuid4().hex[:12]
+        self.criado = time.time()
+        self.total_entradas = 0
+        self.unicos: OrderedDict[str, dict] = OrderedDict()
+        for i, endereco in enumerate(enderecos):
+            if not endereco or not endereco.strip():
+                continue
+            self.total_entradas += 1
+            chave = normalizar_endereco(endereco)
+            self.unicos.setdefault(chave, {"endereco": endereco.strip(), "indices": []})["indices"].append(i)
+
+        self.estado = "pendente"
+        self.erro = None
+        self.resultados: list[dict] = []
+        self.contagem = {"cache": 0, "ok": 0, "nao_encontrado": 0, "erro": 0}
+        self.fim = None
+        self._condicao = asyncio.Condition()
+
+    @property
+    def finalizado(self) -> bool:
+        return self.estado in ("concluido", "erro")
+
+    def progresso(self) -> dict:
+        return {
+            "id": self.id,
+            "estado": self.estado,
+            "entradas": self.total_entradas,
+            "unicos": len(self.unicos),
+            "concluidos": len(self.resultados),
+            **self.contagem,
+            "duracao_s": round((self.fim or time.time()) - self.criado, 1),
+            "erro": self.erro,
+        }
+
+    async def publicar(self, resultados: list[dict]):
+        async with self._condicao:
+            for r in resultados:
+                # Cada endereço conta uma vez: os do cache em 'cache', os consultados pelo status
+                self.contagem["cache" if r["origem"] == "cache" else r["status"]] += 1
+            self.resultados.extend(resultados)
+            self._condicao.notify_all()
+
+    async def finalizar(self, estado: str, erro: str = None):
+        async with self._condicao:
+            self.estado, self.erro, self.fim = estado, erro, time.time()
+            self._condicao.notify_all()
+
+    async def acompanhar(self):
+        """
+        Gera ('resultado', r) para cada resultado, desde o primeiro, e ('progresso', p)
+        após cada grupo publicado, até o fim do job.
+        """
+        enviados = 0
+        while True:
+            async with self._condicao:
+                await self._condicao.wait_for(lambda: len(self.resultados) > enviados or self.finalizado)
+                novos = self.resultados[enviados:]
+                finalizado = self.finalizado
+            for r in novos:
+                yield "resultado", r
+            enviados += len(novos)
+            yield "progresso", self.progresso()
+            if finalizado and enviados == len(self.resultados):
+                return
+
+    def _resultado(self, chave: str, dados: dict, origem: str) -> dict:
+        return {**self.unicos[chave], **dados, "origem": origem}
+
+    async def executar(self):
+        self.estado = "executando"
+        try:
+            chaves = list(self.unicos)
+            em_cache = await run_sync(geocode_cache.obter, chaves)
+            await self.publicar([self._resultado(c, em_cache[c], "cache") for c in chaves if c in em_cache])
+
+            pendentes = asyncio.Queue()
+            for chave in chaves:
+                if chave not in em_cache:
+                    pendentes.put_nowait(chave)
+            coordenadas = asyncio.Queue()
+            altitudes = asyncio.create_task(self._resolver_altitudes(coordenadas))
+            try:
+                await asyncio.gather(*(self._geocodificar(pendentes, coordenadas) for _ in range(CONCORRENCIA_GEOCODE)))
+            finally:
+                coordenadas.put_nowait(None)
+                await altitudes
+            await self.finalizar("concluido")
+        except Exception as e:
+            print(f"Erro na geocodificação em lote {self.id}: {e}")
+            await self.finalizar("erro", str(e))
+
+    async def _geocodificar(self, pendentes: asyncio.Queue, coordenadas: asyncio.Queue):
+        while not pendentes.empty():
+            chave = pendentes.get_nowait()
+            try:
+                location = await geocode(self.unicos[chave]["endereco"])
+            except Exception as e:
+                await self.publicar([self._resultado(chave, {"status": "erro", "erro": str(e)}, "consulta")])
+                continue
+            if not location:
+                resultado = {"status": "nao_encontrado"}
+                await run_sync(geocode_cache.gravar, {chave: resultado})
+                await self.publicar([self._resultado(chave, resultado, "consulta")])
+            else:
+                coordenadas.put_nowait((chave, location.latitude, location.longitude))
+
+    async def _resolver_altitudes(self, coordenadas: asyncio.Queue):
+        """
+        Agrupa as coordenadas encontradas em lotes de até ELEVATION_LOTE pontos e resolve
+        as altitudes de cada lote de uma vez.
+        """
+        terminou = False
+        while not terminou:
+            lote = []
+            item = await coordenadas.get()
+            limite = time.monotonic() + ESPERA_LOTE_ALTITUDE_S
+            while item is not None:
+                lote.append(item)
+                if len(lote) >= ELEVATION_LOTE:
+                    break
+                try:
+                    item = await asyncio.wait_for(coordenadas.get(), max(limite - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    break
+            terminou = item is None
+            if not lote:
+                continue
+
+            chaves, lats, lons = map(list, zip(*lote))
+            valores = await resolver_altitudes(lats, lons)
+            resultados = {
+                chave: {"status": "ok", "latitude": lat, "longitude": lon, "altitude": alt}
+                for chave, lat, lon, alt in zip(chaves, lats, lons, valores)
+            }
+            # Sem altitude o resultado é devolvido, mas não fica no cache
+            await run_sync(geocode_cache.gravar, {c: r for c, r in resultados.items() if r["altitude"] is not None})
+            await self.publicar([self._resultado(c, r, "consulta") for c, r in resultados.items()])
+
+
+# Jobs da API, do mais antigo para o mais recente
+jobs: OrderedDict[str, JobGeocodificacao] = OrderedDict()
+
+
+def criar_job(enderecos: list[str]) -> JobGeocodificacao:
+    job = JobGeocodificacao(enderecos)
+    finalizados = [j for j in jobs.values() if j.finalizado]
+    while len(jobs) >= MAX_JOBS and finalizados:
+        del jobs[finalizados.pop(0).id]
+    jobs[job.id] = job
+    return job
@@ -0,0 +1,145 @@
+import json
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from src.core.config import CLIMATOLOGY_FILE, OBSERVATIONS_DIR
+from src.services.station_index import get_station_index
+
+# Variáveis da climatologia, na ordem do último eixo do array
+VARIAVEIS_CLIMA = ["temperatura", "precipitacao", "umidade", "vento"]
+
+# Valores usados quando não há climatologia: (abril a setembro, demais meses)
+CLIMA_PADRAO_FRIO = np.array([20.0, 0.0, 60.0, 2.0], dtype=np.float32)
+CLIMA_PADRAO_QUENTE = np.array([28.0, 5.0, 75.0, 2.0], dtype=np.float32)
+
+_ESTACOES_FILE = CLIMATOLOGY_FILE.with_suffix(".json")
+
+
+def calcular_climatologia(codigos: list[str], excluir_anos=()) -> np.ndarray | None:
+    """
+    Calcula a média de cada variável meteorológica por estação × mês × hora (UTC)
+    a partir das partições de observações, acumulando somas e contagens partição a partição.
+    O array (n_estacoes, 12, 24, 4) em float32 segue a ordem de 'codigos'.
+    Partições dos anos em 'excluir_anos' são ignoradas (ex.: anos avaliados no backtest);
+    retorna None se nenhuma partição restar.
+    """
+    excluir_anos = {str(a) for a in excluir_anos}
+    particoes = [
+        p for p in sorted(OBSERVATIONS_DIR.glob("ano=*.parquet")) if p.stem.split("=")[1] not in excluir_anos
+    ]
+    if not particoes:
+        return None
+    posicao = {codigo: i for i, codigo in enumerate(codigos)}
+    n_celulas = len(codigos) * 12 * 24
+
+    somas = np.zeros((n_celulas, len(VARIAVEIS_CLIMA)), dtype=np.float64)
+    contagens = np.zeros((n_celulas, len(VARIAVEIS_CLIMA)), dtype=np.int64)
+
+    for particao in particoes:
+        df = pd.read_parquet(particao, columns=["codigo", "mes", "hora", *VARIAVEIS_CLIMA])
+        estacao = df["codigo"].astype(str).map(posicao)
+        validos = estacao.notna().to_numpy()
+        df = df[validos]
+        celula = (
+            (estacao[validos].to_numpy(dtype=np.int64) * 12 + df["mes"].to_numpy(dtype=np.int64) - 1) * 24
+            + df["hora"].to_numpy(dtype=np.int64)
+        )
+        for j, variavel in enumerate(VARIAVEIS_CLIMA):
+            valores = df[variavel].to_numpy(dtype=np.float64)
+            ok = ~np.isnan(valores)
+            somas[:, j] += np.bincount(celula[ok], weights=valores[ok], minlength=n_celulas)
+            contagens[:, j] += np.bincount(celula[ok], minlength=n_celulas)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        clima = (somas / contagens).reshape(len(codigos), 12, 24, len(VARIAVEIS_CLIMA))
+
+    # Preenche lacunas: média da estação no mês, depois média de todas as estações na mesma célula
+    media_mes = np.nanmean(clima, axis=2, keepdims=True)
+    clima = np.where(np.isnan(clima), media_mes, clima)
+    media_geral = np.nanmean(clima, axis=0, keepdims=True)
+    clima = np.where(np.isnan(clima), media_geral, clima)
+    padrao = _clima_padrao(np.arange(1, 13))[None, :, None, :]
+    return np.where(np.isnan(clima), padrao, clima).astype(np.float32)
+
+
+def construir_climatologia() -> np.ndarray | None:
+    """
+    Calcula a climatologia de todas as partições e a grava alinhada ao catálogo de estações.
+    """
+    index = get_station_index()
+    if index is None:
+        return None
+    codigos = index.estacoes["codigo"].tolist()
+    clima = calcular_climatologia(codigos)
+    if clima is None:
+        return None
+
+    CLIMATOLOGY_FILE.parent.mkdir(parents=True, exist_ok=True)
+    np.save(CLIMATOLOGY_FILE, clima)
+    with open(_ESTACOES_FILE, "w") as f:
+        json.dump(codigos, f)
+
+    get_climatologia.cache_clear()
+    return clima
+
+
+@lru_cache(maxsize=1)
+def get_climatologia() -> np.ndarray | None:
+    """
+    Abre a climatologia em modo memory-mapped. Retorna None se ela não existir
+    ou se estiver desalinhada com o catálogo de estações atual.
+    """
+    index = get_station_index()
+    if index is None or not CLIMATOLOGY_FILE.exists() or not _ESTACOES_FILE.exists():
+        return None
+    with open(_ESTACOES_FILE) as f:
+        codigos = json.load(f)
+    if codigos != index.estacoes["codigo"].tolist():
+        return None
+    return np.load(CLIMATOLOGY_FILE, mmap_mode="r")
+
+
+def _clima_padrao(meses) -> np.ndarray:
+    """
+    Valores fixos por estação do ano, usados quando não há climatologia disponível.
+    """
+    meses = np.asarray(meses)
+    frio = ((meses >= 4) & (meses <= 9))[..., None]
+    return np.where(frio, CLIMA_PADRAO_FRIO, CLIMA_PADRAO_QUENTE)
+
+
+def clima_para_pontos(lats, lons, meses, horas, k: int = 1, clima: np.ndarray = None) -> np.ndarray:
+    """
+    Médias climatológicas (temperatura, precipitação, umidade, vento) para cada ponto,
+    mês e hora UTC, a partir das k estações mais próximas (ponderadas pelo inverso da distância).
+    Os argumentos são arrays com o mesmo shape; o resultado tem um eixo extra de tamanho 4.
+    'clima' substitui a climatologia gravada (deve seguir a ordem do catálogo de estações).
+    """
+    lats, lons, meses, horas = np.broadcast_arrays(
+        np.asarray(lats, dtype=np.float64),
+        np.asarray(lons, dtype=np.float64),
+        np.asarray(meses, dtype=np.intp),
+        np.asarray(horas, dtype=np.intp),
+    )
+    if clima is None:
+        clima = get_climatologia()
+    if clima is None:
+        return _clima_padrao(meses)
+
+    # Consulta o índice apenas para as localizações distintas
+    coords = np.column_stack([lats.ravel(), lons.ravel()])
+    unicos, inverso = np.unique(coords, axis=0, return_inverse=True)
+    distancias, indices = get_station_index().query(unicos[:, 0], unicos[:, 1], k=k)
+    distancias = distancias[inverso.ravel()]
+    indices = indices[inverso.ravel()]
+
+    mes = meses.ravel()[:, None] - 1
+    hora = horas.ravel()[:, None] % 24
+    valores = clima[indices, mes, hora]  # (n, k, 4)
+
+    pesos = 1.0 / np.maximum(distancias, 1e-3)
+    pesos /= pesos.sum(axis=1, keepdims=True)
+    resultado = (valores * pesos[..., None]).sum(axis=1)
+    return resultado.reshape(*lats.shape, len(VARIAVEIS_CLIMA)).astype(np.float32)
@@ -1,12 +1,13 @@
-import os
-from src.core.config import DOWNLOAD_DIR
 from src.utils.file_utils import download_file
 from src.services.sync_service import get_download_links
+from src.services.download_store import download_store
+from src.services.ingestion_service import ingest_downloads
 
 def download_all_files(years: list[str] = None) -> dict:
     """
     Realiza o download dos arquivos dos anos especificados.
     Se 'years' for None, baixa todos os anos disponíveis.
+    Ao final, os anos baixados com sucesso são ingeridos (observações e catálogo de estações).
     Retorna um dicionário com os resultados do download.
     """
     data = get_download_links()
@@ -18,16 +19,24 @@ def download_all_files(years: list[str] = None) -> dict:
     else:
         years_to_download = available_years
     
-    os.makedirs(DOWNLOAD_DIR, exist_ok=True)
-    
     results = {}
     for year in years_to_download:
         url = download_links.get(year)
         if url:
-            file_path = DOWNLOAD_DIR / f"{year}.zip"
-            success = download_file(url, str(file_path))
+            # Baixa para um arquivo temporário; conteúdo repetido não é gravado de novo
+            temporario = download_store.arquivo_temporario(f"{year}.zip")
+            sha256 = download_file(url, str(temporario))
+            success = sha256 is not None
+            if success:
+                download_store.adicionar_arquivo(f"{year}.zip", temporario, sha256)
+            else:
+                temporario.unlink(missing_ok=True)
             results[year] = {
                 "success": success,
-                "file_path": str(file_path) if success else None
+                "sha256": sha256
             }
+
+    baixados = [year for year, result in results.items() if result["success"]]
+    if baixados:
+        ingest_downloads(baixados)
     return results
\ No newline at end of file
@@ -0,0 +1,235 @@
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.core.config import DOWNLOAD_DIR, DOWNLOAD_STORE_MAX_GB
+
+
+def sha256_arquivo(caminho: Path) -> str:
+    hash_ = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            hash_.update(bloco)
+    return hash_.hexdigest()
+
+
+class DownloadStore:
+    """
+    Armazenamento endereçado por conteúdo (SHA-256) para os arquivos baixados e derivados.
+    Cada conteúdo é gravado uma única vez em objetos/<hash[:2]>/<hash>; nomes lógicos
+    (ex.: '2023.zip') apontam para um hash. O índice fica em memória e em indice.json,
+    então consultas não tocam o sistema de arquivos.
+    Acima do limite de disco, os objetos menos usados recentemente são descartados,
+    exceto os fixados pela versão atual do modelo e os que estão sendo lidos (em_uso).
+    """
+
+    def __init__(self, diretorio: Path = DOWNLOAD_DIR, limite_bytes: int = int(DOWNLOAD_STORE_MAX_GB * 2 ** 30)):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        self.objetos: OrderedDict[str, dict] = OrderedDict()  # ordem LRU (mais antigo primeiro)
+        self.nomes: dict[str, str] = {}
+        self.fixados: dict[str, set[str]] = {}
+        self.em_leitura: Counter[str] = Counter()
+        self.total_bytes = 0
+        self._carregado = False
+        self._lock = threading.RLock()
+
+    @property
+    def _arquivo_indice(self) -> Path:
+        return self.diretorio / "indice.json"
+
+    def _caminho_objeto(self, hash_: str) -> Path:
+        return self.diretorio / "objetos" / hash_[:2] / hash_
+
+    def diretorio_temporario(self) -> Path:
+        caminho = self.diretorio / "tmp"
+        caminho.mkdir(parents=True, exist_ok=True)
+        return caminho
+
+    def arquivo_temporario(self, prefixo: str) -> Path:
+        """
+        Cria um arquivo temporário exclusivo no armazenamento (downloads simultâneos do mesmo
+        nome não compartilham o arquivo parcial).
+        """
+        descritor, caminho = tempfile.mkstemp(prefix=f"{prefixo}.", suffix=".part", dir=self.diretorio_temporario())
+        os.close(descritor)
+        return Path(caminho)
+
+    def _carregar(self):
+        if self._carregado:
+            return
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        if self._arquivo_indice.exists():
+            with open(self._arquivo_indice) as f:
+                indice = json.load(f)
+            for hash_, tamanho, acesso in indice["objetos"]:
+                self.objetos[hash_] = {"tamanho": tamanho, "acesso": acesso}
+                self.total_bytes += tamanho
+            self.nomes = indice["nomes"]
+            self.fixados = {rotulo: set(hashes) for rotulo, hashes in indice["fixados"].items()}
+        self._carregado = True
+        self._migrar_arquivos_soltos()
+
+    def _migrar_arquivos_soltos(self):
+        """
+        Importa arquivos '{ano}.zip' gravados diretamente no diretório (layout antigo).
+        """
+        for arquivo in self.diretorio.glob("*.zip"):
+            if re.fullmatch(r"\d{4}\.zip", arquivo.name):
+                self.adicionar_arquivo(arquivo.name, arquivo)
+
+    def _salvar_indice(self):
+        indice = {
+            "objetos": [[h, o["tamanho"], o["acesso"]] for h, o in self.objetos.items()],
+            "nomes": self.nomes,
+            "fixados": {rotulo: sorted(hashes) for rotulo, hashes in self.fixados.items()},
+        }
+        temporario = self._arquivo_indice.with_suffix(".tmp")
+        with open(temporario, "w") as f:
+            json.dump(indice, f)
+        os.replace(temporario, self._arquivo_indice)
+
+    def adicionar_arquivo(self, nome: str, origem: Path, sha256: str | None = None) -> str:
+        """
+        Move 'origem' para o armazenamento sob o nome lógico 'nome' e retorna o hash.
+        Se o mesmo conteúdo já estiver armazenado, 'origem' é apenas removido.
+        """
+        origem = Path(origem)
+        hash_ = sha256 or sha256_arquivo(origem)
+        with self._lock:
+            self._carregar()
+            if hash_ in self.objetos:
+                origem.unlink(missing_ok=True)
+            else:
+                destino = self._caminho_objeto(hash_)
+                destino.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(origem, destino)
+                self.objetos[hash_] = {"tamanho": destino.stat().st_size, "acesso": time.time()}
+                self.total_bytes += self.objetos[hash_]["tamanho"]
+            self.nomes[nome] = hash_
+            self._tocar(hash_)
+            self._descartar()
+            self._salvar_indice()
+        return hash_
+
+    def _tocar(self, hash_: str):
+        self.objetos[hash_]["acesso"] = time.time()
+        self.objetos.move_to_end(hash_)
+
+    def caminho(self, nome: str) -> Path | None:
+        """
+        Caminho do conteúdo associado a um nome lógico (marca o objeto como usado).
+        """
+        with self._lock:
+            self._carregar()
+            hash_ = self.nomes.get(nome)
+            if hash_ is None:
+                return None
+            self._tocar(hash_)
+            return self._caminho_objeto(hash_)
+
+    @contextmanager
+    def em_uso(self, nome: str):
+        """
+        Caminho do conteúdo de um nome lógico (ou None), protegido do descarte enquanto
+        o bloco 'with' estiver ativo.
+        """
+        with self._lock:
+            self._carregar()
+            hash_ = self.nomes.get(nome)
+            if hash_ is None:
+                caminho = None
+            else:
+                self._tocar(hash_)
+                self.em_leitura[hash_] += 1
+                caminho = self._caminho_objeto(hash_)
+        try:
+            yield caminho
+        finally:
+            if hash_ is not None:
+                with self._lock:
+                    self.em_leitura[hash_] -= 1
+                    if self.em_leitura[hash_] <= 0:
+                        del self.em_leitura[hash_]
+
+    def hash_de(self, nome: str) -> str | None:
+        with self._lock:
+            self._carregar()
+            return self.nomes.get(nome)
+
+    def listar(self, padrao: str = ".*") -> list[str]:
+        with self._lock:
+            self._carregar()
+            return sorted(nome for nome in self.nomes if re.fullmatch(padrao, nome))
+
+    def fixar(self, rotulo: str, nomes: list[str]):
+        """
+        Fixa o conteúdo atual dos nomes sob um rótulo (ex.: versão do modelo).
+        Objetos fixados pelo rótulo ativo nunca são descartados.
+        """
+        with self._lock:
+            self._carregar()
+            hashes = {self.nomes[n] for n in nomes if n in self.nomes}
+            self.fixados.setdefault(rotulo, set()).update(hashes)
+            self._salvar_indice()
+
+    def copiar_fixacao(self, origem: str, destino: str):
+        """
+        Fixa sob 'destino' todos os objetos fixados por 'origem' (ex.: nova versão do modelo
+        derivada da anterior).
+        """
+        with self._lock:
+            self._carregar()
+            self.fixados.setdefault(destino, set()).update(self.fixados.get(origem, set()))
+            self._salvar_indice()
+
+    def _protegidos(self) -> set[str]:
+        # Importado aqui para não carregar o modelo ao importar o armazenamento
+        from src.model.model import versao_modelo
+        return self.fixados.get(versao_modelo(), set())
+
+    def _descartar(self):
+        if self.total_bytes <= self.limite_bytes:
+            return
+        protegidos = self._protegidos() | set(self.em_leitura)
+        for hash_ in [h for h in self.objetos if h not in protegidos]:
+            if self.total_bytes <= self.limite_bytes:
+                break
+            objeto = self.objetos.pop(hash_)
+            self.total_bytes -= objeto["tamanho"]
+            self._caminho_objeto(hash_).unlink(missing_ok=True)
+            for nome in [n for n, h in self.nomes.items() if h == hash_]:
+                del self.nomes[nome]
+            print(f"Objeto descartado do armazenamento de downloads: {hash_[:12]}")
+
+    def status(self) -> dict:
+        with self._lock:
+            self._carregar()
+            protegidos = self._protegidos()
+            return {
+                "download_directory": str(self.diretorio),
+                "objetos": len(self.objetos),
+                "total_bytes": self.total_bytes,
+                "total_mb": round(self.total_bytes / 2 ** 20, 2),
+                "limite_mb": round(self.limite_bytes / 2 ** 20, 2),
+                "files": [
+                    {
+                        "name": nome,
+                        "sha256": hash_,
+                        "size_bytes": self.objetos[hash_]["tamanho"],
+                        "size_mb": round(self.objetos[hash_]["tamanho"] / 2 ** 20, 2),
+                        "pinned": hash_ in protegidos,
+                    }
+                    for nome, hash_ in sorted(self.nomes.items())
+                ],
+            }
+
+
+download_store = DownloadStore()
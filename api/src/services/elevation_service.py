@@ -0,0 +1,187 @@
+import sys
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.core.config import ELEVATION_GRID_DIR, BRASIL_BBOX, ALTITUDE_PADRAO
+from src.services.station_index import get_station_index
+
+NODATA = -32768
+
+
+class ElevationGrid:
+    """
+    Grade regular de elevação (metros) em graus decimais.
+    A linha 0 corresponde à borda norte, como no formato ESRI ASCII Grid,
+    e os valores representam o centro de cada célula.
+    """
+
+    def __init__(self, dados: np.ndarray, lat_max: float, lon_min: float, passo: float, nodata: int = NODATA):
+        self.dados = dados
+        self.lat_max = lat_max
+        self.lon_min = lon_min
+        self.passo = passo
+        self.nodata = nodata
+
+    def lookup(self, lats, lons) -> np.ndarray:
+        """
+        Interpolação bilinear vetorizada para vários pontos de uma vez.
+        Retorna NaN para pontos fora da grade ou vizinhos sem dado.
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+        n_lin, n_col = self.dados.shape
+
+        # Posição fracionária em relação ao centro das células
+        lin = (self.lat_max - lats) / self.passo - 0.5
+        col = (lons - self.lon_min) / self.passo - 0.5
+        dentro = (lin >= -0.5) & (lin <= n_lin - 0.5) & (col >= -0.5) & (col <= n_col - 0.5)
+
+        lin = np.clip(lin, 0, n_lin - 1)
+        col = np.clip(col, 0, n_col - 1)
+        l0 = np.minimum(np.floor(lin).astype(np.intp), max(n_lin - 2, 0))
+        c0 = np.minimum(np.floor(col).astype(np.intp), max(n_col - 2, 0))
+        l1 = np.minimum(l0 + 1, n_lin - 1)
+        c1 = np.minimum(c0 + 1, n_col - 1)
+        fl = lin - l0
+        fc = col - c0
+
+        v00 = self.dados[l0, c0].astype(np.float64)
+        v01 = self.dados[l0, c1].astype(np.float64)
+        v10 = self.dados[l1, c0].astype(np.float64)
+        v11 = self.dados[l1, c1].astype(np.float64)
+
+        valores = (
+            v00 * (1 - fl) * (1 - fc)
+            + v01 * (1 - fl) * fc
+            + v10 * fl * (1 - fc)
+            + v11 * fl * fc
+        )
+        sem_dado = (v00 == self.nodata) | (v01 == self.nodata) | (v10 == self.nodata) | (v11 == self.nodata)
+        valores[sem_dado | ~dentro] = np.nan
+        return valores
+
+
+def _ler_ascii_grid(caminho: Path) -> tuple[dict, np.ndarray]:
+    """
+    Lê um arquivo ESRI ASCII Grid (.asc), formato comum de exportação de tiles SRTM/GMTED.
+    """
+    header = {}
+    with open(caminho, "r") as f:
+        for _ in range(6):
+            chave, valor = f.readline().split()
+            header[chave.lower()] = float(valor)
+    dados = pd.read_csv(caminho, skiprows=6, sep=r"\s+", header=None, dtype=np.float32).to_numpy()
+    return header, dados
+
+
+def construir_grade_elevacao(tiles: list[Path], destino: Path = ELEVATION_GRID_DIR, bbox: tuple = BRASIL_BBOX) -> Path:
+    """
+    Monta um mosaico dos tiles DEM (.asc) recortado para o Brasil e salva em formato
+    .npy (int16, metros) com um arquivo de metadados, pronto para ser aberto com mmap.
+    Todos os tiles devem ter a mesma resolução.
+    """
+    lat_min, lat_max, lon_min, lon_max = bbox
+    passo = None
+    grade = None
+
+    for tile in tiles:
+        header, dados = _ler_ascii_grid(Path(tile))
+        if passo is None:
+            passo = header["cellsize"]
+            n_lin = int(round((lat_max - lat_min) / passo))
+            n_col = int(round((lon_max - lon_min) / passo))
+            grade = np.full((n_lin, n_col), NODATA, dtype=np.int16)
+        elif not np.isclose(header["cellsize"], passo):
+            raise Exception(f"Resolução diferente no tile {tile}")
+
+        nodata_tile = header.get("nodata_value", NODATA)
+        valores = np.where(dados == nodata_tile, NODATA, np.round(dados)).astype(np.int16)
+
+        # Posição do tile dentro da grade final
+        tile_lat_max = header["yllcorner"] + header["nrows"] * passo
+        lin0 = int(round((lat_max - tile_lat_max) / passo))
+        col0 = int(round((header["xllcorner"] - lon_min) / passo))
+
+        # Recorte da interseção entre o tile e a grade
+        l_ini, c_ini = max(lin0, 0), max(col0, 0)
+        l_fim = min(lin0 + valores.shape[0], grade.shape[0])
+        c_fim = min(col0 + valores.shape[1], grade.shape[1])
+        if l_ini >= l_fim or c_ini >= c_fim:
+            continue
+        grade[l_ini:l_fim, c_ini:c_fim] = valores[l_ini - lin0:l_fim - lin0, c_ini - col0:c_fim - col0]
+
+    if grade is None:
+        raise Exception("Nenhum tile informado")
+
+    destino.mkdir(parents=True, exist_ok=True)
+    np.save(destino / "grade.npy", grade)
+    with open(destino / "meta.json", "w") as f:
+        json.dump({"lat_max": lat_max, "lon_min": lon_min, "passo": passo, "nodata": NODATA}, f)
+
+    get_grade_elevacao.cache_clear()
+    return destino
+
+
+@lru_cache(maxsize=1)
+def get_grade_elevacao() -> ElevationGrid | None:
+    """
+    Abre a grade de elevação em modo memory-mapped. Retorna None se ela ainda não foi construída.
+    """
+    meta_path = ELEVATION_GRID_DIR / "meta.json"
+    grade_path = ELEVATION_GRID_DIR / "grade.npy"
+    if not meta_path.exists() or not grade_path.exists():
+        return None
+    with open(meta_path) as f:
+        meta = json.load(f)
+    dados = np.load(grade_path, mmap_mode="r")
+    return ElevationGrid(dados, meta["lat_max"], meta["lon_min"], meta["passo"], meta["nodata"])
+
+
+def altitude_estacao_mais_proxima(lats, lons) -> np.ndarray:
+    """
+    Altitude da estação do INMET mais próxima (distância haversine) de cada ponto.
+    Retorna NaN se o catálogo de estações não estiver disponível.
+    """
+    lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+    index = get_station_index()
+    if index is None or lats.size == 0:
+        return np.full(lats.shape, np.nan)
+    _, indices = index.query(lats, lons, k=1)
+    return index.altitudes[indices[:, 0]]
+
+
+def altitude_local(lats, lons) -> np.ndarray:
+    """
+    Altitude sem acesso à rede: grade DEM e, na falta dela, a estação mais próxima.
+    Retorna NaN onde nenhuma das fontes está disponível.
+    """
+    lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+    lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+
+    grade = get_grade_elevacao()
+    if grade is not None:
+        valores = grade.lookup(lats, lons)
+    else:
+        valores = np.full(lats.shape, np.nan)
+
+    faltantes = np.isnan(valores)
+    if faltantes.any():
+        valores[faltantes] = altitude_estacao_mais_proxima(lats[faltantes], lons[faltantes])
+    return valores
+
+
+def altitude(lats, lons, padrao: float = ALTITUDE_PADRAO) -> np.ndarray:
+    """
+    Altitude local para vários pontos, usando o valor padrão onde não houver dado.
+    """
+    valores = altitude_local(lats, lons)
+    return np.where(np.isnan(valores), padrao, valores)
+
+
+if __name__ == "__main__":
+    # Uso: python -m src.services.elevation_service tile1.asc tile2.asc ...
+    print(construir_grade_elevacao([Path(p) for p in sys.argv[1:]]))
@@ -0,0 +1,191 @@
+import time
+import asyncio
+import sqlite3
+import threading
+import unicodedata
+
+import numpy as np
+from geopy.geocoders import Nominatim
+from geopy.exc import GeocoderRateLimited, GeocoderTimedOut, GeocoderUnavailable
+
+from src.core.config import (
+    NOMINATIM_USER_AGENT,
+    NOMINATIM_DOMAIN,
+    NOMINATIM_SCHEME,
+    ELEVATION_URL,
+    ELEVATION_LOTE,
+    GEOCODE_CACHE_FILE,
+    HTTP_READ_TIMEOUT,
+)
+from src.core.http_client import get_async_session, run_sync
+from src.core.rate_limit import nominatim_bucket, elevation_bucket, segundos_retry_after
+from src.services.elevation_service import altitude_local
+
+TENTATIVAS = 3
+# Endereços não encontrados são consultados de novo depois deste prazo
+VALIDADE_NAO_ENCONTRADO_S = 30 * 24 * 3600
+
+geolocator = Nominatim(
+    user_agent=NOMINATIM_USER_AGENT,
+    domain=NOMINATIM_DOMAIN,
+    scheme=NOMINATIM_SCHEME,
+    timeout=HTTP_READ_TIMEOUT,
+)
+
+
+def normalizar_endereco(endereco: str) -> str:
+    """
+    Chave de cache/deduplicação: sem acentos, minúsculas e espaços colapsados.
+    """
+    texto = unicodedata.normalize("NFKD", endereco)
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.casefold().split())
+
+
+class GeocodeCache:
+    """
+    Cache persistente (SQLite) de endereços geocodificados, com a altitude já resolvida.
+    Também guarda os endereços não encontrados, para não repetir a consulta a cada importação.
+    """
+
+    def __init__(self, caminho=GEOCODE_CACHE_FILE):
+        self.caminho = caminho
+        self._conexao = None
+        self._lock = threading.Lock()
+
+    def _conectar(self) -> sqlite3.Connection:
+        if self._conexao is None:
+            self.caminho.parent.mkdir(parents=True, exist_ok=True)
+            self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+            self._conexao.execute(
+                "CREATE TABLE IF NOT EXISTS geocodificacao ("
+                "chave TEXT PRIMARY KEY, latitude REAL, longitude REAL, altitude REAL, "
+                "encontrado INTEGER, atualizado REAL)"
+            )
+        return self._conexao
+
+    def obter(self, chaves: list[str]) -> dict[str, dict]:
+        """
+        Entradas válidas do cache para as chaves informadas ({chave: resultado}).
+        """
+        resultados = {}
+        limite_negativo = time.time() - VALIDADE_NAO_ENCONTRADO_S
+        with self._lock:
+            conexao = self._conectar()
+            # Consulta em blocos para respeitar o limite de parâmetros do SQLite
+            for i in range(0, len(chaves), 500):
+                bloco = chaves[i:i + 500]
+                linhas = conexao.execute(
+                    "SELECT chave, latitude, longitude, altitude, encontrado, atualizado FROM geocodificacao "
+                    f"WHERE chave IN ({','.join('?' * len(bloco))})",
+                    bloco,
+                ).fetchall()
+                for chave, lat, lon, alt, encontrado, atualizado in linhas:
+                    if encontrado:
+                        resultados[chave] = {"status": "ok", "latitude": lat, "longitude": lon, "altitude": alt}
+                    elif atualizado >= limite_negativo:
+                        resultados[chave] = {"status": "nao_encontrado"}
+        return resultados
+
+    def gravar(self, itens: dict[str, dict]):
+        agora = time.time()
+        linhas = [
+            (chave, r.get("latitude"), r.get("longitude"), r.get("altitude"), int(r["status"] == "ok"), agora)
+            for chave, r in itens.items()
+            if r["status"] in ("ok", "nao_encontrado")
+        ]
+        with self._lock:
+            conexao = self._conectar()
+            conexao.executemany("INSERT OR REPLACE INTO geocodificacao VALUES (?, ?, ?, ?, ?, ?)", linhas)
+            conexao.commit()
+
+
+geocode_cache = GeocodeCache()
+
+
+async def geocode(address: str):
+    """
+    Geocodifica um endereço via Nominatim, respeitando o limite de taxa do serviço.
+    O cliente do geopy é síncrono, então a chamada é executada em uma thread.
+    Em caso de 429 o limitador é suspenso pelo Retry-After; falhas transitórias são repetidas.
+    """
+    for tentativa in range(TENTATIVAS):
+        await nominatim_bucket.adquirir()
+        try:
+            return await run_sync(geolocator.geocode, address)
+        except GeocoderRateLimited as e:
+            if tentativa == TENTATIVAS - 1:
+                raise
+            nominatim_bucket.penalizar(e.retry_after or 5 * 2 ** tentativa)
+        except (GeocoderTimedOut, GeocoderUnavailable):
+            if tentativa == TENTATIVAS - 1:
+                raise
+            await asyncio.sleep(2 ** tentativa)
+
+
+async def get_elevations(pontos: list[tuple[float, float]]) -> list[float | None]:
+    """
+    Consulta a altitude de vários pontos na API open-elevation (POST em lotes de ELEVATION_LOTE),
+    usando a sessão compartilhada e o limitador de taxa do serviço.
+    """
+    session = get_async_session()
+    altitudes = []
+    for i in range(0, len(pontos), ELEVATION_LOTE):
+        corpo = {"locations": [{"latitude": lat, "longitude": lon} for lat, lon in pontos[i:i + ELEVATION_LOTE]]}
+        for tentativa in range(TENTATIVAS):
+            await elevation_bucket.adquirir()
+            async with session.post(ELEVATION_URL, json=corpo) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    break
+                if response.status in (429, 503) and tentativa < TENTATIVAS - 1:
+                    elevation_bucket.penalizar(segundos_retry_after(response.headers.get("Retry-After"), 2 ** tentativa))
+                    continue
+                raise Exception("Erro ao obter altitude")
+        altitudes.extend(r["elevation"] for r in data["results"])
+    return altitudes
+
+
+async def get_elevation(lat: float, lon: float) -> float:
+    """
+    Consulta a altitude de um ponto na API open-elevation.
+    """
+    return (await get_elevations([(lat, lon)]))[0]
+
+
+async def resolver_altitudes(lats: list[float], lons: list[float]) -> list[float | None]:
+    """
+    Altitude local (grade DEM / estação mais próxima) para todos os pontos de uma vez;
+    só os pontos sem dado local vão à API externa, em lotes de ELEVATION_LOTE. A falha de
+    um lote não descarta os demais. Retorna None onde nenhuma fonte respondeu.
+    """
+    valores = await run_sync(altitude_local, lats, lons)
+    faltantes = np.flatnonzero(np.isnan(valores))
+    for i in range(0, len(faltantes), ELEVATION_LOTE):
+        lote = faltantes[i:i + ELEVATION_LOTE]
+        try:
+            remotas = await get_elevations([(lats[j], lons[j]) for j in lote])
+            valores[lote] = [np.nan if a is None else a for a in remotas]
+        except Exception as e:
+            print(f"Erro ao obter altitudes ({len(lote)} pontos): {e}")
+    return [None if np.isnan(v) else float(v) for v in valores]
+
+
+async def geocodificar(endereco: str) -> dict:
+    """
+    Latitude, longitude e altitude de um endereço, consultando o cache antes do Nominatim.
+    """
+    chave = normalizar_endereco(endereco)
+    em_cache = (await run_sync(geocode_cache.obter, [chave])).get(chave)
+    if em_cache is not None:
+        return em_cache
+
+    location = await geocode(endereco)
+    if not location:
+        resultado = {"status": "nao_encontrado"}
+    else:
+        altitude = (await resolver_altitudes([location.latitude], [location.longitude]))[0]
+        resultado = {"status": "ok", "latitude": location.latitude, "longitude": location.longitude, "altitude": altitude}
+    if resultado["status"] == "nao_encontrado" or resultado["altitude"] is not None:
+        await run_sync(geocode_cache.gravar, {chave: resultado})
+    return resultado
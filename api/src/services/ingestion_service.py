@@ -0,0 +1,206 @@
+import io
+import zipfile
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.core.config import OBSERVATIONS_DIR, STATIONS_FILE
+from src.services.download_store import download_store
+from src.services.station_index import reset_station_index
+from src.services.climatology_service import construir_climatologia
+from src.services.rollup_service import construir_rollups_ano
+
+# Colunas do catálogo de estações, na ordem em que são salvas
+COLUNAS_ESTACAO = ["codigo", "estacao", "uf", "regiao", "latitude", "longitude", "altitude"]
+
+# Colunas meteorológicas do arquivo: nome normalizado -> trecho do cabeçalho original
+COLUNAS_OBSERVACAO = {
+    "radiacao": "radiacao global",
+    "temperatura": "bulbo seco, horaria",
+    "precipitacao": "precipitacao total",
+    "umidade": "umidade relativa do ar, horaria",
+    "vento": "vento, velocidade horaria",
+}
+
+
+def _normalizar(texto: str) -> str:
+    """
+    Remove acentos e converte para minúsculas.
+    """
+    texto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in texto if not unicodedata.combining(c)).strip().lower()
+
+
+def _para_float(valor: str) -> float:
+    try:
+        return float(valor.replace(",", "."))
+    except (AttributeError, ValueError):
+        return np.nan
+
+
+def ler_metadados(linhas: list[str]) -> dict:
+    """
+    Interpreta as 8 linhas de cabeçalho de um CSV do INMET
+    (REGIAO, UF, ESTACAO, CODIGO (WMO), LATITUDE, LONGITUDE, ALTITUDE, DATA DE FUNDACAO).
+    """
+    metadados = {}
+    for linha in linhas:
+        partes = linha.strip().split(":", 1)
+        if len(partes) == 2:
+            chave = _normalizar(partes[0]).upper().replace(" ", "_")
+            metadados[chave] = partes[1].strip().lstrip(";").strip()
+
+    return {
+        "codigo": metadados.get("CODIGO_(WMO)", ""),
+        "estacao": metadados.get("ESTACAO", ""),
+        "uf": metadados.get("UF", ""),
+        "regiao": metadados.get("REGIAO", ""),
+        "latitude": _para_float(metadados.get("LATITUDE")),
+        "longitude": _para_float(metadados.get("LONGITUDE")),
+        "altitude": _para_float(metadados.get("ALTITUDE")),
+    }
+
+
+def ler_csv_inmet(conteudo: bytes) -> tuple[dict, pd.DataFrame]:
+    """
+    Lê um CSV de estação do INMET (cabeçalho de 8 linhas + dados horários).
+    Retorna os metadados da estação e um DataFrame com as observações normalizadas.
+    """
+    texto = conteudo.decode("latin1")
+    linhas = texto.splitlines()
+    estacao = ler_metadados(linhas[:8])
+
+    df = pd.read_csv(
+        io.StringIO(texto),
+        skiprows=8,
+        sep=";",
+        na_values=["-9999", "-9999,0"],
+        dtype=str,
+    )
+    colunas = {_normalizar(c): c for c in df.columns}
+
+    # Data e hora: 'Data' / 'DATA (YYYY-MM-DD)' e 'Hora UTC' ('0000 UTC') / 'HORA (UTC)' ('00:00')
+    col_data = next(c for n, c in colunas.items() if n.startswith("data"))
+    col_hora = next(c for n, c in colunas.items() if n.startswith("hora"))
+    datas = pd.to_datetime(df[col_data].str.replace("/", "-", regex=False), format="%Y-%m-%d", errors="coerce")
+    horas = pd.to_numeric(
+        df[col_hora].str.replace(r"\D", "", regex=True).str[:2], errors="coerce"
+    )
+
+    observacoes = pd.DataFrame({
+        "codigo": estacao["codigo"],
+        "data": datas,
+        "mes": datas.dt.month.astype("Int8"),
+        "hora": horas.astype("Int8"),
+    })
+    for nome, trecho in COLUNAS_OBSERVACAO.items():
+        coluna = next((c for n, c in colunas.items() if trecho in n), None)
+        if coluna is None:
+            observacoes[nome] = np.float32(np.nan)
+        else:
+            valores = pd.to_numeric(df[coluna].str.replace(",", ".", regex=False), errors="coerce")
+            observacoes[nome] = valores.astype(np.float32)
+
+    observacoes = observacoes.dropna(subset=["data", "hora"])
+    observacoes["mes"] = observacoes["mes"].astype(np.int8)
+    observacoes["hora"] = observacoes["hora"].astype(np.int8)
+    return estacao, observacoes
+
+
+def ingerir_ano(year: str) -> tuple[pd.DataFrame, Path] | None:
+    """
+    Lê o arquivo '{year}.zip' baixado do INMET e grava a partição de observações do ano.
+    Retorna os metadados das estações encontradas e o caminho da partição.
+    """
+    estacoes = []
+    partes = []
+    # O zip não pode ser descartado do armazenamento enquanto é lido
+    with download_store.em_uso(f"{year}.zip") as zip_path:
+        if zip_path is None or not zip_path.exists():
+            return None
+        with zipfile.ZipFile(zip_path) as zf:
+            for nome in zf.namelist():
+                if not nome.lower().endswith(".csv"):
+                    continue
+                try:
+                    estacao, observacoes = ler_csv_inmet(zf.read(nome))
+                except Exception as e:
+                    print(f"Erro ao ler {nome}: {e}")
+                    continue
+                if not estacao["codigo"]:
+                    continue
+                estacoes.append(estacao)
+                partes.append(observacoes)
+
+    if not partes:
+        return None
+
+    OBSERVATIONS_DIR.mkdir(parents=True, exist_ok=True)
+    particao = OBSERVATIONS_DIR / f"ano={year}.parquet"
+    df = pd.concat(partes, ignore_index=True)
+    df["codigo"] = df["codigo"].astype("category")
+    df.to_parquet(particao, index=False)
+
+    return pd.DataFrame(estacoes, columns=COLUNAS_ESTACAO), particao
+
+
+def atualizar_catalogo(novas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mescla as estações recém-ingeridas no catálogo (a leitura mais recente prevalece).
+    """
+    if STATIONS_FILE.exists():
+        catalogo = pd.concat([pd.read_csv(STATIONS_FILE, dtype={"codigo": str}), novas], ignore_index=True)
+    else:
+        catalogo = novas
+    catalogo = (
+        catalogo.dropna(subset=["latitude", "longitude"])
+        .drop_duplicates("codigo", keep="last")
+        .sort_values("codigo")
+        .reset_index(drop=True)
+    )
+    STATIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    catalogo.to_csv(STATIONS_FILE, index=False)
+    return catalogo
+
+
+def anos_baixados() -> list[str]:
+    """
+    Lista os anos com arquivo zip disponível no armazenamento de downloads.
+    """
+    return [nome.removesuffix(".zip") for nome in download_store.listar(r"\d{4}\.zip")]
+
+
+def ingest_downloads(years: list[str] = None) -> dict:
+    """
+    Ingere os arquivos baixados dos anos especificados (ou de todos os disponíveis),
+    gerando as partições de observações, o catálogo de estações e a climatologia.
+    """
+    years = years or anos_baixados()
+    results = {}
+    novas = []
+    for year in years:
+        resultado = ingerir_ano(year)
+        if resultado is None:
+            results[year] = {"success": False, "file_path": None}
+            continue
+        estacoes, particao = resultado
+        novas.append(estacoes)
+        results[year] = {"success": True, "file_path": str(particao), "stations": len(estacoes)}
+
+    if novas:
+        atualizar_catalogo(pd.concat(novas, ignore_index=True))
+        reset_station_index()
+        construir_climatologia()
+
+        # Rollups apenas dos anos ingeridos agora (depois do catálogo, que dá a região das estações)
+        for year, r in results.items():
+            if r["success"]:
+                r["rollups"] = construir_rollups_ano(year)
+
+        # Os arquivos que alimentam a climatologia do modelo em uso não podem ser descartados
+        from src.model.model import versao_modelo
+        ingeridos = [f"{year}.zip" for year, r in results.items() if r["success"]]
+        download_store.fixar(versao_modelo(), ingeridos)
+    return results
@@ -0,0 +1,110 @@
+import time
+import asyncio
+from datetime import date, datetime, timedelta
+
+from src.core.config import PREMATERIALIZACAO_DIAS
+from src.core.http_client import run_sync
+from src.model.model import calcular_intervalo_por_regiao
+from src.services.tile_service import preaquecer_tiles
+
+
+class PreMaterializador:
+    """
+    Mantém em memória a irradiação média diária das regiões para os próximos N dias.
+    O cálculo é feito em uma única previsão vetorizada na inicialização e a cada meia-noite,
+    então as consultas dessas datas não executam o modelo.
+    """
+
+    def __init__(self, dias: int = PREMATERIALIZACAO_DIAS):
+        self.dias = dias
+        self.cache: dict[str, dict] = {}
+        self.ultima_atualizacao: datetime | None = None
+        self.duracao_atualizacao: float | None = None
+        self.ultimo_erro: str | None = None
+        self._tarefa: asyncio.Task | None = None
+
+    async def atualizar(self):
+        """
+        Recalcula as próximas N datas (a partir de hoje) e descarta as datas passadas.
+        """
+        inicio = datetime.now().date()
+        fim = inicio + timedelta(days=self.dias - 1)
+        t0 = time.perf_counter()
+        _, medias = await run_sync(calcular_intervalo_por_regiao, inicio, fim)
+        # Troca o dicionário inteiro: leitores concorrentes nunca veem um estado parcial
+        self.cache = medias
+        self.duracao_atualizacao = time.perf_counter() - t0
+        self.ultima_atualizacao = datetime.now()
+        self.ultimo_erro = None
+        print(f"Pré-materialização: {len(medias)} dias calculados em {self.duracao_atualizacao:.2f}s")
+
+    async def _agendar(self):
+        while True:
+            try:
+                await self.atualizar()
+            except Exception as e:
+                # Falha (ex.: modelo indisponível): tenta de novo em 1 minuto
+                self.ultimo_erro = str(e)
+                print(f"Erro na pré-materialização: {e}")
+                await asyncio.sleep(60)
+                continue
+
+            try:
+                await preaquecer_tiles([date.fromisoformat(d) for d in sorted(self.cache)])
+            except Exception as e:
+                print(f"Erro no pré-aquecimento dos tiles: {e}")
+
+            agora = datetime.now()
+            meia_noite = datetime.combine(agora.date() + timedelta(days=1), datetime.min.time())
+            await asyncio.sleep((meia_noite - agora).total_seconds() + 1)
+
+    def start(self):
+        """
+        Inicia o agendamento (cálculo imediato e depois a cada meia-noite).
+        """
+        if self.dias <= 0:
+            return
+        if self._tarefa is None or self._tarefa.done():
+            self._tarefa = asyncio.create_task(self._agendar())
+
+    async def stop(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+
+    def obter(self, data: date) -> dict | None:
+        """
+        Médias por região de uma data, se ela estiver pré-materializada.
+        """
+        return self.cache.get(data.isoformat())
+
+    def obter_intervalo(self, inicio: date, fim: date) -> dict | None:
+        """
+        Médias por região de todas as datas do intervalo, ou None se alguma não estiver em memória.
+        """
+        cache = self.cache
+        resultado = {}
+        dia = inicio
+        while dia <= fim:
+            medias = cache.get(dia.isoformat())
+            if medias is None:
+                return None
+            resultado[dia.isoformat()] = medias
+            dia += timedelta(days=1)
+        return resultado
+
+    def status(self) -> dict:
+        return {
+            "dias": self.dias,
+            "datas": sorted(self.cache),
+            "ultima_atualizacao": self.ultima_atualizacao.isoformat() if self.ultima_atualizacao else None,
+            "duracao_atualizacao_s": round(self.duracao_atualizacao, 3) if self.duracao_atualizacao else None,
+            "ultimo_erro": self.ultimo_erro,
+        }
+
+
+pre_materializador = PreMaterializador()
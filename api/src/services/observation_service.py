@@ -0,0 +1,30 @@
+from datetime import date, datetime, time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.core.config import OBSERVATIONS_DIR
+from src.services.ingestion_service import COLUNAS_OBSERVACAO
+
+COLUNAS_PADRAO = ["codigo", "data", "hora", *COLUNAS_OBSERVACAO]
+
+
+def consultar_observacoes(codigo: str, inicio: date, fim: date, colunas: list[str] = None) -> pa.Table:
+    """
+    Lê as observações horárias de uma estação entre duas datas, direto das partições
+    anuais em Parquet (apenas as colunas e os row groups necessários).
+    """
+    colunas = colunas or COLUNAS_PADRAO
+    filtros = [
+        ("codigo", "=", codigo),
+        ("data", ">=", datetime.combine(inicio, time.min)),
+        ("data", "<=", datetime.combine(fim, time.min)),
+    ]
+    partes = []
+    for ano in range(inicio.year, fim.year + 1):
+        particao = OBSERVATIONS_DIR / f"ano={ano}.parquet"
+        if particao.exists():
+            partes.append(pq.read_table(particao, columns=colunas, filters=filtros))
+    if not partes:
+        return pa.table({c: pa.array([], type=pa.float32()) for c in colunas})
+    return pa.concat_tables(partes, promote_options="default").combine_chunks()
@@ -0,0 +1,180 @@
+import sys
+import time
+import asyncio
+
+import aiohttp
+
+from src.core.config import (
+    STREAMLIT_APP_PATH,
+    STREAMLIT_PORT,
+    STREAMLIT_HEALTH_URL,
+    STREAMLIT_STARTUP_TIMEOUT,
+)
+from src.core.http_client import get_async_session
+
+
+class ProcessSupervisor:
+    """
+    Supervisiona um processo filho: inicia sob demanda, aguarda o health check responder,
+    reinicia com backoff exponencial se o processo morrer e expõe o status atual.
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        comando: list[str],
+        health_url: str,
+        startup_timeout: float = 60.0,
+        intervalo_health: float = 0.2,
+        backoff_inicial: float = 1.0,
+        backoff_max: float = 60.0,
+        tempo_estavel: float = 60.0,
+    ):
+        self.nome = nome
+        self.comando = comando
+        self.health_url = health_url
+        self.startup_timeout = startup_timeout
+        self.intervalo_health = intervalo_health
+        self.backoff_inicial = backoff_inicial
+        self.backoff_max = backoff_max
+        self.tempo_estavel = tempo_estavel
+
+        self.estado = "stopped"
+        self.processo: asyncio.subprocess.Process | None = None
+        self.reinicios = 0
+        self.latencia_inicio: float | None = None
+        self.ultimo_erro: str | None = None
+        self._tarefa: asyncio.Task | None = None
+        self._pronto = asyncio.Event()
+        self._parando = False
+
+    async def start(self):
+        """
+        Inicia a supervisão, se ainda não estiver ativa.
+        """
+        if self._tarefa is not None and not self._tarefa.done():
+            return
+        self._parando = False
+        self._pronto.clear()
+        self._tarefa = asyncio.create_task(self._supervisionar())
+
+    async def wait_ready(self, timeout: float | None = None) -> bool:
+        """
+        Aguarda o processo ficar pronto. Retorna False se o tempo limite for atingido
+        ou assim que a supervisão terminar sem sucesso (estado 'failed').
+        """
+        if self._pronto.is_set():
+            return True
+        espera = asyncio.create_task(self._pronto.wait())
+        aguardados = {espera}
+        if self._tarefa is not None:
+            aguardados.add(self._tarefa)
+        try:
+            await asyncio.wait(aguardados, timeout=timeout or self.startup_timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            espera.cancel()
+        return self._pronto.is_set()
+
+    async def stop(self):
+        """
+        Encerra o processo e a supervisão.
+        """
+        self._parando = True
+        await self._encerrar_processo()
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+        self._pronto.clear()
+        self.estado = "stopped"
+
+    def status(self) -> dict:
+        return {
+            "name": self.nome,
+            "state": self.estado,
+            "pid": self.processo.pid if self.processo and self.processo.returncode is None else None,
+            "restarts": self.reinicios,
+            "startup_latency_s": round(self.latencia_inicio, 3) if self.latencia_inicio is not None else None,
+            "last_error": self.ultimo_erro,
+        }
+
+    async def _saudavel(self) -> bool:
+        try:
+            timeout = aiohttp.ClientTimeout(total=1)
+            async with get_async_session().get(self.health_url, timeout=timeout) as response:
+                return response.status == 200
+        except Exception:
+            return False
+
+    async def _aguardar_pronto(self, inicio: float) -> bool:
+        """
+        Consulta o health check até o processo responder, morrer ou estourar o tempo limite.
+        """
+        while time.monotonic() - inicio < self.startup_timeout:
+            if self.processo.returncode is not None:
+                return False
+            if await self._saudavel():
+                return True
+            await asyncio.sleep(self.intervalo_health)
+        return False
+
+    async def _encerrar_processo(self):
+        processo = self.processo
+        if processo is None or processo.returncode is not None:
+            return
+        processo.terminate()
+        try:
+            await asyncio.wait_for(processo.wait(), 10)
+        except asyncio.TimeoutError:
+            processo.kill()
+            await processo.wait()
+
+    async def _supervisionar(self):
+        backoff = self.backoff_inicial
+        while not self._parando:
+            self.estado = "starting"
+            inicio = time.monotonic()
+            try:
+                self.processo = await asyncio.create_subprocess_exec(*self.comando)
+            except Exception as e:
+                self.ultimo_erro = str(e)
+                self.estado = "failed"
+                return
+
+            if await self._aguardar_pronto(inicio):
+                self.latencia_inicio = time.monotonic() - inicio
+                self.estado = "running"
+                self._pronto.set()
+            else:
+                self.ultimo_erro = "Processo não ficou pronto dentro do tempo limite"
+                await self._encerrar_processo()
+
+            codigo = await self.processo.wait()
+            self._pronto.clear()
+            if self._parando:
+                break
+
+            # Processo caiu: reinicia com backoff (zerado se ele ficou estável por um tempo)
+            if time.monotonic() - inicio > self.tempo_estavel:
+                backoff = self.backoff_inicial
+            self.ultimo_erro = self.ultimo_erro or f"Processo terminou com código {codigo}"
+            self.reinicios += 1
+            self.estado = "restarting"
+            print(f"{self.nome} terminou (código {codigo}); reiniciando em {backoff:.0f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.backoff_max)
+            self.ultimo_erro = None
+
+
+streamlit_supervisor = ProcessSupervisor(
+    nome="streamlit",
+    comando=[
+        sys.executable, "-m", "streamlit", "run", STREAMLIT_APP_PATH,
+        f"--server.port={STREAMLIT_PORT}", "--server.headless=true"
+    ],
+    health_url=STREAMLIT_HEALTH_URL,
+    startup_timeout=STREAMLIT_STARTUP_TIMEOUT,
+)
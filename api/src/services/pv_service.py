@@ -0,0 +1,100 @@
+import numpy as np
+
+from src.model.model import montar_features, prever_radiacao
+from src.model.solar import horas_diurnas
+from src.services.climatology_service import clima_para_pontos
+from src.services.elevation_service import altitude as altitude_local
+
+# Ano não bissexto usado como "ano típico" (8760 horas)
+ANO_TIPICO = 2023
+
+# Parâmetros térmicos típicos de módulos de silício cristalino
+NOCT = 45.0                  # Temperatura nominal de operação da célula (°C)
+COEF_TEMPERATURA = -0.004    # Variação de potência por °C acima de 25 °C
+
+
+def _dias_ano_tipico() -> np.ndarray:
+    return np.arange(f"{ANO_TIPICO}-01-01", f"{ANO_TIPICO + 1}-01-01", dtype="datetime64[D]")
+
+
+def _horas_ano_tipico() -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Mês, dia do ano e hora (UTC) de cada uma das 8760 horas do ano típico.
+    """
+    dias = _dias_ano_tipico()
+    meses_dia = dias.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    mes = np.repeat(meses_dia, 24)
+    dia_ano = np.repeat(np.arange(1, len(dias) + 1), 24)
+    hora = np.tile(np.arange(24), len(dias))
+    return mes, dia_ano, hora
+
+
+def simular_ano_tipico(
+    latitude: float,
+    longitude: float,
+    potencia_kwp: float = 1.0,
+    fator_performance: float = 0.75,
+    altitude: float = None,
+    horario: bool = False,
+) -> dict:
+    """
+    Simula a geração horária de um sistema fotovoltaico ao longo de um ano típico (8760 h).
+    Todo o ano é calculado de uma vez como arrays NumPy: irradiação horária do modelo,
+    perda por temperatura a partir da climatologia e fator de performance do sistema.
+    Retorna a geração mensal e anual em kWh e, se 'horario' for True, as séries horárias.
+    A irradiação é física (kWh/m²), comparável a /model com unidade='kwh'; a escala
+    'indice' do /model não se aplica aqui (ver UNIDADES_IRRADIACAO em model.py).
+    """
+    if altitude is None:
+        altitude = float(altitude_local(latitude, longitude)[0])
+
+    mes, dia_ano, hora = _horas_ano_tipico()
+    clima = clima_para_pontos(latitude, longitude, mes, hora)
+
+    # Apenas as horas com sol acima do horizonte vão ao modelo; à noite a irradiação é nula
+    diurnas = horas_diurnas(latitude, longitude, _dias_ano_tipico()).ravel()
+    radiacao_kj = np.zeros(len(hora))
+    df_previsao = montar_features(
+        latitude, longitude, altitude, mes[diurnas], dia_ano[diurnas], hora[diurnas], clima[diurnas]
+    )
+    radiacao_kj[diurnas] = np.clip(prever_radiacao(df_previsao), 0, None)
+
+    # Irradiação horária: kJ/m² -> Wh/m² (equivale à irradiância média da hora em W/m²)
+    irradiancia = radiacao_kj / 3.6
+
+    # Temperatura da célula e perda térmica em relação a 25 °C
+    temperatura_celula = clima[:, 0] + (NOCT - 20) / 800 * irradiancia
+    fator_temperatura = np.clip(1 + COEF_TEMPERATURA * (temperatura_celula - 25), 0, None)
+
+    # Geração horária (kWh): potência nominal é definida para 1000 W/m²
+    geracao = potencia_kwp * irradiancia / 1000 * fator_temperatura * fator_performance
+
+    geracao_mensal = np.bincount(mes - 1, weights=geracao, minlength=12)
+    irradiacao_mensal = np.bincount(mes - 1, weights=irradiancia, minlength=12) / 1000
+    geracao_sem_perda_termica = potencia_kwp * irradiancia.sum() / 1000 * fator_performance
+
+    resultado = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "altitude": altitude,
+        "potencia_kwp": potencia_kwp,
+        "fator_performance": fator_performance,
+        "geracao_mensal_kwh": [round(float(v), 2) for v in geracao_mensal],
+        "geracao_anual_kwh": round(float(geracao.sum()), 2),
+        "irradiacao_mensal_kwh_m2": [round(float(v), 2) for v in irradiacao_mensal],
+        "irradiacao_anual_kwh_m2": round(float(irradiancia.sum() / 1000), 2),
+        "irradiacao_diaria_media_kwh_m2": round(float(irradiancia.sum() / 1000 / len(_dias_ano_tipico())), 2),
+        "perda_temperatura_percent": round(
+            float(100 * (1 - geracao.sum() / geracao_sem_perda_termica)) if geracao_sem_perda_termica else 0.0, 2
+        ),
+    }
+    if horario:
+        resultado["horario"] = {
+            "mes": mes.astype(np.int8),
+            "dia_ano": dia_ano.astype(np.int16),
+            "hora_utc": hora.astype(np.int8),
+            "irradiancia_w_m2": irradiancia.astype(np.float32),
+            "temperatura_celula_c": temperatura_celula.astype(np.float32),
+            "geracao_kwh": geracao.astype(np.float32),
+        }
+    return resultado
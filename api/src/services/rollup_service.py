@@ -0,0 +1,151 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.core.config import OBSERVATIONS_DIR, STATIONS_FILE, ROLLUP_DIR
+
+# Variáveis agregadas; cada uma é guardada como soma, contagem, mínimo e máximo,
+# o que permite combinar períodos, estações e regiões sem voltar aos dados horários
+VARIAVEIS_ROLLUP = ["radiacao", "temperatura", "umidade", "precipitacao"]
+
+# Nível -> colunas de tempo do agrupamento
+NIVEIS = {
+    "diario": ["data"],
+    "mensal": ["ano", "mes"],
+    "mes_hora": ["ano", "mes", "hora"],
+}
+
+AGRUPAMENTOS = {"estacao": "codigo", "regiao": "regiao"}
+
+
+def _caminho(nivel: str, agrupamento: str, year) -> Path:
+    return ROLLUP_DIR / agrupamento / nivel / f"ano={year}.parquet"
+
+
+def _agregacoes() -> dict:
+    agregacoes = {}
+    for v in VARIAVEIS_ROLLUP:
+        agregacoes[f"{v}_soma"] = (f"{v}_soma", "sum")
+        agregacoes[f"{v}_n"] = (f"{v}_n", "sum")
+        agregacoes[f"{v}_min"] = (f"{v}_min", "min")
+        agregacoes[f"{v}_max"] = (f"{v}_max", "max")
+    return agregacoes
+
+
+def _compactar(df: pd.DataFrame, variaveis: list[str] = VARIAVEIS_ROLLUP) -> pd.DataFrame:
+    for v in variaveis:
+        df[f"{v}_soma"] = df[f"{v}_soma"].astype(np.float64)
+        df[f"{v}_n"] = df[f"{v}_n"].astype(np.int32)
+        df[f"{v}_min"] = df[f"{v}_min"].astype(np.float32)
+        df[f"{v}_max"] = df[f"{v}_max"].astype(np.float32)
+    return df
+
+
+def _rollup_estacoes(observacoes: pd.DataFrame, chaves: list[str]) -> pd.DataFrame:
+    grupos = observacoes.groupby(["codigo", *chaves], observed=True, sort=True)
+    partes = {}
+    for v in VARIAVEIS_ROLLUP:
+        coluna = grupos[v]
+        partes[f"{v}_soma"] = coluna.sum()
+        partes[f"{v}_n"] = coluna.count()
+        partes[f"{v}_min"] = coluna.min()
+        partes[f"{v}_max"] = coluna.max()
+    return _compactar(pd.DataFrame(partes).reset_index())
+
+
+def _rollup_regioes(rollup: pd.DataFrame, chaves: list[str], regioes: pd.Series) -> pd.DataFrame:
+    df = rollup.assign(regiao=rollup["codigo"].astype(str).map(regioes)).dropna(subset=["regiao"])
+    resultado = df.groupby(["regiao", *chaves], sort=True).agg(**_agregacoes())
+    return _compactar(resultado.reset_index())
+
+
+def construir_rollups_ano(year) -> dict:
+    """
+    (Re)constrói os rollups diário, mensal e mês × hora de um ano, por estação e por região,
+    a partir da partição de observações do ano. Os demais anos não são tocados.
+    """
+    particao = OBSERVATIONS_DIR / f"ano={year}.parquet"
+    if not particao.exists():
+        return {}
+
+    observacoes = pd.read_parquet(particao, columns=["codigo", "data", "mes", "hora", *VARIAVEIS_ROLLUP])
+    observacoes["data"] = observacoes["data"].dt.normalize()
+    observacoes["ano"] = observacoes["data"].dt.year.astype(np.int16)
+
+    regioes = pd.Series(dtype=str)
+    if STATIONS_FILE.exists():
+        catalogo = pd.read_csv(STATIONS_FILE, dtype={"codigo": str}, usecols=["codigo", "regiao"])
+        regioes = catalogo.set_index("codigo")["regiao"]
+
+    linhas = {}
+    for nivel, chaves in NIVEIS.items():
+        por_estacao = _rollup_estacoes(observacoes, chaves)
+        por_regiao = _rollup_regioes(por_estacao, chaves, regioes)
+        for agrupamento, df in [("estacao", por_estacao), ("regiao", por_regiao)]:
+            caminho = _caminho(nivel, agrupamento, year)
+            caminho.parent.mkdir(parents=True, exist_ok=True)
+            pq.write_table(pa.Table.from_pandas(df, preserve_index=False), caminho, compression="zstd")
+            linhas[f"{agrupamento}/{nivel}"] = len(df)
+    return linhas
+
+
+def consultar_rollup(
+    nivel: str,
+    agrupamento: str = "estacao",
+    chaves: list[str] = None,
+    ano_inicio: int = None,
+    ano_fim: int = None,
+    agregar_anos: bool = False,
+    variaveis: list[str] = None,
+) -> pa.Table:
+    """
+    Consulta os rollups pré-calculados, sem ler as observações horárias.
+    'chaves' filtra códigos de estação ou nomes de região; com 'agregar_anos', os níveis
+    mensal e mês × hora são combinados entre os anos (médias climatológicas).
+    Retorna média, soma, contagem, mínimo e máximo de cada variável.
+    """
+    if nivel not in NIVEIS:
+        raise ValueError(f"Nível inválido: {nivel}. Opções: {', '.join(NIVEIS)}")
+    if agrupamento not in AGRUPAMENTOS:
+        raise ValueError(f"Agrupamento inválido: {agrupamento}. Opções: {', '.join(AGRUPAMENTOS)}")
+    variaveis = variaveis or VARIAVEIS_ROLLUP
+    invalidas = set(variaveis) - set(VARIAVEIS_ROLLUP)
+    if invalidas:
+        raise ValueError(f"Variáveis inválidas: {', '.join(sorted(invalidas))}")
+
+    coluna_chave = AGRUPAMENTOS[agrupamento]
+    colunas = [coluna_chave, *NIVEIS[nivel]] + [
+        f"{v}_{s}" for v in variaveis for s in ("soma", "n", "min", "max")
+    ]
+    filtros = [(coluna_chave, "in", list(chaves))] if chaves else None
+
+    partes = []
+    for arquivo in sorted((ROLLUP_DIR / agrupamento / nivel).glob("ano=*.parquet")):
+        ano = int(arquivo.stem.split("=")[1])
+        if (ano_inicio is not None and ano < ano_inicio) or (ano_fim is not None and ano > ano_fim):
+            continue
+        partes.append(pq.read_table(arquivo, columns=colunas, filters=filtros).to_pandas())
+    if not partes:
+        return pa.table({c: pa.array([], type=pa.float64()) for c in colunas})
+
+    df = pd.concat(partes, ignore_index=True)
+    df[coluna_chave] = df[coluna_chave].astype(str)
+    if agregar_anos and nivel != "diario":
+        tempo = [c for c in NIVEIS[nivel] if c != "ano"]
+        agregacoes = {k: a for k, a in _agregacoes().items() if k.split("_")[0] in variaveis}
+        df = _compactar(df.groupby([coluna_chave, *tempo], sort=True).agg(**agregacoes).reset_index(), variaveis)
+
+    for v in variaveis:
+        df[f"{v}_media"] = (df[f"{v}_soma"] / df[f"{v}_n"].replace(0, np.nan)).astype(np.float32)
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+if __name__ == "__main__":
+    # Uso: python -m src.services.rollup_service [ano ...]  (sem anos: todas as partições)
+    anos = sys.argv[1:] or sorted(p.stem.split("=")[1] for p in OBSERVATIONS_DIR.glob("ano=*.parquet"))
+    for ano in anos:
+        print(ano, construir_rollups_ano(ano))
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.model.model import calcular_media_diaria_locais, converter_unidade
+
+# Colunas de entrada obrigatórias e valores padrão das opcionais (mesmos da calculadora)
+COLUNAS_OBRIGATORIAS = ["consumo_mensal", "latitude", "longitude"]
+PADROES = {
+    "potencia_painel": 400.0,
+    "fator_performance": 0.75,
+    "preco_kwh": 0.75,
+    "custo_wp": 5.0,
+}
+
+# Casas decimais usadas para agrupar consumidores em uma mesma localização (~11 km com 1 casa)
+PRECISAO_LOCAL = 1
+
+
+def _coluna(tabela: pa.Table, nome: str, n: int) -> np.ndarray:
+    if nome in tabela.column_names:
+        return tabela.column(nome).to_numpy().astype(np.float64, copy=False)
+    return np.full(n, PADROES[nome])
+
+
+def irradiacao_por_local(latitudes: np.ndarray, longitudes: np.ndarray, data=None, precisao: int = PRECISAO_LOCAL) -> np.ndarray:
+    """
+    Irradiação média diária em kWh/m²/dia físicos (convertida da escala 'indice' do modelo)
+    para cada cenário, avaliando o modelo apenas uma vez por localização distinta
+    (coordenadas arredondadas).
+    """
+    escala = 10 ** precisao
+    lat_i = np.round(latitudes * escala).astype(np.int64)
+    lon_i = np.round(longitudes * escala).astype(np.int64)
+    # Chave única por célula: válida apenas para latitude em [-90, 90] e longitude em [-180, 180]
+    chave = (lat_i + 90 * escala) * (360 * escala + 1) + (lon_i + 180 * escala)
+    _, primeiro, inverso = np.unique(chave, return_index=True, return_inverse=True)
+
+    irradiacao = calcular_media_diaria_locais(
+        lat_i[primeiro] / escala, lon_i[primeiro] / escala, data=data
+    )
+    return converter_unidade(irradiacao, "kwh")[inverso.ravel()]
+
+
+def dimensionar_cenarios(tabela: pa.Table | pd.DataFrame, data=None) -> pa.Table:
+    """
+    Dimensiona um lote de sistemas fotovoltaicos (um cenário por linha) de forma vetorizada,
+    aplicando as mesmas fórmulas da calculadora do Streamlit.
+
+    Colunas de entrada: consumo_mensal, latitude, longitude e, opcionalmente, potencia_painel,
+    fator_performance, preco_kwh, custo_wp e irradiacao (kWh/m²/dia físicos, isto é, horas de
+    sol pleno; se ausente, vem do modelo, convertida de 'indice' para kWh). Retorna a tabela de
+    entrada acrescida dos resultados; a coluna 'irradiacao' da saída também está em kWh/m²/dia.
+    """
+    if isinstance(tabela, pd.DataFrame):
+        tabela = pa.Table.from_pandas(tabela, preserve_index=False)
+
+    faltantes = [c for c in COLUNAS_OBRIGATORIAS if c not in tabela.column_names]
+    if faltantes:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(faltantes)}")
+
+    n = tabela.num_rows
+    consumo = tabela.column("consumo_mensal").to_numpy().astype(np.float64, copy=False)
+    latitudes = tabela.column("latitude").to_numpy().astype(np.float64, copy=False)
+    longitudes = tabela.column("longitude").to_numpy().astype(np.float64, copy=False)
+    invalidos = ~((np.abs(latitudes) <= 90) & (np.abs(longitudes) <= 180))
+    if invalidos.any():
+        raise ValueError(
+            f"{int(invalidos.sum())} cenário(s) com coordenadas fora de -90..90 / -180..180 "
+            f"(primeira linha: {int(np.flatnonzero(invalidos)[0])})"
+        )
+    potencia_painel = _coluna(tabela, "potencia_painel", n)
+    fator_performance = _coluna(tabela, "fator_performance", n)
+    preco_kwh = _coluna(tabela, "preco_kwh", n)
+    custo_wp = _coluna(tabela, "custo_wp", n)
+
+    if "irradiacao" in tabela.column_names:
+        irradiacao = tabela.column("irradiacao").to_numpy().astype(np.float64, copy=False)
+    else:
+        irradiacao = irradiacao_por_local(latitudes, longitudes, data)
+
+    # Cálculos
+    energia_por_painel_mes = (potencia_painel / 1000) * irradiacao * 30 * fator_performance
+    with np.errstate(divide="ignore", invalid="ignore"):
+        numero_paineis = np.ceil(consumo / energia_por_painel_mes)
+    area_estimada = numero_paineis * (potencia_painel / 200)  # ~2m² por painel de 400W
+    potencia_sistema = (numero_paineis * potencia_painel) / 1000  # kWp
+    geracao_mensal = energia_por_painel_mes * numero_paineis
+
+    # Cálculos financeiros
+    custo_estimado = potencia_sistema * 1000 * custo_wp
+    economia_mensal = geracao_mensal * preco_kwh
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tempo_retorno = custo_estimado / (economia_mensal * 12)  # em anos
+
+    resultados = {
+        "irradiacao": irradiacao,
+        "numero_paineis": numero_paineis,
+        "potencia_sistema_kwp": potencia_sistema,
+        "area_estimada_m2": area_estimada,
+        "geracao_mensal_kwh": geracao_mensal,
+        "custo_estimado": custo_estimado,
+        "economia_mensal": economia_mensal,
+        "tempo_retorno_anos": tempo_retorno,
+    }
+    for nome, valores in resultados.items():
+        if nome in tabela.column_names:
+            tabela = tabela.drop_columns([nome])
+        if nome == "numero_paineis":
+            # Inteiro, nulo quando a irradiação não permite dimensionar
+            invalidos = ~np.isfinite(valores)
+            coluna = pa.array(np.where(invalidos, 0, valores).astype(np.int64), mask=invalidos)
+        else:
+            coluna = pa.array(valores)
+        tabela = tabela.append_column(nome, coluna)
+    return tabela
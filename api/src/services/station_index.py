@@ -0,0 +1,75 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+from src.core.config import STATIONS_FILE
+
+RAIO_TERRA_KM = 6371.0
+
+
+class StationIndex:
+    """
+    Índice espacial (BallTree com distância haversine) sobre o catálogo de estações do INMET.
+    A ordem das linhas de 'estacoes' define o índice de cada estação nas tabelas derivadas.
+    """
+
+    def __init__(self, estacoes: pd.DataFrame):
+        self.estacoes = estacoes.reset_index(drop=True)
+        coords = np.radians(self.estacoes[["latitude", "longitude"]].to_numpy(dtype=np.float64))
+        self.tree = BallTree(coords, metric="haversine")
+        self.altitudes = self.estacoes["altitude"].to_numpy(dtype=np.float64)
+
+    def __len__(self):
+        return len(self.estacoes)
+
+    def query(self, lats, lons, k: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Consulta as k estações mais próximas de cada ponto, em lote.
+        Retorna (distâncias em km, índices), ambos com shape (n_pontos, k).
+        """
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+        k = min(k, len(self))
+        pontos = np.radians(np.column_stack([lats, lons]))
+        distancias, indices = self.tree.query(pontos, k=k)
+        return distancias * RAIO_TERRA_KM, indices
+
+
+@lru_cache(maxsize=1)
+def get_station_index() -> StationIndex | None:
+    """
+    Carrega o catálogo de estações e constrói o índice. Retorna None se a ingestão ainda não ocorreu.
+    """
+    if not STATIONS_FILE.exists():
+        return None
+    estacoes = pd.read_csv(STATIONS_FILE, dtype={"codigo": str})
+    if estacoes.empty:
+        return None
+    return StationIndex(estacoes)
+
+
+def reset_station_index():
+    """
+    Descarta o índice em memória para que seja reconstruído a partir do catálogo atualizado.
+    """
+    get_station_index.cache_clear()
+
+
+def estacoes_mais_proximas(lats, lons, k: int = 1) -> list[list[dict]]:
+    """
+    Retorna, para cada ponto, as k estações mais próximas com a distância em km.
+    """
+    index = get_station_index()
+    if index is None:
+        raise Exception("Catálogo de estações indisponível. Execute a ingestão dos dados.")
+    distancias, indices = index.query(lats, lons, k)
+    # Converte apenas as estações retornadas, não o catálogo inteiro
+    unicos, posicoes = np.unique(indices, return_inverse=True)
+    registros = index.estacoes.iloc[unicos].to_dict("records")
+    posicoes = posicoes.reshape(indices.shape)
+    return [
+        [{**registros[p], "distancia_km": round(float(d), 3)} for d, p in zip(linha_d, linha_p)]
+        for linha_d, linha_p in zip(distancias, posicoes)
+    ]
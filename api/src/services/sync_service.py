@@ -1,19 +1,21 @@
 import re
-import requests
+from urllib.parse import urlsplit
 from bs4 import BeautifulSoup
-from src.core.config import INMET_URL, USER_AGENT
+from src.core.config import INMET_URL
+from src.core.http_client import get_sync_session, SYNC_TIMEOUT
 
 def get_download_links() -> dict:
     """
     Realiza o scraping do portal INMET e retorna os anos disponíveis e os links de download.
     Retorna um dicionário com 'available_years' e 'download_links'.
     """
-    headers = {"User-Agent": USER_AGENT}
-    response = requests.get(INMET_URL, headers=headers)
+    response = get_sync_session().get(INMET_URL, timeout=SYNC_TIMEOUT)
     if response.status_code != 200:
         raise Exception("Erro ao acessar o portal do INMET.")
     
     soup = BeautifulSoup(response.text, 'html.parser')
+    partes_url = urlsplit(INMET_URL)
+    base_url = f"{partes_url.scheme}://{partes_url.netloc}"
     
     available_years = []
     download_links = {}
@@ -33,9 +35,9 @@ def get_download_links() -> dict:
         
         if year:
             if href.startswith('/'):
-                full_link = f"https://portal.inmet.gov.br{href}"
+                full_link = f"{base_url}{href}"
             elif not href.startswith('http'):
-                full_link = f"https://portal.inmet.gov.br/{href}"
+                full_link = f"{base_url}/{href}"
             else:
                 full_link = href
             
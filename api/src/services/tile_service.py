@@ -0,0 +1,341 @@
+import os
+import math
+import asyncio
+import threading
+from collections import OrderedDict
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from src.core.config import (
+    BRASIL_BBOX,
+    TILE_CACHE_DIR,
+    TILE_CACHE_MAX_MB,
+    TILE_GRADE_PASSO,
+    TILE_ZOOMS_PREAQUECIMENTO,
+)
+from src.core.http_client import run_sync
+from src.model.model import calcular_media_diaria_intervalo, converter_unidade, versao_modelo, VERSAO_FEATURES
+from src.utils.png_utils import codificar_png
+
+TAMANHO_TILE = 256
+
+# Grades diárias de irradiação mantidas em memória (uma por versão do modelo e data)
+MAX_GRADES = 64
+
+# Faixa da escala de cores (kWh/m²/dia)
+ESCALA_IRRADIACAO = (2.0, 7.0)
+OPACIDADE = 190
+
+# Tiles renderizados por chamada ao modelo no pré-aquecimento
+TILES_POR_LOTE = 16
+
+# Escala YlOrRd (amarelo -> vermelho escuro)
+_CORES = np.array([
+    [255, 255, 204], [255, 237, 160], [254, 217, 118], [254, 178, 76], [253, 141, 60],
+    [252, 78, 42], [227, 26, 28], [189, 0, 38], [128, 0, 38],
+], dtype=np.float64)
+_POSICOES = np.linspace(0, 1, len(_CORES))
+PALETA = np.stack(
+    [np.interp(np.linspace(0, 1, 256), _POSICOES, _CORES[:, c]) for c in range(3)], axis=1
+).astype(np.uint8)
+
+TILE_VAZIO = codificar_png(np.zeros((TAMANHO_TILE, TAMANHO_TILE, 4), dtype=np.uint8))
+
+
+def _lon(x, n):
+    return np.asarray(x) / n * 360.0 - 180.0
+
+
+def _lat(y, n):
+    return np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * np.asarray(y) / n))))
+
+
+def tiles_bbox(z: int, bbox: tuple = BRASIL_BBOX) -> list[tuple[int, int, int]]:
+    """
+    Tiles (z, x, y) do esquema XYZ / Web Mercator que cobrem o retângulo (lat_min, lat_max, lon_min, lon_max).
+    """
+    lat_min, lat_max, lon_min, lon_max = bbox
+    n = 2 ** z
+
+    def x_tile(lon):
+        return min(n - 1, int((lon + 180.0) / 360.0 * n))
+
+    def y_tile(lat):
+        lat = math.radians(lat)
+        return min(n - 1, int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n))
+
+    return [
+        (z, x, y)
+        for x in range(x_tile(lon_min), x_tile(lon_max) + 1)
+        for y in range(y_tile(lat_max), y_tile(lat_min) + 1)
+    ]
+
+
+def _intersecta_bbox(z: int, x: int, y: int, bbox: tuple = BRASIL_BBOX) -> bool:
+    n = 2 ** z
+    lat_min, lat_max, lon_min, lon_max = bbox
+    return not (
+        _lon(x + 1, n) < lon_min or _lon(x, n) > lon_max or _lat(y, n) < lat_min or _lat(y + 1, n) > lat_max
+    )
+
+
+def _coordenadas(z: int, x: int, y: int, amostras: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Latitude/longitude do centro de uma grade amostras × amostras dentro do tile.
+    """
+    n = 2 ** z
+    frac = (np.arange(amostras) + 0.5) / amostras
+    return _lat(y + frac, n), _lon(x + frac, n)
+
+
+def _eixos_grade(passo: float = TILE_GRADE_PASSO) -> tuple[np.ndarray, np.ndarray]:
+    lat_min, lat_max, lon_min, lon_max = BRASIL_BBOX
+    return np.arange(lat_min, lat_max + passo / 2, passo), np.arange(lon_min, lon_max + passo / 2, passo)
+
+
+def calcular_grade(data: date, passo: float = TILE_GRADE_PASSO) -> np.ndarray:
+    """
+    Irradiação diária (kWh/m²/dia) em uma grade regular sobre o Brasil, com uma única
+    avaliação do modelo. Todos os tiles da data são interpolados desta grade.
+    """
+    lats, lons = _eixos_grade(passo)
+    lat_grade, lon_grade = np.meshgrid(lats, lons, indexing="ij")
+    _, medias = calcular_media_diaria_intervalo(lat_grade.ravel(), lon_grade.ravel(), data, data)
+    return converter_unidade(medias[:, 0], "kwh").reshape(lat_grade.shape).astype(np.float32)
+
+
+_grades: OrderedDict[tuple, np.ndarray] = OrderedDict()
+_grades_lock = threading.Lock()
+_calculo_grade_lock = threading.Lock()
+
+
+def grade_irradiacao(data: date) -> np.ndarray:
+    """
+    Grade da data (LRU em memória); o cálculo é serializado para que requisições
+    simultâneas de tiles da mesma data avaliem o modelo uma única vez.
+    """
+    chave = (versao_modelo(), data.isoformat())
+    with _grades_lock:
+        if chave in _grades:
+            _grades.move_to_end(chave)
+            return _grades[chave]
+    with _calculo_grade_lock:
+        with _grades_lock:
+            if chave in _grades:
+                return _grades[chave]
+        grade = calcular_grade(data)
+        with _grades_lock:
+            _grades[chave] = grade
+            while len(_grades) > MAX_GRADES:
+                _grades.popitem(last=False)
+    return grade
+
+
+def _interpolacao_eixo(posicao: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    posicao = np.clip(posicao, 0, n - 1)
+    i0 = np.minimum(np.floor(posicao).astype(np.intp), max(n - 2, 0))
+    i1 = np.minimum(i0 + 1, n - 1)
+    return i0, i1, posicao - i0
+
+
+def _amostrar_grade(grade: np.ndarray, lats: np.ndarray, lons: np.ndarray, passo: float = TILE_GRADE_PASSO) -> np.ndarray:
+    """
+    Interpolação bilinear separável da grade nos eixos de latitude/longitude de um tile.
+    """
+    lat_min, _, lon_min, _ = BRASIL_BBOX
+    l0, l1, wl = _interpolacao_eixo((lats - lat_min) / passo, grade.shape[0])
+    c0, c1, wc = _interpolacao_eixo((lons - lon_min) / passo, grade.shape[1])
+    linhas = grade[l0] * (1 - wl)[:, None] + grade[l1] * wl[:, None]
+    return linhas[:, c0] * (1 - wc)[None, :] + linhas[:, c1] * wc[None, :]
+
+
+def _colorir(valores: np.ndarray, lats: np.ndarray, lons: np.ndarray) -> bytes:
+    minimo, maximo = ESCALA_IRRADIACAO
+    indice = np.clip((valores - minimo) / (maximo - minimo) * 255, 0, 255).astype(np.uint8)
+    rgba = np.empty((*valores.shape, 4), dtype=np.uint8)
+    rgba[..., :3] = PALETA[indice]
+
+    # Transparente fora do território (retângulo aproximado)
+    lat_min, lat_max, lon_min, lon_max = BRASIL_BBOX
+    dentro = (lats[:, None] >= lat_min) & (lats[:, None] <= lat_max) & (lons[None, :] >= lon_min) & (lons[None, :] <= lon_max)
+    rgba[..., 3] = np.where(dentro & np.isfinite(valores), OPACIDADE, 0)
+    return codificar_png(rgba)
+
+
+def renderizar_tiles(data: date, tiles: list[tuple[int, int, int]]) -> list[bytes]:
+    """
+    Renderiza vários tiles de uma data por interpolação da grade diária; o modelo só é
+    avaliado se a grade da data ainda não estiver em memória.
+    """
+    ativos = [i for i, t in enumerate(tiles) if _intersecta_bbox(*t)]
+    resultado = [TILE_VAZIO] * len(tiles)
+    if not ativos:
+        return resultado
+
+    grade = grade_irradiacao(data)
+    for i in ativos:
+        lats_px, lons_px = _coordenadas(*tiles[i], TAMANHO_TILE)
+        resultado[i] = _colorir(_amostrar_grade(grade, lats_px, lons_px), lats_px, lons_px)
+    return resultado
+
+
+class TileCache:
+    """
+    Cache de tiles em disco (versao/data/z/x/y.png), limitado por tamanho total com descarte LRU.
+    O índice fica em memória e é montado na primeira consulta; tiles de outras versões do
+    modelo entram no início da fila e são os primeiros a ser descartados.
+    """
+
+    def __init__(self, diretorio: Path = TILE_CACHE_DIR, limite_bytes: int = int(TILE_CACHE_MAX_MB * 2 ** 20)):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        self.indice: OrderedDict[tuple, int] = OrderedDict()
+        self.total_bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self._carregado = False
+        self._lock = threading.Lock()
+        self._carga_lock = threading.Lock()
+
+    def _caminho(self, chave: tuple) -> Path:
+        versao, data, z, x, y = chave
+        return self.diretorio / versao / data / str(z) / str(x) / f"{y}.png"
+
+    def _carregar(self):
+        """
+        Monta o índice a partir do disco na primeira consulta. A varredura acontece fora
+        do lock do índice; tiles gravados enquanto isso ficam como os mais recentes.
+        """
+        if self._carregado:
+            return
+        with self._carga_lock:
+            if self._carregado:
+                return
+            atual = versao_tiles()
+            entradas = []
+            for arquivo in self.diretorio.glob("*/*/*/*/*.png"):
+                versao, data, z, x = arquivo.parts[-5:-1]
+                stat = arquivo.stat()
+                chave = (versao, data, int(z), int(x), int(arquivo.stem))
+                entradas.append((versao == atual, stat.st_mtime, chave, stat.st_size))
+
+            with self._lock:
+                recentes = list(self.indice.items())
+                self.indice.clear()
+                for _, _, chave, tamanho in sorted(entradas):
+                    self.indice[chave] = tamanho
+                for chave, tamanho in recentes:
+                    self.indice.pop(chave, None)
+                    self.indice[chave] = tamanho
+                self.total_bytes = sum(self.indice.values())
+                self._carregado = True
+                self._descartar()
+
+    def _descartar(self):
+        while self.total_bytes > self.limite_bytes and self.indice:
+            chave, tamanho = self.indice.popitem(last=False)
+            self.total_bytes -= tamanho
+            self._caminho(chave).unlink(missing_ok=True)
+
+    def contem(self, chave: tuple) -> bool:
+        self._carregar()
+        with self._lock:
+            return chave in self.indice
+
+    def get(self, chave: tuple) -> bytes | None:
+        self._carregar()
+        with self._lock:
+            if chave not in self.indice:
+                self.falhas += 1
+                return None
+            self.indice.move_to_end(chave)
+        try:
+            dados = self._caminho(chave).read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self.total_bytes -= self.indice.pop(chave, 0)
+                self.falhas += 1
+            return None
+        self.acertos += 1
+        return dados
+
+    def put(self, chave: tuple, dados: bytes):
+        caminho = self._caminho(chave)
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        temporario = caminho.with_suffix(f".{threading.get_ident()}.tmp")
+        temporario.write_bytes(dados)
+        os.replace(temporario, caminho)
+        self._carregar()
+        with self._lock:
+            self.total_bytes += len(dados) - self.indice.pop(chave, 0)
+            self.indice[chave] = len(dados)
+            self._descartar()
+
+    def status(self) -> dict:
+        return {
+            "tiles": len(self.indice),
+            "tamanho_mb": round(self.total_bytes / 2 ** 20, 2),
+            "limite_mb": round(self.limite_bytes / 2 ** 20, 2),
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+        }
+
+
+tile_cache = TileCache()
+_em_andamento: dict[tuple, asyncio.Task] = {}
+
+
+# Muda quando a renderização muda, para que tiles antigos deixem de ser servidos
+ESQUEMA_TILE = "grade"
+
+
+def versao_tiles() -> str:
+    return f"{versao_modelo()}-f{VERSAO_FEATURES}-{ESQUEMA_TILE}"
+
+
+def _chave(data: date, z: int, x: int, y: int) -> tuple:
+    return (versao_tiles(), data.isoformat(), z, x, y)
+
+
+def _renderizar_e_salvar(data: date, tiles: list[tuple[int, int, int]]) -> list[bytes]:
+    imagens = renderizar_tiles(data, tiles)
+    for (z, x, y), imagem in zip(tiles, imagens):
+        tile_cache.put(_chave(data, z, x, y), imagem)
+    return imagens
+
+
+async def obter_tile(data: date, z: int, x: int, y: int) -> bytes:
+    """
+    Tile PNG do cache em disco; se não existir, renderiza uma única vez mesmo com
+    requisições simultâneas para o mesmo tile.
+    """
+    chave = _chave(data, z, x, y)
+    dados = await run_sync(tile_cache.get, chave)
+    if dados is not None:
+        return dados
+
+    tarefa = _em_andamento.get(chave)
+    if tarefa is None:
+        tarefa = asyncio.create_task(run_sync(_renderizar_e_salvar, data, [(z, x, y)]))
+        _em_andamento[chave] = tarefa
+        tarefa.add_done_callback(lambda _: _em_andamento.pop(chave, None))
+    return (await asyncio.shield(tarefa))[0]
+
+
+async def preaquecer_tiles(datas: list[date], zooms: list[int] = TILE_ZOOMS_PREAQUECIMENTO):
+    """
+    Renderiza antecipadamente os tiles que cobrem o Brasil nos zooms mais usados,
+    para cada data informada (as datas pré-materializadas).
+    """
+    total = 0
+    for data in datas:
+        pendentes = await run_sync(
+            lambda: [t for z in zooms for t in tiles_bbox(z) if not tile_cache.contem(_chave(data, *t))]
+        )
+        for inicio in range(0, len(pendentes), TILES_POR_LOTE):
+            await run_sync(_renderizar_e_salvar, data, pendentes[inicio:inicio + TILES_POR_LOTE])
+        total += len(pendentes)
+    if total:
+        print(f"Tiles pré-aquecidos: {total} em {len(datas)} datas")
@@ -0,0 +1,158 @@
+import io
+import os
+import math
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+import requests
+import streamlit as st
+from PIL import Image
+
+# URL base da API e parâmetros de acesso (configuráveis por variável de ambiente)
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8080").rstrip("/")
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", "5"))
+API_CACHE_TTL = float(os.getenv("API_CACHE_TTL", "300"))
+# Intervalo entre novas tentativas quando a API falha (o valor de fallback fica em cache nesse período)
+API_CACHE_TTL_ERRO = float(os.getenv("API_CACHE_TTL_ERRO", "15"))
+
+# Mapa de irradiação: zoom dos tiles e retângulo (lat_min, lat_max, lon_min, lon_max) exibido
+MAPA_ZOOM = int(os.getenv("MAPA_ZOOM", "5"))
+MAPA_BBOX = (-34.0, 6.0, -74.0, -34.0)
+
+# Valores usados apenas se a API nunca respondeu
+IRRADIACAO_PADRAO = {
+    "Norte": 1.1,
+    "Nordeste": 1.2,
+    "Centro-Oeste": 1.3,
+    "Sudeste": 1.4,
+    "Sul": 1.5
+}
+
+
+class _CacheSWR:
+    """
+    Cache com TTL compartilhado entre as sessões do Streamlit (stale-while-revalidate).
+    Depois do TTL, o valor antigo continua sendo servido enquanto uma thread busca
+    o novo valor; se a API falhar, o último valor válido (ou o padrão) é mantido e
+    uma nova tentativa só é feita depois de API_CACHE_TTL_ERRO, sem bloquear a interface.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        self.valores = {}  # path -> (valor, instante, ttl)
+        self.falhas = set()
+        self.atualizando = set()
+        self.lock = threading.Lock()
+
+    def _buscar(self, path: str):
+        response = self.session.get(f"{API_BASE_URL}{path}", timeout=API_TIMEOUT)
+        response.raise_for_status()
+        dados = response.json()
+        with self.lock:
+            self.valores[path] = (dados, time.monotonic(), API_CACHE_TTL)
+            self.falhas.discard(path)
+        return dados
+
+    def _registrar_falha(self, path: str, padrao):
+        with self.lock:
+            valor = self.valores[path][0] if path in self.valores else padrao
+            self.valores[path] = (valor, time.monotonic(), API_CACHE_TTL_ERRO)
+            self.falhas.add(path)
+
+    def _buscar_em_segundo_plano(self, path: str, padrao):
+        with self.lock:
+            if path in self.atualizando:
+                return
+            self.atualizando.add(path)
+
+        def tarefa():
+            try:
+                self._buscar(path)
+            except Exception as e:
+                print(f"Erro ao atualizar {path}: {e}")
+                self._registrar_falha(path, padrao)
+            finally:
+                with self.lock:
+                    self.atualizando.discard(path)
+
+        threading.Thread(target=tarefa, daemon=True).start()
+
+    def get(self, path: str, padrao=None) -> tuple[object, bool]:
+        """
+        Retorna (valor, desatualizado). 'desatualizado' indica que a última consulta
+        à API falhou; uma revalidação em andamento não conta como falha.
+        """
+        entrada = self.valores.get(path)
+        if entrada is None:
+            try:
+                return self._buscar(path), False
+            except Exception as e:
+                print(f"Erro ao acessar {path}: {e}")
+                self._registrar_falha(path, padrao)
+                return padrao, True
+
+        valor, instante, ttl = entrada
+        if time.monotonic() - instante > ttl:
+            self._buscar_em_segundo_plano(path, padrao)
+        return valor, path in self.falhas
+
+
+@st.cache_resource
+def _get_cache() -> _CacheSWR:
+    return _CacheSWR()
+
+
+def get_irradiacao_por_regiao() -> tuple[dict, bool]:
+    """
+    Irradiação média diária por região (kWh/m²/dia), vinda do endpoint /model/.
+    """
+    return _get_cache().get("/model/", IRRADIACAO_PADRAO)
+
+
+def _tile_x(lon: float, n: int) -> int:
+    return min(n - 1, int((lon + 180.0) / 360.0 * n))
+
+
+def _tile_y(lat: float, n: int) -> int:
+    lat = math.radians(lat)
+    return min(n - 1, int((1 - math.asinh(math.tan(lat)) / math.pi) / 2 * n))
+
+
+def _tile_lat(y: int, n: int) -> float:
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+
+
+@st.cache_data(ttl=API_CACHE_TTL, show_spinner=False)
+def get_mapa_irradiacao(data: str, zoom: int = MAPA_ZOOM) -> Optional[Tuple[bytes, list]]:
+    """
+    Mosaico PNG dos tiles de irradiação (/tiles) que cobrem o Brasil em uma data,
+    com os limites [lon_min, lat_min, lon_max, lat_max]. Retorna None se a API falhar.
+    """
+    n = 2 ** zoom
+    lat_min, lat_max, lon_min, lon_max = MAPA_BBOX
+    xs = range(_tile_x(lon_min, n), _tile_x(lon_max, n) + 1)
+    ys = range(_tile_y(lat_max, n), _tile_y(lat_min, n) + 1)
+    session = _get_cache().session
+
+    def buscar(tile):
+        x, y = tile
+        response = session.get(f"{API_BASE_URL}/tiles/{data}/{zoom}/{x}/{y}.png", timeout=API_TIMEOUT)
+        response.raise_for_status()
+        return np.asarray(Image.open(io.BytesIO(response.content)).convert("RGBA"))
+
+    tiles = [(x, y) for y in ys for x in xs]
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            imagens = list(executor.map(buscar, tiles))
+    except Exception as e:
+        print(f"Erro ao obter tiles: {e}")
+        return None
+
+    linhas = [np.concatenate(imagens[i:i + len(xs)], axis=1) for i in range(0, len(imagens), len(xs))]
+    buffer = io.BytesIO()
+    Image.fromarray(np.concatenate(linhas, axis=0)).save(buffer, format="PNG")
+    limites = [xs[0] / n * 360 - 180, _tile_lat(ys[-1] + 1, n), (xs[-1] + 1) / n * 360 - 180, _tile_lat(ys[0], n)]
+    return buffer.getvalue(), limites
@@ -0,0 +1,72 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+PARQUET = "application/vnd.apache.parquet"
+
+# Outros nomes usados para Parquet por clientes comuns
+_PARQUET_ALIASES = {PARQUET, "application/x-parquet", "application/parquet"}
+
+
+def formato_tabular(content_type: str | None) -> str | None:
+    """
+    Identifica o formato colunar ('arrow' ou 'parquet') a partir de um Content-Type/Accept.
+    Retorna None se não for um formato colunar.
+    """
+    if not content_type:
+        return None
+    for parte in content_type.split(","):
+        tipo = parte.split(";")[0].strip().lower()
+        if tipo == ARROW_STREAM:
+            return "arrow"
+        if tipo in _PARQUET_ALIASES:
+            return "parquet"
+    return None
+
+
+def ler_tabela(conteudo: bytes, formato: str) -> pa.Table:
+    """
+    Lê uma tabela Arrow a partir de bytes em Arrow IPC (stream) ou Parquet.
+    """
+    if formato == "arrow":
+        return ipc.open_stream(pa.py_buffer(conteudo)).read_all()
+    if formato == "parquet":
+        return pq.read_table(pa.BufferReader(conteudo))
+    raise Exception(f"Formato não suportado: {formato}")
+
+
+def tabela_de_colunas(colunas: dict) -> pa.Table:
+    """
+    Monta uma tabela Arrow a partir de arrays NumPy. Arrays numéricos contíguos
+    são reaproveitados sem cópia (o buffer do NumPy vira o buffer da coluna).
+    """
+    arrays = {}
+    for nome, valores in colunas.items():
+        valores = np.asarray(valores)
+        if valores.dtype.kind in "biufM":
+            arrays[nome] = pa.array(np.ascontiguousarray(valores))
+        else:
+            arrays[nome] = pa.array(valores.tolist())
+    return pa.table(arrays)
+
+
+def escrever_tabela(tabela: pa.Table, formato: str, compressao: str = "snappy") -> memoryview:
+    """
+    Serializa uma tabela Arrow em Arrow IPC (stream) ou Parquet.
+    Retorna uma view sobre o buffer do Arrow, evitando uma cópia extra para bytes.
+    """
+    sink = pa.BufferOutputStream()
+    if formato == "arrow":
+        with ipc.new_stream(sink, tabela.schema) as writer:
+            writer.write_table(tabela)
+    elif formato == "parquet":
+        pq.write_table(tabela, sink, compression=compressao)
+    else:
+        raise Exception(f"Formato não suportado: {formato}")
+    return memoryview(sink.getvalue())
+
+
+def media_type(formato: str) -> str:
+    return ARROW_STREAM if formato == "arrow" else PARQUET
@@ -1,18 +1,20 @@
-import shutil
-import requests
-from src.core.config import USER_AGENT
+import hashlib
+from src.core.http_client import get_sync_session, SYNC_TIMEOUT
 
-def download_file(url: str, destination: str) -> bool:
+def download_file(url: str, destination: str) -> str | None:
     """
     Baixa um arquivo a partir da URL e salva no destino especificado.
+    Retorna o SHA-256 do conteúdo (calculado durante o download) ou None em caso de erro.
     """
     try:
-        headers = {"User-Agent": USER_AGENT}
-        with requests.get(url, headers=headers, stream=True) as r:
+        hash_ = hashlib.sha256()
+        with get_sync_session().get(url, stream=True, timeout=SYNC_TIMEOUT) as r:
             r.raise_for_status()
             with open(destination, 'wb') as f:
-                shutil.copyfileobj(r.raw, f)
-        return True
+                for bloco in r.iter_content(chunk_size=1 << 20):
+                    hash_.update(bloco)
+                    f.write(bloco)
+        return hash_.hexdigest()
     except Exception as e:
         print(f"Erro ao baixar {url}: {e}")
-        return False
\ No newline at end of file
+        return None
\ No newline at end of file
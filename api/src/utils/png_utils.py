@@ -0,0 +1,27 @@
+import zlib
+import struct
+
+import numpy as np
+
+_ASSINATURA = b"\x89PNG\r\n\x1a\n"
+
+
+def _chunk(tipo: bytes, dados: bytes) -> bytes:
+    return struct.pack(">I", len(dados)) + tipo + dados + struct.pack(">I", zlib.crc32(tipo + dados))
+
+
+def codificar_png(rgba: np.ndarray, nivel_compressao: int = 6) -> bytes:
+    """
+    Codifica uma imagem RGBA (altura, largura, 4) uint8 em PNG, sem dependências externas.
+    Cada linha recebe o filtro 0 (nenhum); a compressão fica a cargo do zlib.
+    """
+    altura, largura, _ = rgba.shape
+    linhas = np.zeros((altura, 1 + largura * 4), dtype=np.uint8)
+    linhas[:, 1:] = rgba.reshape(altura, largura * 4)
+    cabecalho = struct.pack(">IIBBBBB", largura, altura, 8, 6, 0, 0, 0)
+    return b"".join([
+        _ASSINATURA,
+        _chunk(b"IHDR", cabecalho),
+        _chunk(b"IDAT", zlib.compress(linhas.tobytes(), nivel_compressao)),
+        _chunk(b"IEND", b""),
+    ])
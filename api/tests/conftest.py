@@ -0,0 +1,30 @@
+import pytest
+
+
+@pytest.fixture
+def features_notebook():
+    """
+    Features como no treinamento (estudo/main.ipynb), a partir de um DataFrame com as colunas
+    brutas do notebook (latitude, ..., hora e as quatro meteorológicas em unidades físicas).
+    """
+    import numpy as np
+
+    from src.model.model import COLUNAS_CLIMA, FEATURES
+
+    def montar(brutas, scaler):
+        X = brutas.copy()
+        X["mes_sen"] = np.sin(2 * np.pi * X["mes"] / 12)
+        X["mes_cos"] = np.cos(2 * np.pi * X["mes"] / 12)
+        X["hora_sen"] = np.sin(2 * np.pi * X["hora"] / 24)
+        X["hora_cos"] = np.cos(2 * np.pi * X["hora"] / 24)
+        X["dia_ano_sen"] = np.sin(2 * np.pi * X["dia_ano"] / 365)
+        X["dia_ano_cos"] = np.cos(2 * np.pi * X["dia_ano"] / 365)
+        X["dist_equador"] = np.abs(X["latitude"])
+        X["lat_mes_interact"] = X["latitude"] * np.cos(2 * np.pi * X["mes"] / 12)
+        X["declinacao_solar"] = 23.45 * np.sin(2 * np.pi * (X["dia_ano"] - 81) / 365)
+        X["elevacao_solar_approx"] = 90 - np.abs(X["latitude"] - X["declinacao_solar"])
+        X["lat_hora_interact"] = X["latitude"] * np.sin(2 * np.pi * (X["hora"] - 12) / 24)
+        X[COLUNAS_CLIMA] = scaler.transform(X[COLUNAS_CLIMA])
+        return X[FEATURES]
+
+    return montar
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+xgb = pytest.importorskip("xgboost")
+
+from src.model.arvores import carregar_ensemble, exportar_ensemble, verificar_equivalencia
+
+
+def _dados(n: int = 2000, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 6)).astype(np.float32)
+    y = 3 * X[:, 0] - 2 * X[:, 1] ** 2 + np.sin(X[:, 2]) + rng.normal(scale=0.1, size=n)
+    # Valores ausentes exercitam o ramo padrão (default_left) de cada nó
+    X[rng.random(X.shape) < 0.05] = np.nan
+    return X, y
+
+
+def test_ensemble_compilado_reproduz_xgboost(tmp_path):
+    X, y = _dados()
+    modelo = xgb.XGBRegressor(n_estimators=50, max_depth=6, learning_rate=0.1, base_score=0.5)
+    modelo.fit(X, y)
+
+    ensemble = carregar_ensemble(exportar_ensemble(modelo, tmp_path))
+
+    X_teste, _ = _dados(500, seed=1)
+    np.testing.assert_allclose(ensemble.predict(X_teste), modelo.predict(X_teste), rtol=1e-5, atol=1e-4)
+    assert verificar_equivalencia(modelo, ensemble, X_teste) < 1e-3
+
+
+def test_ensemble_respeita_melhor_iteracao(tmp_path):
+    X, y = _dados()
+    modelo = xgb.XGBRegressor(n_estimators=300, max_depth=4, learning_rate=0.3, early_stopping_rounds=5)
+    modelo.fit(X[:1500], y[:1500], eval_set=[(X[1500:], y[1500:])], verbose=False)
+
+    ensemble = carregar_ensemble(exportar_ensemble(modelo, tmp_path))
+
+    assert ensemble.n_arvores == modelo.best_iteration + 1
+    np.testing.assert_allclose(ensemble.predict(X), modelo.predict(X), rtol=1e-5, atol=1e-4)
+
+
+def test_previsao_em_blocos_igual_a_bloco_unico(tmp_path):
+    X, y = _dados(300)
+    modelo = xgb.XGBRegressor(n_estimators=10, max_depth=3).fit(X, y)
+    ensemble = carregar_ensemble(exportar_ensemble(modelo, tmp_path))
+
+    np.testing.assert_array_equal(ensemble.predict(X, tamanho_bloco=7), ensemble.predict(X))
+
+
+def test_carregar_sem_exportacao_retorna_none(tmp_path):
+    assert carregar_ensemble(tmp_path) is None
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from src.services.backtest_service import N_SOMAS, _cruzamento, _metricas, _somas
+
+
+def _dados(n: int = 1000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    grupos = rng.integers(0, 5, n)
+    y = rng.uniform(0, 3000, n)
+    erro = rng.normal(scale=200, size=n)
+    return grupos, erro, y
+
+
+def test_acumulacao_em_blocos_igual_a_passagem_unica():
+    grupos, erro, y = _dados()
+    unica = _somas(grupos, 5, erro, y)
+    blocos = sum(_somas(grupos[i:i + 97], 5, erro[i:i + 97], y[i:i + 97]) for i in range(0, len(y), 97))
+
+    assert unica.shape == (5, N_SOMAS)
+    np.testing.assert_allclose(blocos, unica)
+
+
+def test_metricas_iguais_ao_calculo_direto():
+    grupos, erro, y = _dados()
+    metricas = _metricas(_somas(np.zeros_like(grupos), 1, erro, y)[0])
+
+    assert metricas["n"] == len(y)
+    assert metricas["rmse"] == pytest.approx(np.sqrt(np.mean(erro ** 2)), abs=1e-3)
+    assert metricas["mae"] == pytest.approx(np.mean(np.abs(erro)), abs=1e-3)
+    assert metricas["vies"] == pytest.approx(np.mean(erro), abs=1e-3)
+    assert metricas["r2"] == pytest.approx(1 - np.sum(erro ** 2) / np.sum((y - y.mean()) ** 2), abs=1e-4)
+    assert _metricas(np.zeros(N_SOMAS)) == {"n": 0}
+
+
+def test_cruzamento_por_mes_omite_celulas_vazias():
+    grupos, erro, y = _dados()
+    mes = grupos % 3
+    somas = _somas(grupos * 12 + mes, 5 * 12, erro, y)
+    cruzamento = _cruzamento(["A001", "A002", "A003", "A004", "A005"], somas)
+
+    assert set(cruzamento) == {"A001", "A002", "A003", "A004", "A005"}
+    assert set(cruzamento["A001"]) == {"jan"}
+    assert set(cruzamento["A002"]) == {"fev"}
+    assert cruzamento["A004"]["jan"]["n"] == int(np.sum(grupos == 3))
@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("geopy")
+pytest.importorskip("pydantic")
+
+from src.api.schemas import GeocodeBatchRequest
+from src.services.batch_geocoding_service import JobGeocodificacao
+
+
+def test_lote_aceita_lista_ou_objeto():
+    assert GeocodeBatchRequest.model_validate(["Rua A, 1", "Rua B, 2"]).enderecos == ["Rua A, 1", "Rua B, 2"]
+    assert GeocodeBatchRequest.model_validate({"enderecos": ["Rua A, 1"]}).enderecos == ["Rua A, 1"]
+
+
+def test_cada_endereco_e_contado_uma_vez():
+    job = JobGeocodificacao(["Rua A, 1", "rua a,  1", "Rua B, 2", "Rua C, 3"])
+    chaves = list(job.unicos)
+
+    async def publicar():
+        await job.publicar([
+            job._resultado(chaves[0], {"status": "ok"}, "cache"),
+            job._resultado(chaves[1], {"status": "nao_encontrado"}, "cache"),
+            job._resultado(chaves[2], {"status": "ok"}, "consulta"),
+        ])
+
+    asyncio.run(publicar())
+    progresso = job.progresso()
+    assert progresso["entradas"] == 4 and progresso["unicos"] == 3
+    assert (progresso["cache"], progresso["ok"], progresso["nao_encontrado"], progresso["erro"]) == (2, 1, 0, 0)
+    assert sum(job.contagem.values()) == progresso["concluidos"]
@@ -0,0 +1,94 @@
+import gzip
+import asyncio
+
+from src.core.compressao import GZipMiddleware
+
+SCOPE = {"type": "http", "headers": [(b"accept-encoding", b"gzip, deflate")]}
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def _inicio(tipo: bytes) -> dict:
+    return {"type": "http.response.start", "status": 200, "headers": [(b"content-type", tipo)]}
+
+
+def _headers(mensagem: dict) -> dict:
+    return dict(mensagem["headers"])
+
+
+def test_stream_ndjson_chega_antes_do_fim_do_job():
+    job_terminou = asyncio.Event()
+    enviadas = []
+
+    async def app(scope, receive, send):
+        await send(_inicio(b"application/x-ndjson"))
+        await send({"type": "http.response.body", "body": b'{"tipo": "progresso"}\n', "more_body": True})
+        await job_terminou.wait()
+        await send({"type": "http.response.body", "body": b'{"tipo": "fim"}\n', "more_body": False})
+
+    async def send(mensagem):
+        enviadas.append(mensagem)
+
+    async def rodar():
+        tarefa = asyncio.create_task(GZipMiddleware(app, minimum_size=1024)(SCOPE, _receive, send))
+        await asyncio.sleep(0.05)
+        corpo_antes_do_fim = [m["body"] for m in enviadas if m["type"] == "http.response.body"]
+        job_terminou.set()
+        await tarefa
+        return corpo_antes_do_fim
+
+    assert asyncio.run(rodar()) == [b'{"tipo": "progresso"}\n']
+    assert b"content-encoding" not in _headers(enviadas[0])
+
+
+def test_json_grande_e_comprimido():
+    corpo = b'{"valores": [' + b"1.5, " * 1000 + b"0]}"
+    enviadas = []
+
+    async def app(scope, receive, send):
+        await send(_inicio(b"application/json"))
+        await send({"type": "http.response.body", "body": corpo})
+
+    async def send(mensagem):
+        enviadas.append(mensagem)
+
+    asyncio.run(GZipMiddleware(app, minimum_size=1024)(SCOPE, _receive, send))
+    headers = _headers(enviadas[0])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert int(headers[b"content-length"]) == len(enviadas[1]["body"])
+    assert gzip.decompress(enviadas[1]["body"]) == corpo
+
+
+def test_corpo_em_partes_e_comprimido_em_partes():
+    partes = [b"a" * 2000, b"b" * 2000, b""]
+    enviadas = []
+
+    async def app(scope, receive, send):
+        await send(_inicio(b"text/csv"))
+        for i, parte in enumerate(partes):
+            await send({"type": "http.response.body", "body": parte, "more_body": i < len(partes) - 1})
+
+    async def send(mensagem):
+        enviadas.append(mensagem)
+
+    asyncio.run(GZipMiddleware(app, minimum_size=1024)(SCOPE, _receive, send))
+    assert _headers(enviadas[0])[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in _headers(enviadas[0])
+    assert gzip.decompress(b"".join(m["body"] for m in enviadas[1:])) == b"".join(partes)
+
+
+def test_sem_accept_encoding_nao_comprime():
+    enviadas = []
+
+    async def app(scope, receive, send):
+        await send(_inicio(b"application/json"))
+        await send({"type": "http.response.body", "body": b"x" * 5000})
+
+    async def send(mensagem):
+        enviadas.append(mensagem)
+
+    asyncio.run(GZipMiddleware(app)({"type": "http", "headers": []}, _receive, send))
+    assert b"content-encoding" not in _headers(enviadas[0])
+    assert enviadas[1]["body"] == b"x" * 5000
@@ -0,0 +1,70 @@
+import pytest
+
+from src.services.download_store import DownloadStore, sha256_arquivo
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = DownloadStore(tmp_path / "downloads", limite_bytes=250)
+    # Sem versão de modelo: protegidos são os fixados sob o rótulo 'atual'
+    monkeypatch.setattr(store, "_protegidos", lambda: store.fixados.get("atual", set()))
+    return store
+
+
+def _adicionar(store: DownloadStore, nome: str, conteudo: bytes) -> str:
+    origem = store.arquivo_temporario(nome)
+    origem.write_bytes(conteudo)
+    return store.adicionar_arquivo(nome, origem)
+
+
+def test_descarta_o_menos_usado_recentemente(store):
+    _adicionar(store, "2020.zip", b"a" * 100)
+    _adicionar(store, "2021.zip", b"b" * 100)
+    store.caminho("2020.zip")
+    _adicionar(store, "2022.zip", b"c" * 100)
+
+    assert store.listar() == ["2020.zip", "2022.zip"]
+    assert store.total_bytes == 200
+
+
+def test_objetos_fixados_nao_sao_descartados(store):
+    _adicionar(store, "2020.zip", b"a" * 100)
+    store.fixar("atual", ["2020.zip"])
+    _adicionar(store, "2021.zip", b"b" * 100)
+    _adicionar(store, "2022.zip", b"c" * 100)
+
+    assert "2020.zip" in store.listar()
+    assert "2021.zip" not in store.listar()
+
+
+def test_objeto_em_uso_nao_e_descartado(store):
+    _adicionar(store, "2020.zip", b"a" * 100)
+    with store.em_uso("2020.zip") as caminho:
+        _adicionar(store, "2021.zip", b"b" * 100)
+        _adicionar(store, "2022.zip", b"c" * 100)
+        assert caminho.read_bytes() == b"a" * 100
+    assert "2020.zip" in store.listar()
+    assert not store.em_leitura
+
+
+def test_conteudo_repetido_e_gravado_uma_vez(store):
+    hash_a = _adicionar(store, "2020.zip", b"x" * 100)
+    hash_b = _adicionar(store, "copia.zip", b"x" * 100)
+
+    assert hash_a == hash_b
+    assert store.total_bytes == 100
+    assert store.caminho("2020.zip") == store.caminho("copia.zip")
+    assert sha256_arquivo(store.caminho("2020.zip")) == hash_a
+
+
+def test_arquivos_temporarios_sao_exclusivos(store):
+    assert store.arquivo_temporario("2020.zip") != store.arquivo_temporario("2020.zip")
+
+
+def test_indice_persiste_entre_instancias(store, tmp_path):
+    hash_ = _adicionar(store, "2020.zip", b"a" * 100)
+    store.fixar("atual", ["2020.zip"])
+
+    reaberto = DownloadStore(tmp_path / "downloads", limite_bytes=250)
+    assert reaberto.hash_de("2020.zip") == hash_
+    assert reaberto.fixados == {"atual": {hash_}}
@@ -0,0 +1,40 @@
+import ast
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).parents[2]
+MODULOS_FRONT = sorted(RAIZ.glob("front/*.py")) + sorted(RAIZ.glob("api/src/streamlit_app/*.py"))
+
+
+def _anotacoes(arvore: ast.Module) -> list[ast.expr]:
+    anotacoes = []
+    for no in ast.walk(arvore):
+        if isinstance(no, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            argumentos = no.args.posonlyargs + no.args.args + no.args.kwonlyargs
+            anotacoes += [a.annotation for a in argumentos if a.annotation is not None]
+            if no.returns is not None:
+                anotacoes.append(no.returns)
+        elif isinstance(no, ast.AnnAssign):
+            anotacoes.append(no.annotation)
+    return anotacoes
+
+
+@pytest.mark.parametrize("modulo", MODULOS_FRONT, ids=lambda p: str(p.relative_to(RAIZ)))
+def test_front_importavel_em_python_39(modulo):
+    """
+    A imagem do front usa python:3.9, onde anotações 'X | Y' falham ao importar o módulo
+    (a menos que ele use 'from __future__ import annotations').
+    """
+    arvore = ast.parse(modulo.read_text(encoding="utf-8"), feature_version=(3, 9))
+    futuros = {
+        a.name for n in arvore.body
+        if isinstance(n, ast.ImportFrom) and n.module == "__future__" for a in n.names
+    }
+    if "annotations" in futuros:
+        return
+    unioes = [
+        ast.unparse(a) for a in _anotacoes(arvore)
+        if any(isinstance(n, ast.BinOp) and isinstance(n.op, ast.BitOr) for n in ast.walk(a))
+    ]
+    assert unioes == []
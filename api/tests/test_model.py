@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+
+from src.model import model
+
+ESTUDO_DIR = Path(__file__).resolve().parents[2] / "estudo"
+
+
+@pytest.fixture
+def info_features(monkeypatch):
+    # features_info.pkl salvo pelo notebook de treinamento
+    monkeypatch.setattr(model, "MODEL_DIR", ESTUDO_DIR)
+    model.carregar_info_features.cache_clear()
+    yield model.carregar_info_features()
+    model.carregar_info_features.cache_clear()
+
+
+def test_features_iguais_as_do_treinamento(info_features, features_notebook):
+    linha = {
+        "latitude": -15.78, "longitude": -47.93, "altitude": 1160.0,
+        "mes": 6, "dia_ano": 173, "hora": 14,
+        "temperatura_do_ar___bulbo_seco_horaria_degc": 24.5,
+        "precipitacao_total_horario_mm": 0.2,
+        "umidade_relativa_do_ar_horaria_percent": 45.0,
+        "vento_velocidade_horaria_m_s": 2.8,
+    }
+    clima = [linha[c] for c in model.COLUNAS_CLIMA]
+    obtido = model.montar_features(
+        linha["latitude"], linha["longitude"], linha["altitude"], linha["mes"], linha["dia_ano"], linha["hora"], clima
+    )
+
+    esperado = features_notebook(pd.DataFrame([linha]), info_features["scaler"])
+    pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False)
+    assert list(obtido.columns) == info_features["feature_names"]
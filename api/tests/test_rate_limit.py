@@ -0,0 +1,59 @@
+import time
+import asyncio
+from email.utils import formatdate
+
+import pytest
+
+from src.core.rate_limit import TokenBucket, segundos_retry_after
+
+
+def _rodar(corrotina) -> float:
+    return asyncio.run(corrotina())
+
+
+def test_chamadas_respeitam_a_taxa():
+    bucket = TokenBucket("teste", taxa=20)
+
+    async def rodar():
+        inicio = time.monotonic()
+        await asyncio.gather(*(bucket.adquirir() for _ in range(5)))
+        return time.monotonic() - inicio
+
+    # O primeiro token já está disponível; os outros 4 saem a cada 1/20 s
+    assert _rodar(rodar) >= 4 / 20 - 0.01
+    assert bucket.status()["chamadas"] == 5
+
+
+def test_capacidade_permite_rajada_inicial():
+    bucket = TokenBucket("teste", taxa=1, capacidade=3)
+
+    async def rodar():
+        inicio = time.monotonic()
+        for _ in range(3):
+            await bucket.adquirir()
+        return time.monotonic() - inicio
+
+    assert _rodar(rodar) < 0.1
+
+
+def test_penalizar_suspende_as_chamadas():
+    bucket = TokenBucket("teste", taxa=1000)
+
+    async def rodar():
+        await bucket.adquirir()
+        bucket.penalizar(0.2)
+        inicio = time.monotonic()
+        await bucket.adquirir()
+        return time.monotonic() - inicio
+
+    assert _rodar(rodar) >= 0.19
+
+
+@pytest.mark.parametrize("valor, esperado", [("7", 7.0), ("1.5", 1.5), ("-3", 0.0), (None, 4.0), ("", 4.0), ("depois", 4.0)])
+def test_retry_after_em_segundos_ou_invalido(valor, esperado):
+    assert segundos_retry_after(valor, 4.0) == esperado
+
+
+def test_retry_after_como_data_http():
+    assert segundos_retry_after(formatdate(time.time() + 30, usegmt=True), 4.0) == pytest.approx(30, abs=1.5)
+    assert segundos_retry_after(formatdate(time.time() - 30, usegmt=True), 4.0) == 0.0
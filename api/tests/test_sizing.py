@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model.model import converter_unidade
+from src.services import sizing_service
+
+
+@pytest.fixture
+def modelo_indice(monkeypatch):
+    # Irradiação do modelo na escala 'indice', como devolvida por calcular_media_diaria_locais
+    chamadas = []
+
+    def calcular(latitudes, longitudes, data=None):
+        chamadas.append(len(latitudes))
+        return np.full(len(latitudes), 5.0)
+
+    monkeypatch.setattr(sizing_service, "calcular_media_diaria_locais", calcular)
+    return chamadas
+
+
+def test_irradiacao_do_modelo_convertida_para_kwh(modelo_indice):
+    cenarios = pd.DataFrame({"consumo_mensal": [300.0, 450.0], "latitude": [-15.78, -15.79], "longitude": [-47.93, -47.93]})
+    resultado = sizing_service.dimensionar_cenarios(cenarios).to_pandas()
+
+    kwh = float(converter_unidade(5.0, "kwh"))
+    np.testing.assert_allclose(resultado["irradiacao"], kwh)
+    geracao_painel = 0.4 * kwh * 30 * 0.75
+    assert resultado["numero_paineis"].tolist() == [np.ceil(300 / geracao_painel), np.ceil(450 / geracao_painel)]
+    assert modelo_indice == [1]
+
+
+def test_irradiacao_informada_em_kwh_e_usada_como_esta(modelo_indice):
+    cenarios = pd.DataFrame({"consumo_mensal": [300.0], "latitude": [-15.78], "longitude": [-47.93], "irradiacao": [5.5]})
+    resultado = sizing_service.dimensionar_cenarios(cenarios).to_pandas()
+
+    assert resultado["irradiacao"].tolist() == [5.5]
+    assert resultado["numero_paineis"].tolist() == [np.ceil(300 / (0.4 * 5.5 * 30 * 0.75))]
+    assert modelo_indice == []
@@ -0,0 +1,58 @@
+import numpy as np
+
+from src.model.solar import elevacao_solar, horas_diurnas, nascer_por_do_sol
+
+
+def _horas(mascara: np.ndarray) -> list[int]:
+    return np.flatnonzero(mascara).tolist()
+
+
+def test_brasilia_no_solsticio_de_inverno():
+    # Nascer ~06:38 e pôr ~17:49 no horário de Brasília (UTC-3)
+    nascer, por = nascer_por_do_sol(-15.78, -47.93, np.datetime64("2024-06-21"))
+    assert abs(nascer - 9.63) < 0.1
+    assert abs(por - 20.82) < 0.1
+    assert _horas(horas_diurnas(-15.78, -47.93, np.datetime64("2024-06-21"))) == list(range(10, 22))
+
+
+def test_equador_no_equinocio_tem_cerca_de_12_horas():
+    nascer, por = nascer_por_do_sol(0.0, 0.0, np.datetime64("2024-03-20"))
+    assert abs((por - nascer) - 12.1) < 0.1
+
+
+def test_dia_e_noite_polares():
+    datas = np.array(["2024-06-21", "2024-12-21"], dtype="datetime64[D]")
+    mascara = horas_diurnas(80.0, 15.0, datas)
+    assert mascara[0].all()
+    assert not mascara[1].any()
+
+
+def test_dia_solar_atravessando_a_meia_noite_utc():
+    # Perto da linha de data o meio-dia solar cai por volta das 23h UTC
+    mascara = horas_diurnas(0.0, -170.0, np.datetime64("2024-03-20"))
+    assert mascara[:5].all()
+    assert mascara[19:].all()
+    assert not mascara[7:17].any()
+
+
+def test_broadcast_de_locais_e_datas():
+    lats = np.array([-30.0, -15.0, 0.0])[:, None]
+    lons = np.array([-51.0, -47.0, -60.0])[:, None]
+    datas = np.arange("2024-01-01", "2024-01-06", dtype="datetime64[D]")[None, :]
+    assert horas_diurnas(lats, lons, datas).shape == (3, 5, 24)
+
+
+def test_horas_noturnas_sem_sol_acima_do_horizonte():
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(-33, 5, 50)
+    lons = rng.uniform(-74, -34, 50)
+    datas = np.datetime64("2024-01-01") + rng.integers(0, 366, 50)
+    mascara = horas_diurnas(lats, lons, datas)
+
+    # Amostra cada hora a cada 5 minutos: nas horas noturnas o sol nunca chega ao horizonte
+    minutos = np.arange(5, 61, 5) / 60
+    for i in range(50):
+        for h in np.flatnonzero(~mascara[i]):
+            instantes = h - 1 + minutos
+            elevacao = elevacao_solar(lats[i], lons[i], datas[i], instantes)
+            assert (elevacao < 0).all()
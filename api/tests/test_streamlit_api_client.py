@@ -0,0 +1,84 @@
+import time
+
+from src.streamlit_app.api_client import _CacheSWR
+
+
+class _Resposta:
+    def __init__(self, dados):
+        self.dados = dados
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.dados
+
+
+class _Sessao:
+    """
+    Sessão falsa: devolve 'dados' ou levanta 'erro' e conta as chamadas.
+    """
+
+    def __init__(self, dados=None, erro=None):
+        self.dados = dados
+        self.erro = erro
+        self.chamadas = 0
+
+    def get(self, url, timeout=None):
+        self.chamadas += 1
+        if self.erro is not None:
+            raise self.erro
+        return _Resposta(self.dados)
+
+
+def _cache(sessao) -> _CacheSWR:
+    cache = _CacheSWR()
+    cache.session = sessao
+    return cache
+
+
+def _esperar_revalidacao(cache: _CacheSWR, path: str):
+    limite = time.monotonic() + 2
+    while path in cache.atualizando and time.monotonic() < limite:
+        time.sleep(0.01)
+
+
+def test_valor_recente_nao_e_desatualizado():
+    cache = _cache(_Sessao({"Sul": 4.5}))
+    assert cache.get("/model/") == ({"Sul": 4.5}, False)
+
+
+def test_revalidacao_em_andamento_nao_marca_desatualizado():
+    sessao = _Sessao({"Sul": 4.5})
+    cache = _cache(sessao)
+    cache.get("/model/")
+    cache.valores["/model/"] = ({"Sul": 4.5}, time.monotonic() - 1, 0)
+
+    valor, desatualizado = cache.get("/model/")
+    assert valor == {"Sul": 4.5}
+    assert desatualizado is False
+    _esperar_revalidacao(cache, "/model/")
+    assert sessao.chamadas == 2
+
+
+def test_falha_na_revalidacao_marca_desatualizado():
+    sessao = _Sessao({"Sul": 4.5})
+    cache = _cache(sessao)
+    cache.get("/model/")
+    cache.valores["/model/"] = ({"Sul": 4.5}, time.monotonic() - 1, 0)
+    sessao.erro = ConnectionError("API fora do ar")
+
+    cache.get("/model/")
+    _esperar_revalidacao(cache, "/model/")
+    assert cache.get("/model/") == ({"Sul": 4.5}, True)
+
+
+def test_fallback_da_primeira_falha_fica_em_cache():
+    sessao = _Sessao(erro=ConnectionError("API fora do ar"))
+    cache = _cache(sessao)
+
+    assert cache.get("/model/", padrao={"Sul": 1.5}) == ({"Sul": 1.5}, True)
+    # Dentro de API_CACHE_TTL_ERRO a API não é consultada de novo
+    assert cache.get("/model/", padrao={"Sul": 1.5}) == ({"Sul": 1.5}, True)
+    assert sessao.chamadas == 1
+
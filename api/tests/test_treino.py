@@ -0,0 +1,109 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+xgb = pytest.importorskip("xgboost")
+pytest.importorskip("sklearn")
+
+from sklearn.preprocessing import StandardScaler
+
+from src.model import model, treino
+from src.model.treino import FRACAO_HOLDOUT, FRACAO_VALIDACAO, HOLDOUT, TREINO, VALIDACAO, dividir_conjuntos
+
+
+def _observacoes() -> pd.DataFrame:
+    codigos = [f"A{i:03d}" for i in range(40)]
+    datas = pd.date_range("2024-01-01", "2024-12-31", freq="D")
+    indice = pd.MultiIndex.from_product([codigos, datas, range(24)], names=["codigo", "data", "hora"])
+    return indice.to_frame(index=False)
+
+
+def test_horas_do_mesmo_dia_ficam_no_mesmo_conjunto():
+    df = _observacoes()
+    df["conjunto"] = dividir_conjuntos(df)
+
+    assert (df.groupby(["codigo", "data"])["conjunto"].nunique() == 1).all()
+
+
+def test_fracoes_dos_conjuntos():
+    conjunto = dividir_conjuntos(_observacoes())
+
+    assert np.mean(conjunto == HOLDOUT) == pytest.approx(FRACAO_HOLDOUT, abs=0.02)
+    assert np.mean(conjunto == VALIDACAO) == pytest.approx(FRACAO_VALIDACAO, abs=0.02)
+    assert np.mean(conjunto == TREINO) == pytest.approx(1 - FRACAO_HOLDOUT - FRACAO_VALIDACAO, abs=0.02)
+
+
+def test_divisao_nao_depende_das_outras_linhas():
+    df = _observacoes()
+    parte = df[df["data"].dt.month == 6]
+
+    np.testing.assert_array_equal(dividir_conjuntos(parte), dividir_conjuntos(df)[parte.index])
+
+
+def _observacoes_ano(rng) -> tuple[pd.DataFrame, pd.DataFrame]:
+    estacoes = pd.DataFrame({
+        "codigo": ["A001", "A002", "A003"],
+        "latitude": [-15.78, -23.5, -3.1],
+        "longitude": [-47.93, -46.6, -60.0],
+        "altitude": [1160.0, 760.0, 60.0],
+    })
+    obs = _observacoes().head(0)
+    obs = pd.MultiIndex.from_product(
+        [estacoes["codigo"], pd.date_range("2025-01-01", "2025-03-31", freq="D"), range(24)],
+        names=["codigo", "data", "hora"],
+    ).to_frame(index=False)
+    n = len(obs)
+    obs["mes"] = obs["data"].dt.month
+    obs["temperatura"] = rng.normal(25, 4, n)
+    obs["precipitacao"] = rng.exponential(0.3, n)
+    obs["umidade"] = rng.uniform(30, 95, n)
+    obs["vento"] = rng.uniform(0, 6, n)
+    obs["radiacao"] = np.clip(np.sin(np.pi * (obs["hora"] - 9) / 12), 0, None) * 3000
+    return estacoes, obs
+
+
+def _brutas(estacoes: pd.DataFrame, obs: pd.DataFrame) -> pd.DataFrame:
+    # Colunas brutas do notebook
+    local = estacoes.set_index("codigo").loc[obs["codigo"]].reset_index(drop=True)
+    return pd.DataFrame({
+        "latitude": local["latitude"], "longitude": local["longitude"], "altitude": local["altitude"],
+        "mes": obs["mes"], "dia_ano": obs["data"].dt.dayofyear, "hora": obs["hora"],
+        **dict(zip(model.COLUNAS_CLIMA, obs[["temperatura", "precipitacao", "umidade", "vento"]].to_numpy().T)),
+    })
+
+
+def test_base_avaliado_nas_features_do_treinamento(tmp_path, monkeypatch, features_notebook):
+    rng = np.random.default_rng(0)
+    estacoes, obs = _observacoes_ano(rng)
+    brutas = _brutas(estacoes, obs)
+
+    # Modelo "original" treinado como no notebook: meteorologia normalizada
+    scaler = StandardScaler().fit(brutas[model.COLUNAS_CLIMA])
+    X_notebook = features_notebook(brutas, scaler)
+    modelo = xgb.XGBRegressor(n_estimators=30, max_depth=4).fit(X_notebook, obs["radiacao"])
+    with open(tmp_path / "modelo_radiacao_solar.pkl", "wb") as f:
+        pickle.dump(modelo, f)
+    with open(tmp_path / "features_info.pkl", "wb") as f:
+        pickle.dump({"feature_names": model.FEATURES, "scaler": scaler}, f)
+
+    (tmp_path / "observacoes").mkdir()
+    obs.to_parquet(tmp_path / "observacoes" / "ano=2025.parquet")
+    estacoes.to_csv(tmp_path / "estacoes.csv", index=False)
+    monkeypatch.setattr(model, "MODEL_DIR", tmp_path)
+    monkeypatch.setattr(treino, "OBSERVATIONS_DIR", tmp_path / "observacoes")
+    monkeypatch.setattr(treino, "STATIONS_FILE", tmp_path / "estacoes.csv")
+    model.carregar_modelo.cache_clear()
+    model.carregar_info_features.cache_clear()
+    try:
+        X, y, conjunto = treino.carregar_dados(["2025"])
+        base = treino.booster_atual()
+        holdout = conjunto == HOLDOUT
+        previsto = base.predict(xgb.DMatrix(X[holdout], feature_names=model.FEATURES))
+    finally:
+        model.carregar_modelo.cache_clear()
+        model.carregar_info_features.cache_clear()
+
+    assert holdout.any()
+    np.testing.assert_allclose(previsto, modelo.predict(X_notebook[holdout]), rtol=1e-5, atol=1e-3)
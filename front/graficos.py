@@ -0,0 +1,30 @@
+import io
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import streamlit as st
+
+
+def _para_png(fig) -> bytes:
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+@st.cache_data(show_spinner=False)
+def grafico_geracao_consumo(meses: tuple, geracao: tuple, consumo: tuple) -> bytes:
+    """
+    Gráfico de geração estimada vs consumo mensal, renderizado uma vez por combinação de valores.
+    """
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.bar(meses, geracao, color='#4CAF50', alpha=0.7, label='Geração Estimada')
+    ax.plot(meses, consumo, color='#F44336', marker='o', linewidth=2, label='Consumo')
+
+    ax.set_xlabel('Mês')
+    ax.set_ylabel('Energia (kWh)')
+    ax.legend()
+    ax.grid(True, linestyle='--', alpha=0.7)
+    return _para_png(fig)
+
@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 import math
-import requests
+import base64
+import pydeck as pdk
+from datetime import date
+from api_client import get_irradiacao_por_regiao, get_mapa_irradiacao
+from graficos import grafico_geracao_consumo
 
 # Configuração da página
 st.set_page_config(
@@ -15,18 +18,10 @@ st.set_page_config(
 st.title("☀️ Calculadora de Painéis Solares")
 st.markdown("Calcule quantos painéis solares você precisa com base no seu consumo de energia e localização.")
 
-try:
-    irradiacao_por_regiao = requests.get("http://localhost:8000/geracao_por_regiao")
-    irradiacao_por_regiao = irradiacao_por_regiao.json()
-    print(irradiacao_por_regiao)
-except Exception as e:
-    irradiacao_por_regiao = {
-        "Norte": 1.1,
-        "Nordeste": 1.2,
-        "Centro-Oeste": 1.3,
-        "Sudeste": 1.4,
-        "Sul": 1.5
-    }
+# Irradiação por região (cache compartilhado entre sessões, com timeout e fallback)
+irradiacao_por_regiao, irradiacao_desatualizada = get_irradiacao_por_regiao()
+if irradiacao_desatualizada:
+    st.caption("⚠️ Não foi possível obter dados recentes da API; exibindo os últimos valores disponíveis.")
 
 # Criar layout com colunas
 col1, col2 = st.columns([1, 1])
@@ -177,17 +172,10 @@ if st.button("Calcular Painéis Necessários", type="primary", use_container_wid
             'Consumo (kWh)': consumo_por_mes
         })
         
-        # Plotar gráfico
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.bar(df['Mês'], df['Geração (kWh)'], color='#4CAF50', alpha=0.7, label='Geração Estimada')
-        ax.plot(df['Mês'], df['Consumo (kWh)'], color='#F44336', marker='o', linewidth=2, label='Consumo')
-        
-        ax.set_xlabel('Mês')
-        ax.set_ylabel('Energia (kWh)')
-        ax.legend()
-        ax.grid(True, linestyle='--', alpha=0.7)
-        
-        st.pyplot(fig)
+        # Plotar gráfico (renderizado uma vez por combinação de valores)
+        st.image(grafico_geracao_consumo(
+            tuple(df['Mês']), tuple(df['Geração (kWh)']), tuple(df['Consumo (kWh)'])
+        ), use_container_width=True)
         
         # Informações adicionais
         st.info("""
@@ -241,30 +229,22 @@ with st.sidebar:
     
     st.dataframe(df_irradiacao, hide_index=True, use_container_width=True)
     
-    # Adicionar mapa de calor simples
+    # Mapa de calor a partir dos tiles renderizados (e cacheados) pela API
     st.subheader("Mapa de Irradiação Solar")
     
-    # Dados para o mapa de calor (simplificado)
-    regioes = list(irradiacao_por_regiao.keys())
-    valores = list(irradiacao_por_regiao.values())
-    
-    # Normalizar valores para cores
-    valores_norm = [(v - min(valores)) / (max(valores) - min(valores)) for v in valores]
-    
-    # Criar figura
-    fig, ax = plt.subplots(figsize=(8, 3))
-    
-    # Criar barras horizontais coloridas
-    for i, (regiao, valor, valor_norm) in enumerate(zip(regioes, valores, valores_norm)):
-        color = plt.cm.YlOrRd(valor_norm)
-        ax.barh(regiao, valor, color=color)
-        ax.text(valor + 0.05, i, f"{valor} kWh/m²/dia", va='center')
-    
-    ax.set_xlim(4.5, 6.5)
-    ax.set_title("Irradiação Solar Média por Região")
-    ax.set_xlabel("kWh/m²/dia")
-    
-    st.pyplot(fig)
+    mapa = get_mapa_irradiacao(date.today().isoformat())
+    if mapa is None:
+        st.info("Mapa indisponível no momento.")
+    else:
+        imagem, limites = mapa
+        camada = pdk.Layer(
+            "BitmapLayer",
+            image="data:image/png;base64," + base64.b64encode(imagem).decode(),
+            bounds=limites,
+        )
+        visao = pdk.ViewState(latitude=-14.5, longitude=-52, zoom=2.5)
+        st.pydeck_chart(pdk.Deck(layers=[camada], initial_view_state=visao, map_style="light"), use_container_width=True)
+        st.caption("Irradiação média diária prevista (kWh/m²/dia): amarelo = 2, vermelho escuro = 7")
 
 # Rodapé
 st.markdown("---")